@@ -0,0 +1,108 @@
+# benchmarks/bench_chunker.py
+
+"""
+Compares the mmap/byte-search chunker with the previous line-by-line regex chunker
+(kept here for reference) on a synthetic dump, and checks both find the same records.
+
+Usage: python -m benchmarks.bench_chunker [--records N] [--content releases]
+"""
+
+import argparse
+import re
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.synthetic import RECORD_BUILDERS, write_dump
+from discogs.chunker import chunk_xml_by_type, sanitize_line
+
+
+def legacy_chunk_xml_by_type(xml_file: Path, content_type: str, records_per_file: int = 10000) -> Path:
+    """
+    The line-based chunker this project used before the byte-level splitter (without the progress bar).
+    """
+    record_tag = content_type[:-1].lower()
+    start_pat = re.compile(fr'<{record_tag}\b', re.IGNORECASE)
+    end_pat = re.compile(fr'</{record_tag}>', re.IGNORECASE)
+
+    chunk_folder = xml_file.parent / f"legacy_chunked_{content_type}"
+    chunk_folder.mkdir(parents=True, exist_ok=True)
+
+    chunk_count = 0
+    record_count = 0
+    inside_record = False
+    buffer_lines = []
+    current = None
+
+    def open_new_chunk():
+        nonlocal chunk_count, current, record_count
+        chunk_count += 1
+        current = open(chunk_folder / f"chunk_{chunk_count:05}.xml", "w", encoding="utf-8")
+        current.write(f'<?xml version="1.0" encoding="utf-8"?>\n<{content_type}>\n')
+        record_count = 0
+
+    def close_chunk():
+        current.write(f"</{content_type}>")
+        current.close()
+
+    open_new_chunk()
+    with xml_file.open("r", encoding="utf-8", errors="ignore") as f:
+        for raw_line in f:
+            line = sanitize_line(raw_line)
+            if not inside_record:
+                if start_pat.search(line):
+                    inside_record = True
+                    buffer_lines = [line]
+            else:
+                buffer_lines.append(line)
+                if end_pat.search(line):
+                    current.write("".join(buffer_lines) + "\n")
+                    record_count += 1
+                    inside_record = False
+                    buffer_lines = []
+                    if record_count >= records_per_file:
+                        close_chunk()
+                        open_new_chunk()
+    close_chunk()
+    return chunk_folder
+
+
+def _count_records(chunk_dir: Path, record_tag: str) -> int:
+    count = 0
+    for chunk in chunk_dir.glob("chunk_*.xml"):
+        root = ET.parse(chunk).getroot()
+        count += sum(1 for child in root if child.tag == record_tag)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100000, help="Records in the synthetic dump")
+    parser.add_argument("--content", choices=list(RECORD_BUILDERS), default="releases")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_path = write_dump(Path(tmp) / f"discogs_bench_{args.content}.xml", args.content, args.records)
+        size_mb = xml_path.stat().st_size / 1024 ** 2
+
+        results = {}
+        for name, chunker in (("legacy", legacy_chunk_xml_by_type), ("mmap", chunk_xml_by_type)):
+            start = perf_counter()
+            chunk_dir = chunker(xml_path, args.content)
+            seconds = perf_counter() - start
+            results[name] = (seconds, _count_records(chunk_dir, args.content[:-1]))
+            shutil.rmtree(chunk_dir)
+
+    print(f"\n{'chunker':<10}{'seconds':>10}{'MB/s':>10}{'records':>10}")
+    for name, (seconds, records) in results.items():
+        print(f"{name:<10}{seconds:>10.2f}{size_mb / seconds:>10.1f}{records:>10}")
+    print(f"\nSpeedup: {results['legacy'][0] / results['mmap'][0]:.1f}x on {size_mb:.1f} MB")
+
+    if results["legacy"][1] != results["mmap"][1]:
+        raise SystemExit("Chunkers found a different number of records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_convert.py
+
+"""
+Compares the two-pass (scan then write) converter with the single-pass converter,
+serially and with a process pool, on synthetic dumps, and checks that every mode
+produces identical CSV files. A small hand-written dump whose first-seen column order
+is already sorted, with a column (sorting last) that only shows up in a later record,
+checks that rows written before that column appeared are still padded to full width.
+
+Usage: python -m benchmarks.bench_convert [--records N] [--workers N]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.synthetic import RECORD_BUILDERS, write_dump
+from discogs import converter
+from discogs.chunker import chunk_xml_by_type
+
+
+def _time_convert(chunk_dir: Path, output_csv: Path, content_type: str, single_pass: bool, workers: int = 1) -> float:
+    start = perf_counter()
+    converter.convert_chunks_to_csv(chunk_dir, output_csv, content_type, single_pass=single_pass, workers=workers)
+    return perf_counter() - start
+
+
+# Columns are first seen in sorted order, so the segment's column list equals the final
+# header, but the first two rows are written before artist_zzz_zzz exists
+LATE_COLUMN_DUMP = """<artists>
+<artist><id>1</id><name>A</name></artist>
+<artist><id>2</id><name>B</name></artist>
+<artist><id>3</id><name>C</name><zzz>x</zzz></artist>
+</artists>
+"""
+
+
+def _late_column_identical(tmp: Path, workers: int) -> bool:
+    """
+    Converts LATE_COLUMN_DUMP in every mode and checks the outputs match the two-pass one.
+    """
+    xml_path = tmp / "discogs_late_artists.xml"
+    xml_path.write_text(LATE_COLUMN_DUMP, encoding="utf-8")
+    chunk_dir = chunk_xml_by_type(xml_path, "artists")
+    outputs = []
+    for name, single_pass, mode_workers in (("two_pass", False, 1), ("single", True, 1), ("parallel", True, workers)):
+        output_csv = tmp / f"late_{name}.csv"
+        _time_convert(chunk_dir, output_csv, "artists", single_pass=single_pass, workers=mode_workers)
+        outputs.append(output_csv.read_bytes())
+    return all(output == outputs[0] for output in outputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000, help="Records per content type")
+    parser.add_argument("--workers", type=int, default=0, help="Processes for the parallel run (0 = all CPU cores)")
+    args = parser.parse_args()
+    workers = converter.resolve_workers(args.workers)
+
+    converter.console.quiet = True
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for content_type in RECORD_BUILDERS:
+            xml_path = write_dump(Path(tmp) / f"discogs_bench_{content_type}.xml", content_type, args.records)
+            chunk_dir = chunk_xml_by_type(xml_path, content_type, records_per_file=max(args.records // (workers * 2), 1))
+
+            two_pass_csv = Path(tmp) / f"{content_type}_two_pass.csv"
+            single_pass_csv = Path(tmp) / f"{content_type}_single_pass.csv"
+            two_pass = _time_convert(chunk_dir, two_pass_csv, content_type, single_pass=False)
+            single_pass = _time_convert(chunk_dir, single_pass_csv, content_type, single_pass=True)
+            parallel_csv = Path(tmp) / f"{content_type}_parallel.csv"
+            parallel = _time_convert(chunk_dir, parallel_csv, content_type, single_pass=True, workers=workers)
+
+            expected = two_pass_csv.read_bytes()
+            identical = expected == single_pass_csv.read_bytes() == parallel_csv.read_bytes()
+            results.append((content_type, two_pass, single_pass, parallel, identical))
+
+        late_column = _late_column_identical(Path(tmp), workers)
+
+    print(f"\n{'type':<10}{'two-pass s':>12}{'single s':>12}{'saved':>9}{f'{workers} workers s':>15}{'speedup':>9}  identical")
+    for content_type, two_pass, single_pass, parallel, identical in results:
+        saved = (1 - single_pass / two_pass) * 100 if two_pass else 0.0
+        speedup = single_pass / parallel if parallel else 0.0
+        print(f"{content_type:<10}{two_pass:>12.2f}{single_pass:>12.2f}{saved:>8.1f}%{parallel:>15.2f}{speedup:>8.2f}x  {identical}")
+
+    print(f"\nlate column (rows written before it appeared are padded): identical {late_column}")
+
+    if not all(identical for *_, identical in results) or not late_column:
+        raise SystemExit("Conversion modes produced different CSV output")
+
+
+if __name__ == "__main__":
+    main()
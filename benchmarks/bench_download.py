@@ -0,0 +1,172 @@
+# benchmarks/bench_download.py
+
+"""
+Runs the downloader against a local HTTP server that supports Range requests and
+throttles every connection (like a single TCP stream to S3 would be), then:
+
+  1. compares one stream with segmented downloads over several connections, and the
+     asyncio engine (when aiohttp is installed) with and without --limit-rate,
+  2. interrupts a segmented download half-way and checks that the retry only fetches
+     the missing ranges, using the resume map,
+
+checking every downloaded file against the original bytes.
+
+Usage: python -m benchmarks.bench_download [--size-mb 64] [--rate-mb 16] [--connections 1 4 8] [--limit-mb 8]
+"""
+
+import os
+import asyncio
+import re
+import hashlib
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from time import perf_counter, sleep
+
+from rich.progress import Progress
+
+from discogs.downloader import _download_file, _download_segmented, _partial_paths
+from discogs.async_downloader import _download_all
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serves one in-memory file with HEAD, GET and single byte-range GET, at server.rate
+    bytes/s per connection. Once server.fail_after bytes have been sent, requests fail.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.server.data)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        data = self.server.data
+        if self.server.fail_after is not None and self.server.served >= self.server.fail_after:
+            self.send_error(503)
+            return
+        start, end = 0, len(data) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        step = 64 * 1024
+        for offset in range(start, end + 1, step):
+            block = data[offset:min(offset + step, end + 1)]
+            try:
+                self.wfile.write(block)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            with self.server.lock:
+                self.server.served += len(block)
+            if self.server.fail_after is not None and self.server.served >= self.server.fail_after:
+                self.close_connection = True
+                return
+            sleep(len(block) / self.server.rate)
+
+
+def _serve(data: bytes, rate: float):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    server.data, server.rate, server.fail_after, server.served = data, rate, None, 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/discogs_20250101_releases.xml.gz"
+
+
+def _run_async(url: str, target: Path, size: int, progress, task, connections: int, segment_size: int,
+               limit: float):
+    import aiohttp
+    result, = asyncio.run(_download_all(aiohttp, [(url, target, size, None, task)], progress, connections, limit,
+                                        connections, segment_size))
+    if isinstance(result, BaseException):
+        raise result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=64, help="Size of the served file")
+    parser.add_argument("--rate-mb", type=float, default=16, help="Throttle per connection in MB/s")
+    parser.add_argument("--segment-mb", type=float, default=4, help="Segment size in MB")
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--limit-mb", type=float, default=8, help="Bandwidth cap for the async --limit-rate run in MB/s")
+    args = parser.parse_args()
+
+    data = os.urandom(int(args.size_mb * 1024 ** 2))
+    expected = hashlib.sha1(data).hexdigest()
+    segment_size = int(args.segment_mb * 1024 ** 2)
+    server, url = _serve(data, args.rate_mb * 1024 ** 2)
+
+    with tempfile.TemporaryDirectory() as tmp, Progress(disable=True) as progress:
+        task = progress.add_task("download", total=len(data))
+
+        print(f"{'connections':<14}{'seconds':>10}{'MB/s':>10}")
+        for connections in args.connections:
+            target = Path(tmp) / f"download_{connections}.gz"
+            start = perf_counter()
+            if connections == 1:
+                _download_file(url, target, progress, task)
+            else:
+                _download_segmented(url, target, len(data), progress, task, connections, segment_size)
+            seconds = perf_counter() - start
+            if hashlib.sha1(target.read_bytes()).hexdigest() != expected:
+                raise SystemExit(f"Download with {connections} connection(s) is corrupt")
+            print(f"{connections:<14}{seconds:>10.2f}{args.size_mb / seconds:>10.1f}")
+
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            print("async engine skipped: aiohttp is not installed")
+        else:
+            connections = max(args.connections)
+            for label, limit in ((f"async {connections}", 0), (f"async {args.limit_mb:g}MB/s", args.limit_mb * 1024 ** 2)):
+                target = Path(tmp) / f"async_{limit:g}.gz"
+                start = perf_counter()
+                _run_async(url, target, len(data), progress, task, connections, segment_size, limit)
+                seconds = perf_counter() - start
+                if hashlib.sha1(target.read_bytes()).hexdigest() != expected:
+                    raise SystemExit(f"Download with the {label} engine is corrupt")
+                print(f"{label:<14}{seconds:>10.2f}{args.size_mb / seconds:>10.1f}")
+                if limit and args.size_mb / seconds > args.limit_mb * 1.1:
+                    raise SystemExit("--limit-rate was exceeded")
+
+        # Interrupt half-way: the server fails every request after half the file
+        target = Path(tmp) / "resumed.gz"
+        connections = max(args.connections)
+        server.served, server.fail_after = 0, len(data) // 2
+        try:
+            _download_segmented(url, target, len(data), progress, task, connections, segment_size, retries=1)
+            raise SystemExit("Interrupted download unexpectedly succeeded")
+        except RuntimeError:
+            pass
+        part_path, map_path = _partial_paths(target)
+        first = server.served
+        server.served, server.fail_after = 0, None
+        _download_segmented(url, target, len(data), progress, task, connections, segment_size)
+        if hashlib.sha1(target.read_bytes()).hexdigest() != expected:
+            raise SystemExit("Resumed download is corrupt")
+        if part_path.exists() or map_path.exists():
+            raise SystemExit("Partial files were left behind")
+
+    server.shutdown()
+    print(f"\nResume: {first / 1024 ** 2:.1f} MB before the interruption, "
+          f"{server.served / 1024 ** 2:.1f} MB after (file: {args.size_mb:.1f} MB); all downloads identical.")
+    if first + server.served > len(data) * 1.1:
+        raise SystemExit("The resumed download fetched far more than the missing ranges")
+
+
+if __name__ == "__main__":
+    main()
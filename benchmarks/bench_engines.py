@@ -0,0 +1,77 @@
+# benchmarks/bench_engines.py
+
+"""
+Conformance check and timing for the XML parsing engines in discogs.converter.
+Every engine must yield exactly the same records as the ElementTree engine,
+both on synthetic dumps and on a hand-written sample with the awkward cases
+(nested record tags, mixed content, entities, CDATA, comments, empty attributes).
+
+Usage: python -m benchmarks.bench_engines [--records N]
+"""
+
+import argparse
+import io
+import tempfile
+from pathlib import Path
+from time import process_time
+
+from benchmarks.synthetic import RECORD_BUILDERS, write_dump
+from discogs import converter
+from discogs.chunker import chunk_xml_by_type
+
+EDGE_CASES = b"""<?xml version="1.0" encoding="utf-8"?>
+<labels>
+<label><id>1</id><name>A &amp; B &#233;</name><profile>before<b>bold</b>after</profile>
+  <sublabels><label id="2">Sub &lt;1&gt;</label><label id="3"/></sublabels>
+  <urls><url><![CDATA[http://x?a=1&b=2]]></url><url>   </url><!-- skipped --></urls>
+  <parentLabel id="">Parent</parentLabel><contactinfo>line 1
+line 2</contactinfo></label>
+<label><id>4</id><name> padded </name></label>
+</labels>
+"""
+
+
+def _engines() -> list:
+    return [engine for engine in converter.ENGINES if engine != "auto" and converter.resolve_engine(engine) == engine]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000, help="Records per content type")
+    args = parser.parse_args()
+
+    converter.console.quiet = True
+    engines = _engines()
+    failures = []
+
+    # Conformance on the edge-case sample
+    expected = list(converter._iter_records(io.BytesIO(EDGE_CASES), "label", "etree"))
+    for engine in engines:
+        if list(converter._iter_records(io.BytesIO(EDGE_CASES), "label", engine)) != expected:
+            failures.append(f"{engine}: edge cases")
+
+    print(f"\n{'type':<10}" + "".join(f"{engine + ' s':>12}" for engine in engines))
+    with tempfile.TemporaryDirectory() as tmp:
+        for content_type in RECORD_BUILDERS:
+            xml_path = write_dump(Path(tmp) / f"discogs_bench_{content_type}.xml", content_type, args.records)
+            chunks = sorted(chunk_xml_by_type(xml_path, content_type).glob("chunk_*.xml"))
+
+            timings = {}
+            results = {}
+            for engine in engines:
+                start = process_time()
+                results[engine] = [r for chunk in chunks for r in converter._iter_records(chunk, content_type[:-1], engine)]
+                timings[engine] = process_time() - start
+
+            for engine in engines:
+                if results[engine] != results["etree"]:
+                    failures.append(f"{engine}: {content_type}")
+            print(f"{content_type:<10}" + "".join(f"{timings[engine]:>12.2f}" for engine in engines))
+
+    if failures:
+        raise SystemExit("Engines disagree: " + ", ".join(failures))
+    print(f"\nAll engines produced identical records ({', '.join(engines)}); 'auto' uses {converter.resolve_engine('auto')}.")
+
+
+if __name__ == "__main__":
+    main()
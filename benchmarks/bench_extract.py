@@ -0,0 +1,92 @@
+# benchmarks/bench_extract.py
+
+"""
+Compares gzip extraction strategies on synthetic dumps (one per content type):
+the previous single-threaded 1 MB read-then-write loop, the double-buffered extractor
+with every installed inflate backend, and all dumps extracted in parallel processes.
+Every strategy must produce byte-identical XML.
+
+Usage: python -m benchmarks.bench_extract [--size-mb 50] [--workers 4]
+"""
+
+import gzip
+import argparse
+import hashlib
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.synthetic import RECORD_BUILDERS, write_dump, gzip_dump, records_for_size
+from discogs.extractor import _decompress, _gzip_module, extract_gz_files
+
+
+def legacy_extract(gz_path: Path, xml_path: Path):
+    """
+    The extraction loop this project used before the double-buffered extractor (without the progress bar).
+    """
+    with gzip.open(gz_path, "rb") as f_in, open(xml_path, "wb") as f_out:
+        while True:
+            chunk = f_in.read(1024 * 1024)
+            if not chunk:
+                break
+            f_out.write(chunk)
+
+
+def _digest(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=50, help="Approximate XML size of each dump")
+    parser.add_argument("--workers", type=int, default=4, help="Processes for the parallel run")
+    args = parser.parse_args()
+
+    backends = []
+    for backend in ("isal", "zlib-ng", "gzip"):
+        try:
+            backends.append(_gzip_module(backend)[0])
+        except RuntimeError:
+            print(f"({backend} not installed, skipped)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gz_files = []
+        for content_type in RECORD_BUILDERS:
+            xml_path = write_dump(Path(tmp) / f"discogs_20250101_{content_type}.xml", content_type,
+                                  records_for_size(content_type, args.size_mb))
+            gz_files.append(gzip_dump(xml_path))
+            xml_path.unlink()
+
+        def run_serial(extract):
+            start = perf_counter()
+            for gz_path in gz_files:
+                extract(gz_path, gz_path.with_suffix(""))
+            return perf_counter() - start
+
+        results = {"legacy (gzip, serial)": run_serial(legacy_extract)}
+        digests = {gz_path: _digest(gz_path.with_suffix("")) for gz_path in gz_files}
+        total_mb = sum(gz_path.with_suffix("").stat().st_size for gz_path in gz_files) / 1024 ** 2
+
+        for backend in backends:
+            results[f"buffered ({backend}, serial)"] = run_serial(lambda gz, xml: _decompress(gz, xml, backend=backend))
+            if any(_digest(gz.with_suffix("")) != digests[gz] for gz in gz_files):
+                raise SystemExit(f"{backend} produced different output")
+
+        start = perf_counter()
+        extract_gz_files(gz_files, workers=args.workers)
+        results[f"buffered ({backends[0]}, {args.workers} workers)"] = perf_counter() - start
+        if any(_digest(gz.with_suffix("")) != digests[gz] for gz in gz_files):
+            raise SystemExit("Parallel extraction produced different output")
+
+    print(f"\n{'strategy':<32}{'seconds':>10}{'MB/s':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<32}{seconds:>10.2f}{total_mb / seconds:>10.1f}")
+    print(f"\n{len(gz_files)} dumps, {total_mb:.1f} MB extracted per run; all outputs identical.")
+
+
+if __name__ == "__main__":
+    main()
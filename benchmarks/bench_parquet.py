@@ -0,0 +1,67 @@
+# benchmarks/bench_parquet.py
+
+"""
+Compares the CSV and Parquet output backends on a synthetic dump:
+write time, file size, and the time to load a few columns back.
+
+Usage: python -m benchmarks.bench_parquet [--records N] [--content releases]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from benchmarks.synthetic import RECORD_BUILDERS, write_dump
+from discogs import converter
+from discogs.chunker import chunk_xml_by_type
+
+READ_COLUMNS = 4  # Analysts typically load a handful of columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=50000, help="Records in the synthetic dump")
+    parser.add_argument("--content", choices=list(RECORD_BUILDERS), default="releases")
+    args = parser.parse_args()
+
+    converter.console.quiet = True
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_path = write_dump(Path(tmp) / f"discogs_bench_{args.content}.xml", args.content, args.records)
+        chunk_dir = chunk_xml_by_type(xml_path, args.content)
+        output_csv = Path(tmp) / f"{args.content}.csv"
+
+        for output_format in ("csv", "parquet"):
+            start = perf_counter()
+            converter.convert_chunks_to_csv(chunk_dir, output_csv, args.content, output_format=output_format)
+            write_seconds = perf_counter() - start
+
+            path = converter.layout_output_path(output_csv, "wide", output_format)
+
+            start = perf_counter()
+            if output_format == "parquet":
+                columns = pq.read_schema(path).names[:READ_COLUMNS]
+                frame = pq.read_table(path, columns=columns).to_pandas()
+            else:
+                columns = list(pd.read_csv(path, nrows=0).columns[:READ_COLUMNS])
+                frame = pd.read_csv(path, usecols=columns, dtype=str)
+            read_seconds = perf_counter() - start
+
+            results[output_format] = (write_seconds, path.stat().st_size, read_seconds, len(frame))
+
+    print(f"\n{'format':<10}{'write s':>10}{'size MB':>10}{'read s':>10}{'rows':>10}")
+    for output_format, (write_seconds, size, read_seconds, rows) in results.items():
+        print(f"{output_format:<10}{write_seconds:>10.2f}{size / 1024 ** 2:>10.2f}{read_seconds:>10.3f}{rows:>10}")
+
+    csv_size, parquet_size = results["csv"][1], results["parquet"][1]
+    print(f"\nParquet is {csv_size / parquet_size:.1f}x smaller; "
+          f"column load is {results['csv'][2] / results['parquet'][2]:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_sqlite.py
+
+"""
+Compares getting a synthetic dump into SQLite three ways, in rows per second:
+
+  1. csv: plain conversion to CSV, for reference,
+  2. csv + load: CSV, then loaded the usual hand-rolled way (csv.reader, default
+     pragmas, id index created before the rows go in), which parses every row again,
+  3. sqlite: the SQLite output backend (bulk-load pragmas, large executemany batches,
+     index built after the load), with its load and index stages reported separately.
+
+Row counts and contents of the csv + load and sqlite databases are checked to match.
+
+Usage: python -m benchmarks.bench_sqlite [--records N] [--content releases] [--workers 1]
+"""
+
+import csv
+import argparse
+import sqlite3
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.synthetic import RECORD_BUILDERS, write_dump
+from discogs import converter, telemetry
+from discogs.chunker import chunk_xml_by_type
+
+
+def _load_csv(csv_path: Path, db_path: Path, table: str, id_column: str) -> int:
+    """
+    Loads a converted CSV into SQLite with default settings, as a script would.
+    """
+    connection = sqlite3.connect(db_path)
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        connection.execute(f'CREATE TABLE {table} ({", ".join(f""""{col}" TEXT""" for col in header)})')
+        connection.execute(f'CREATE INDEX {table}_id ON {table} ("{id_column}")')
+        insert = f"INSERT INTO {table} VALUES ({', '.join('?' * len(header))})"
+        rows = 0
+        for row in reader:
+            connection.execute(insert, [value or None for value in row])
+            rows += 1
+    connection.commit()
+    connection.close()
+    return rows
+
+
+def _fetch(db_path: Path, table: str) -> list:
+    connection = sqlite3.connect(db_path)
+    rows = connection.execute(f"SELECT * FROM {table} ORDER BY rowid").fetchall()
+    connection.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50000, help="Records in the synthetic dump")
+    parser.add_argument("--content", choices=list(RECORD_BUILDERS), default="releases")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to flatten chunks")
+    args = parser.parse_args()
+
+    converter.console.quiet = True
+    table, id_column = args.content, converter.ID_COLUMNS[args.content]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_path = write_dump(Path(tmp) / f"discogs_bench_{args.content}.xml", args.content, args.records)
+        chunk_dir = chunk_xml_by_type(xml_path, args.content)
+        output_csv = Path(tmp) / f"{args.content}.csv"
+
+        start = perf_counter()
+        converter.convert_chunks_to_csv(chunk_dir, output_csv, args.content, workers=args.workers)
+        convert_seconds = perf_counter() - start
+        results["csv"] = {"seconds": convert_seconds, "size": output_csv.stat().st_size}
+
+        loaded_path = Path(tmp) / "loaded.sqlite"
+        start = perf_counter()
+        rows = _load_csv(output_csv, loaded_path, table, id_column)
+        load_seconds = perf_counter() - start
+        results["csv + load"] = {"seconds": convert_seconds + load_seconds, "load": load_seconds,
+                                 "size": loaded_path.stat().st_size}
+
+        start = perf_counter()
+        converter.convert_chunks_to_csv(chunk_dir, output_csv, args.content, workers=args.workers,
+                                        output_format="sqlite")
+        sink_seconds = perf_counter() - start
+        sink_path = converter.layout_output_path(output_csv, "wide", "sqlite")
+        stages = {m["stage"]: m for m in telemetry.stages() if m["stage"] in ("load", "index")}
+        results["sqlite"] = {"seconds": sink_seconds, "load": stages["load"]["wall_seconds"],
+                             "index": stages["index"]["wall_seconds"], "size": sink_path.stat().st_size}
+
+        identical = _fetch(loaded_path, table) == _fetch(sink_path, table)
+
+    print(f"\n{rows} {args.content} rows, {args.workers} worker(s)")
+    print(f"{'path':<12}{'total s':>10}{'rows/s':>12}{'load s':>10}{'load rows/s':>13}{'index s':>10}{'size MB':>10}")
+    for name, r in results.items():
+        load = f"{r['load']:>10.2f}{rows / r['load']:>13,.0f}" if "load" in r else f"{'–':>10}{'–':>13}"
+        index = f"{r['index']:>10.2f}" if "index" in r else f"{'–':>10}"
+        print(f"{name:<12}{r['seconds']:>10.2f}{rows / r['seconds']:>12,.0f}{load}{index}{r['size'] / 1024 ** 2:>10.2f}")
+
+    print(f"\nSQLite backend: {results['csv + load']['seconds'] / results['sqlite']['seconds']:.2f}x faster than "
+          f"CSV + load, {results['sqlite']['seconds'] / results['csv']['seconds']:.2f}x the time of CSV alone")
+    if not identical:
+        raise SystemExit("✗ The SQLite backend and CSV + load databases differ")
+    print("✔ Both databases hold the same rows")
+
+
+if __name__ == "__main__":
+    main()
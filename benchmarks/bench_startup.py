@@ -0,0 +1,178 @@
+# benchmarks/bench_startup.py
+
+"""
+Measures CLI startup cost, each time in a fresh interpreter:
+
+  1. `python -X importtime -c "import discogs.main"`: cumulative import time of the CLI
+     module and its heaviest direct imports,
+  2. cold wall time and total import time per command (`--help` of every command, plus `show --offline`
+     against a seeded S3 catalog in a throwaway home folder), with the modules each one
+     imported.
+
+Modules that must stay out of a command (pandas and numpy everywhere; requests and the
+pipeline modules for help and cached listings) are reported as failures. Timings are
+compared with a stored baseline; anything slower than --tolerance allows (plus a few ms
+of slack for process noise) is a regression. The run exits with status 1 on either, and
+when there is no baseline to compare with (store one first with --save-baseline).
+
+Usage: python -m benchmarks.bench_startup [--repeat 5] [--baseline benchmarks/startup_baseline.json]
+                                          [--save-baseline] [--tolerance 0.25]
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+DEFAULT_BASELINE = Path(__file__).parent / "startup_baseline.json"
+SLACK_MS = 15  # Absolute noise allowance on top of --tolerance
+
+HELP_COMMANDS = ("run", "download", "extract", "convert", "diff", "index", "lookup", "delete", "show", "config")
+NEVER = ("pandas", "numpy", "pyarrow", "lxml")
+# Not needed to print help or a cached listing
+NOT_FOR_LISTING = ("requests", "urllib3", "discogs.converter", "discogs.downloader", "discogs.extractor",
+                   "discogs.pipeline", "discogs.telemetry", "discogs.delta")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _run(args: list, env: dict, importtime: bool = False) -> tuple:
+    """
+    Runs `python [-X importtime] <args>` in a fresh process; returns (wall ms, stderr).
+    """
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), *args]
+    start = perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, env=env, stdin=subprocess.DEVNULL)
+    wall_ms = (perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"{' '.join(args)} failed:\n{result.stdout}\n{result.stderr[-2000:]}")
+    return wall_ms, result.stderr
+
+
+def _importtime(args: list, env: dict) -> dict:
+    """
+    Returns {module: (cumulative µs, depth)} for every module `<args>` imports.
+    """
+    modules = {}
+    for line in _run(args, env, importtime=True)[1].splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(2)), len(match.group(3)) // 2)
+    return modules
+
+
+def _seed_home(home: Path) -> dict:
+    """
+    Creates a throwaway home folder whose default download folder holds a fresh S3 catalog,
+    so `show --offline` runs the real listing path without the network.
+    """
+    download_dir = home / "Downloads" / "Discogs"
+    download_dir.mkdir(parents=True)
+    month = "data/2025/"
+    contents = [[f"{month}discogs_20250401_{kind}.xml.gz", 10 ** 8, "2025-04-02T10:00:00.000Z"]
+                for kind in ("artists", "labels", "masters", "releases")]
+    contents.append([f"{month}discogs_20250401_CHECKSUM.txt", 400, "2025-04-02T10:00:00.000Z"])
+    now = datetime.now().timestamp()
+    catalog = {
+        "data/|/": {"etag": None, "last_modified": None, "contents": [], "prefixes": [month], "fetched": now},
+        f"{month}|": {"etag": None, "last_modified": None, "contents": contents, "prefixes": [], "fetched": now},
+    }
+    (download_dir / ".s3_catalog.json").write_text(json.dumps(catalog))
+    env = dict(os.environ, HOME=str(home), USERPROFILE=str(home), COLUMNS="100")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path(__file__).parent.parent), env.get("PYTHONPATH")]))
+    return env
+
+
+def _measure(args: list, env: dict, repeat: int, forbidden: tuple) -> dict:
+    """
+    Best of `repeat` cold runs (the least disturbed by other load on the machine); wall
+    time is taken without -X importtime, whose own bookkeeping slows imports down.
+    """
+    walls, imports, modules = [], [], {}
+    for _ in range(repeat):
+        walls.append(_run(args, env)[0])
+        modules = _importtime(args, env)
+        imports.append(sum(us for us, depth in modules.values() if depth == 1) / 1000)
+    leaked = sorted(m for m in modules if m.split(".")[0] in forbidden or m in forbidden)
+    return {"wall_ms": min(walls), "import_ms": min(imports), "modules": len(modules), "leaked": leaked}
+
+
+def _compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        for key in ("wall_ms", "import_ms"):
+            if current[key] > previous[key] * (1 + tolerance) + SLACK_MS:
+                regressions.append(f"{name}: {key} {current[key]:.0f} vs {previous[key]:.0f} baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per measurement (the best is kept)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _seed_home(Path(tmp))
+        listing_forbidden = NEVER + NOT_FOR_LISTING
+
+        modules = _importtime(["-c", "import discogs.main"], env)
+        heaviest = sorted(((us, name) for name, (us, depth) in modules.items() if depth == 1), reverse=True)[:8]
+        print(f"import discogs.main: {modules['discogs.main'][0] / 1000:.1f} ms cumulative; heaviest direct imports:")
+        for us, name in heaviest:
+            print(f"  {name:<32}{us / 1000:>8.1f} ms")
+
+        runs = {"import": (["-c", "import discogs.main"], listing_forbidden),
+                "--help": (["-m", "discogs.main", "--help"], listing_forbidden)}
+        for command in HELP_COMMANDS:
+            runs[f"{command} --help"] = (["-m", "discogs.main", command, "--help"], listing_forbidden)
+        runs["show --offline"] = (["-m", "discogs.main", "show", "--offline"], listing_forbidden)
+
+        results = {}
+        print(f"\n{'command':<22}{'wall ms':>10}{'import ms':>11}{'modules':>9}")
+        for name, (command, forbidden) in runs.items():
+            results[name] = _measure(command, env, args.repeat, forbidden)
+            r = results[name]
+            print(f"{name:<22}{r['wall_ms']:>10.0f}{r['import_ms']:>11.1f}{r['modules']:>9}"
+                  + (f"  imports {', '.join(r['leaked'])}" if r["leaked"] else ""))
+
+    failures = [f"{name} imports {', '.join(r['leaked'])}" for name, r in results.items() if r["leaked"]]
+
+    run = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": {name: {k: round(v, 1) for k, v in r.items() if k in ("wall_ms", "import_ms")}
+                    for name, r in results.items()},
+    }
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(run, indent=2))
+        print(f"\nBaseline saved: {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        print(f"\nCompared with baseline from {baseline.get('created', '?')} (tolerance {args.tolerance:.0%})")
+        failures += _compare(results, baseline, args.tolerance)
+    else:
+        failures.append(f"no baseline at {args.baseline}; run with --save-baseline to store one")
+
+    if failures:
+        print("\nStartup regressions:")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        sys.exit(1)
+    print("\nNo startup regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# benchmarks/bench_suite.py
+
+"""
+Offline benchmark suite: generates deterministic synthetic dumps (.xml and .gz) for every
+content type and times each stage of the pipeline on them:
+
+    extract   extract_gz                  .gz → .xml
+    chunk     chunk_xml_by_type           .xml → chunk files
+    scan      _scan_columns               column discovery over all chunks
+    write     _write_rows                 CSV rows for all chunks (columns known)
+    convert   convert_xml_to_csv          the full chunk + convert pipeline
+
+Each stage runs in a fresh process so its peak memory (max RSS) is its own. Results
+(seconds, MB/s, records/s, peak MB) are printed and compared with a stored baseline;
+a stage that got slower or hungrier than --tolerance allows is reported as a regression
+and the run exits with status 1. A missing baseline fails the run too; store one first
+with --save-baseline.
+
+Usage: python -m benchmarks.bench_suite [--size-mb 20 | --records N] [--content releases ...]
+                                        [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+
+import os
+import sys
+import csv
+import shutil
+import json
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.synthetic import RECORD_BUILDERS, write_dump, gzip_dump, records_for_size
+
+STAGES = ("extract", "chunk", "scan", "write", "convert")
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def _peak_rss_mb():
+    """
+    Peak resident memory of the current process in MB, or None where `resource` is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def _run_stage(stage: str, work_dir: str, content_type: str, engine: str, results):
+    """
+    Child-process body: prepares the stage's input (untimed), times the stage itself
+    and sends back its duration and the process's peak RSS.
+    """
+    sys.stdout = open(os.devnull, "w")  # Progress bars and summaries would drown the report
+    from discogs import converter
+    from discogs.chunker import chunk_xml_by_type
+    from discogs.extractor import extract_gz
+
+    work = Path(work_dir)
+    gz_path = work / f"discogs_20250101_{content_type}.xml.gz"
+    xml_path = work / f"discogs_20250101_{content_type}.xml"
+    record_tag = content_type[:-1]
+    engine = converter.resolve_engine(engine)
+
+    if stage == "extract":
+        start = perf_counter()
+        extract_gz(gz_path)
+    elif stage == "chunk":
+        start = perf_counter()
+        chunk_xml_by_type(xml_path, content_type)
+    elif stage == "scan":
+        chunks = sorted((work / f"chunked_{content_type}").glob("chunk_*.xml"))
+        column_set = set()
+        start = perf_counter()
+        for chunk in chunks:
+            converter._scan_columns(chunk, record_tag, column_set, engine)
+    elif stage == "write":
+        chunks = sorted((work / f"chunked_{content_type}").glob("chunk_*.xml"))
+        column_set = set()
+        for chunk in chunks:
+            converter._scan_columns(chunk, record_tag, column_set, engine)
+        columns = sorted(column_set)
+        start = perf_counter()
+        with open(work / "write_rows.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for chunk in chunks:
+                converter._write_rows(chunk, writer, columns, record_tag, engine)
+    else:
+        shutil.rmtree(work / f"chunked_{content_type}", ignore_errors=True)  # Full run, not a resume of "chunk"
+        start = perf_counter()
+        converter.convert_xml_to_csv(xml_path, content_type, engine=engine, rescan=True)
+
+    results.put({"seconds": perf_counter() - start, "peak_mb": _peak_rss_mb()})
+
+
+def _measure(stage: str, work_dir: Path, content_type: str, engine: str) -> dict:
+    """
+    Runs one stage in a freshly spawned process and returns its measurements.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=_run_stage, args=(stage, str(work_dir), content_type, engine, results))
+    process.start()
+    result = results.get()
+    process.join()
+    if process.exitcode:
+        raise SystemExit(f"Stage {stage} failed for {content_type}")
+    return result
+
+
+def _compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns the regressions of results against the baseline: lower MB/s or higher peak
+    memory than the baseline allows, per content type and stage.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+        if current["mb_per_s"] < previous["mb_per_s"] * (1 - tolerance):
+            regressions.append(f"{key}: {current['mb_per_s']:.1f} MB/s vs {previous['mb_per_s']:.1f} MB/s baseline")
+        if current["peak_mb"] and previous.get("peak_mb") and current["peak_mb"] > previous["peak_mb"] * (1 + tolerance):
+            regressions.append(f"{key}: {current['peak_mb']:.0f} MB peak vs {previous['peak_mb']:.0f} MB baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=20, help="Approximate size of each synthetic XML dump")
+    parser.add_argument("--records", type=int, default=0, help="Records per dump (overrides --size-mb)")
+    parser.add_argument("--content", nargs="+", choices=list(RECORD_BUILDERS), default=list(RECORD_BUILDERS))
+    parser.add_argument("--noise", type=float, default=0.02, help="Share of text fields with stray '&' / control chars")
+    parser.add_argument("--engine", default="auto", help="XML engine for scan/write/convert")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown / memory growth (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for content_type in args.content:
+            work_dir = Path(tmp) / content_type
+            work_dir.mkdir()
+            records = args.records or records_for_size(content_type, args.size_mb, noise=args.noise)
+            xml_path = write_dump(work_dir / f"discogs_20250101_{content_type}.xml", content_type, records,
+                                  noise=args.noise)
+            gzip_dump(xml_path)
+            size_mb = xml_path.stat().st_size / 1024 ** 2
+            print(f"{content_type}: {records:,} records, {size_mb:.1f} MB")
+
+            for stage in STAGES:
+                measured = _measure(stage, work_dir, content_type, args.engine)
+                seconds = measured["seconds"]
+                results[f"{content_type}/{stage}"] = {
+                    "seconds": round(seconds, 3),
+                    "mb_per_s": round(size_mb / seconds, 2) if seconds else 0.0,
+                    "records_per_s": round(records / seconds) if seconds else 0,
+                    "peak_mb": round(measured["peak_mb"], 1) if measured["peak_mb"] else None,
+                }
+
+    print(f"\n{'stage':<20}{'seconds':>10}{'MB/s':>10}{'records/s':>12}{'peak MB':>10}")
+    for key, r in results.items():
+        peak = f"{r['peak_mb']:.0f}" if r["peak_mb"] else "-"
+        print(f"{key:<20}{r['seconds']:>10.2f}{r['mb_per_s']:>10.1f}{r['records_per_s']:>12,}{peak:>10}")
+
+    run = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "engine": args.engine,
+        "results": results,
+    }
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(run, indent=2))
+        print(f"\nBaseline saved: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        raise SystemExit(f"\nNo baseline at {args.baseline}; run with --save-baseline to store one.")
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions = _compare(results, baseline, args.tolerance)
+    print(f"\nCompared with baseline from {baseline.get('created', '?')} (tolerance {args.tolerance:.0%})")
+    if regressions:
+        for regression in regressions:
+            print(f"  REGRESSION {regression}")
+        raise SystemExit(1)
+    print("  No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# benchmarks/synthetic.py
+
+import gzip
+import random
+import shutil
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+GENRES = ["Electronic", "Rock", "Jazz", "Funk / Soul", "Hip Hop", "Classical", "Pop"]
+STYLES = ["House", "Techno", "Ambient", "Disco", "Punk", "Bop", "Soul", "Dub"]
+FORMATS = ["Vinyl", "CD", "Cassette", "File"]
+COUNTRIES = ["US", "UK", "Germany", "Japan", "France", "Netherlands", "Turkey"]
+WORDS = ["night", "blue", "echo", "river", "static", "gold", "machine", "city", "dream", "signal"]
+
+
+def _title(rng: random.Random, words: int = 3) -> str:
+    return " ".join(rng.choice(WORDS).capitalize() for _ in range(words))
+
+
+def _tag(name: str, text, **attrs) -> str:
+    attr_str = "".join(f" {k}={quoteattr(str(v))}" for k, v in attrs.items())
+    return f"<{name}{attr_str}>{escape(str(text))}</{name}>"
+
+
+# The kind of damage sanitize_line exists to fix: a bare "&" and stray control characters
+DIRT = [" & Sons", " R&B", "\x07", "\x1b[0m", "\x0b", " AT&T\x00"]
+
+
+def _dirty_tag(rng: random.Random, name: str, text, noise: float) -> str:
+    """
+    Like _tag, but with probability `noise` appends raw (unescaped) dirt to the text.
+    """
+    tag = _tag(name, text)
+    if noise and rng.random() < noise:
+        tag = tag[:-len(name) - 3] + rng.choice(DIRT) + tag[-len(name) - 3:]
+    return tag
+
+
+def _artists(rng: random.Random, wrapper: str = "artists") -> str:
+    items = "".join(
+        f"<artist>{_tag('id', rng.randint(1, 10 ** 6))}{_tag('name', _title(rng, 2))}"
+        f"{_tag('anv', '')}{_tag('join', ',')}</artist>"
+        for _ in range(rng.randint(1, 3))
+    )
+    return f"<{wrapper}>{items}</{wrapper}>"
+
+
+def _track(rng: random.Random, position: str) -> str:
+    return (
+        f"{_tag('position', position)}{_tag('title', _title(rng))}"
+        f"{_tag('duration', f'{rng.randint(1, 9)}:{rng.randint(10, 59)}')}"
+    )
+
+
+def _release(rng: random.Random, rid: int, noise: float = 0.0) -> list:
+    tracks = "".join(
+        # Every fifth track is an index track with nested sub-tracks
+        f"<track>{_track(rng, f'A{n}')}<sub_tracks>"
+        + "".join(f"<track>{_track(rng, f'A{n}.{m}')}</track>" for m in range(1, rng.randint(2, 4)))
+        + "</sub_tracks></track>"
+        if n % 5 == 0 else f"<track>{_track(rng, f'A{n}')}</track>"
+        for n in range(1, rng.randint(2, 14))
+    )
+    return [
+        f'<release id="{rid}" status="Accepted">',
+        _artists(rng),
+        _dirty_tag(rng, "title", _title(rng), noise),
+        "<labels>" + "".join(
+            f"<label name={quoteattr(_title(rng, 2))} catno=\"CAT{rng.randint(1, 999)}\" id=\"{rng.randint(1, 10 ** 5)}\"/>"
+            for _ in range(rng.randint(1, 2))
+        ) + "</labels>",
+        f'<formats><format name="{rng.choice(FORMATS)}" qty="1" text=""><descriptions>'
+        f'{_tag("description", "LP")}{_tag("description", "Album")}</descriptions></format></formats>',
+        "<genres>" + "".join(_tag("genre", g) for g in rng.sample(GENRES, rng.randint(1, 2))) + "</genres>",
+        "<styles>" + "".join(_tag("style", s) for s in rng.sample(STYLES, rng.randint(1, 3))) + "</styles>",
+        _tag("country", rng.choice(COUNTRIES)),
+        _tag("released", f"{rng.randint(1960, 2024)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"),
+        _dirty_tag(rng, "notes", f"Recorded at {_title(rng, 2)} Studio", noise),
+        _tag("data_quality", "Correct"),
+        f'<master_id is_main_release="{rng.choice(["true", "false"])}">{rng.randint(1, 10 ** 5)}</master_id>',
+        f"<tracklist>{tracks}</tracklist>",
+        "<identifiers>" + _tag("identifier", "", type="Barcode", value=str(rng.randint(10 ** 11, 10 ** 12))) + "</identifiers>",
+        "<videos>" + "".join(
+            f'<video src="https://www.youtube.com/watch?v={rng.randint(1, 10 ** 9)}" duration="{rng.randint(60, 600)}" embed="true">'
+            f"{_tag('title', _title(rng))}{_tag('description', _title(rng, 4))}</video>"
+            for _ in range(rng.randint(0, 2))
+        ) + "</videos>",
+        "</release>",
+    ]
+
+
+def _master(rng: random.Random, rid: int, noise: float = 0.0) -> list:
+    return [
+        f'<master id="{rid}">',
+        _tag("main_release", rng.randint(1, 10 ** 6)),
+        _artists(rng),
+        "<genres>" + "".join(_tag("genre", g) for g in rng.sample(GENRES, rng.randint(1, 2))) + "</genres>",
+        "<styles>" + "".join(_tag("style", s) for s in rng.sample(STYLES, rng.randint(1, 3))) + "</styles>",
+        _tag("year", rng.randint(1960, 2024)),
+        _dirty_tag(rng, "title", _title(rng), noise),
+        _tag("data_quality", "Correct"),
+        "</master>",
+    ]
+
+
+def _artist(rng: random.Random, rid: int, noise: float = 0.0) -> list:
+    return [
+        "<artist>",
+        _tag("id", rid),
+        _tag("name", _title(rng, 2)),
+        _tag("realname", _title(rng, 2)),
+        _dirty_tag(rng, "profile", f"Producer from {rng.choice(COUNTRIES)}", noise),
+        _tag("data_quality", "Needs Vote"),
+        "<urls>" + "".join(_tag("url", f"https://example.com/{rng.randint(1, 10 ** 6)}") for _ in range(rng.randint(0, 3))) + "</urls>",
+        "<namevariations>" + "".join(_tag("name", _title(rng, 2)) for _ in range(rng.randint(0, 3))) + "</namevariations>",
+        "<aliases>" + "".join(_tag("name", _title(rng, 2), id=rng.randint(1, 10 ** 6)) for _ in range(rng.randint(0, 2))) + "</aliases>",
+        "</artist>",
+    ]
+
+
+def _label(rng: random.Random, rid: int, noise: float = 0.0) -> list:
+    lines = [
+        "<label>",
+        _tag("id", rid),
+        _tag("name", _title(rng, 2) + " Records"),
+        _tag("contactinfo", f"{_title(rng, 1)} Street 1"),
+        _dirty_tag(rng, "profile", "Independent label", noise),
+        _tag("data_quality", "Correct"),
+        "<urls>" + "".join(_tag("url", f"https://example.com/{rng.randint(1, 10 ** 6)}") for _ in range(rng.randint(0, 2))) + "</urls>",
+    ]
+    if noise:
+        # Sublabels reuse the record tag, which is what the nested-record handling is for
+        lines.append("<sublabels>" + "".join(
+            _tag("label", _title(rng, 2), id=rng.randint(1, 10 ** 5)) for _ in range(rng.randint(0, 2))
+        ) + "</sublabels>")
+    lines.append("</label>")
+    return lines
+
+
+RECORD_BUILDERS = {
+    "releases": _release,
+    "masters": _master,
+    "artists": _artist,
+    "labels": _label,
+}
+
+
+def write_dump(path: Path, content_type: str, records: int, seed: int = 0, noise: float = 0.0) -> Path:
+    """
+    Writes a deterministic synthetic Discogs dump of the given content type.
+    Each record spans several lines, like the layout the chunker expects.
+    With noise > 0 that share of free-text fields gets a stray "&" or control
+    character, and labels get nested sublabels.
+    """
+    rng = random.Random(seed)
+    build = RECORD_BUILDERS[content_type]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<{content_type}>\n")
+        for rid in range(1, records + 1):
+            f.write("\n".join(build(rng, rid, noise)) + "\n")
+        f.write(f"</{content_type}>\n")
+
+    return path
+
+
+def records_for_size(content_type: str, size_mb: float, seed: int = 0, noise: float = 0.0) -> int:
+    """
+    Estimates how many records make a dump of roughly size_mb, from a 1,000-record sample.
+    """
+    rng = random.Random(seed)
+    build = RECORD_BUILDERS[content_type]
+    sample = sum(len(("\n".join(build(rng, rid, noise)) + "\n").encode()) for rid in range(1, 1001))
+    return max(int(size_mb * 1024 ** 2 / (sample / 1000)), 1)
+
+
+def gzip_dump(xml_path: Path) -> Path:
+    """
+    Compresses a synthetic dump next to itself (name.xml → name.xml.gz), like the S3 files.
+    """
+    gz_path = xml_path.with_name(xml_path.name + ".gz")
+    with open(xml_path, "rb") as src, gzip.open(gz_path, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    return gz_path
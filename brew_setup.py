@@ -14,8 +14,7 @@ setup(
     install_requires=[
         "typer[all]",
         "rich",
-        "requests",
-        "pandas"
+        "requests"
     ],
     entry_points={
         "console_scripts": [
@@ -0,0 +1,199 @@
+# discogs/artifacts.py
+
+import os
+import json
+import stat
+import threading
+from pathlib import Path
+
+INDEX_NAME = ".artifact_index.json"  # Kept in the download folder, next to Datasets/
+
+# Artifact kind by what follows the dump name (discogs_20250401_releases + ".xml.gz", ...)
+KINDS = {
+    "xml.gz": "gz", "gz": "gz",
+    "xml.gz.sha256": "sha256", "gz.sha256": "sha256",
+    "xml": "xml",
+    "csv": "csv", "parquet": "parquet", "sqlite": "sqlite",
+    "": "normalized",  # Folder of tables written by --layout normalized (a file: an extracted old-style .gz)
+    "csv.parts": "parts", "parquet.parts": "parts",  # Folder of part files written with --shard-size/--shard-rows
+}
+FOLDER_KINDS = ("normalized", "parts")
+STAGES = {"gz": "downloaded", "sha256": "verified", "xml": "extracted",
+          "csv": "converted", "parquet": "converted", "sqlite": "converted", "normalized": "converted",
+          "parts": "converted"}
+
+_lock = threading.Lock()
+_cache = {}  # Download dir -> index, so a command scans at most once
+
+
+def _index_path(download_dir: Path) -> Path:
+    return download_dir / INDEX_NAME
+
+
+def _split(name: str, is_dir: bool = False) -> tuple:
+    """
+    Splits an entry name into (dump name, artifact kind); kind is None for anything else
+    (chunk folders, .part files, indexes, ...).
+    """
+    dump, _, rest = name.partition(".")
+    kind = KINDS.get(rest) if dump.startswith("discogs_") else None
+    if kind in FOLDER_KINDS and not is_dir:
+        kind = "xml" if kind == "normalized" else None
+    elif kind is not None and kind not in FOLDER_KINDS and is_dir:
+        kind = None
+    return dump, kind
+
+
+def _scan_month(month_dir: str) -> dict:
+    """
+    Lists one Datasets/<month> folder with a single os.scandir pass.
+    Returns {dump name: {kind: [size, mtime, file name]}}.
+    """
+    dumps = {}
+    with os.scandir(month_dir) as entries:
+        for entry in entries:
+            dump, kind = _split(entry.name, entry.is_dir())
+            if kind is None:
+                continue
+            info = entry.stat()
+            dumps.setdefault(dump, {})[kind] = [info.st_size, info.st_mtime, entry.name]
+    return dumps
+
+
+def _save(download_dir: Path, index: dict):
+    path = _index_path(download_dir)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        tmp_path.replace(path)
+    except OSError:
+        pass  # A read-only download folder only costs a rescan next time
+
+
+def load_index(download_dir: Path) -> dict:
+    """
+    Returns {month: {"mtime_ns", "dumps": {dump name: {kind: [size, mtime, file name]}}}} for Datasets/.
+    The stored index is reused as is for every month folder whose mtime has not changed
+    (files were neither added, removed nor renamed there); only changed or new months are
+    scanned again. The first call in a process does that check, later calls are free.
+    """
+    download_dir = Path(download_dir)
+    with _lock:
+        if download_dir in _cache:
+            return _cache[download_dir]
+
+        try:
+            with open(_index_path(download_dir), "r", encoding="utf-8") as f:
+                stored = json.load(f).get("months", {})
+        except (OSError, ValueError):
+            stored = {}
+
+        months, changed = {}, False
+        try:
+            with os.scandir(download_dir / "Datasets") as entries:
+                for entry in entries:
+                    if not entry.is_dir():
+                        continue
+                    mtime_ns = entry.stat().st_mtime_ns
+                    known = stored.get(entry.name)
+                    if known and known.get("mtime_ns") == mtime_ns:
+                        months[entry.name] = known
+                    else:
+                        months[entry.name] = {"mtime_ns": mtime_ns, "dumps": _scan_month(entry.path)}
+                        changed = True
+        except FileNotFoundError:
+            pass
+
+        if changed or set(months) != set(stored):
+            _save(download_dir, {"version": 1, "months": months})
+        _cache[download_dir] = months
+        return months
+
+
+def record(path: Path):
+    """
+    Brings the index up to date for one artifact under Datasets/<month>/ that was just
+    written or removed (a download, its checksum record, an extraction, a conversion,
+    a deletion). Other paths are ignored.
+    """
+    path = Path(path)
+    if path.parent.parent.name != "Datasets":
+        return
+    download_dir, month = path.parent.parent.parent, path.parent.name
+    months = load_index(download_dir)
+
+    with _lock:
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            info = None
+        try:
+            month_mtime = os.stat(path.parent).st_mtime_ns
+        except FileNotFoundError:
+            month_mtime = None
+        dump, kind = _split(path.name, info is not None and stat.S_ISDIR(info.st_mode))
+        if kind is None and info is None:
+            dump, kind = _split(path.name, True)  # A removed folder (e.g. a .parts folder)
+        if kind is None:
+            return
+
+        entry = months.get(month)
+        if entry is None:
+            if info is None:
+                return
+            entry = months[month] = {"mtime_ns": month_mtime, "dumps": _scan_month(str(path.parent))}
+        elif info is None:
+            found = entry["dumps"].get(dump, {})
+            for gone in (("xml", "normalized") if kind == "xml" and "." not in path.name else (kind,)):
+                found.pop(gone, None)
+            if not found:
+                entry["dumps"].pop(dump, None)
+        else:
+            entry["dumps"].setdefault(dump, {})[kind] = [info.st_size, info.st_mtime, path.name]
+        if month_mtime is not None:
+            entry["mtime_ns"] = month_mtime  # Our own change; nothing else needs rescanning
+        _save(download_dir, {"version": 1, "months": months})
+
+
+def artifacts(download_dir: Path, month: str, filename: str) -> dict:
+    """
+    Returns {kind: Path} for every artifact of a dump (given by its .gz name) that is on disk.
+    """
+    dump, _ = _split(filename)
+    found = load_index(download_dir).get(month, {}).get("dumps", {}).get(dump, {})
+    month_dir = Path(download_dir) / "Datasets" / month
+    return {kind: month_dir / name for kind, (_, _, name) in found.items()}
+
+
+def is_present(path: Path) -> bool:
+    """
+    exists() for dump artifacts, answered from the index; other paths are stat'ed.
+    """
+    path = Path(path)
+    dump, _, rest = path.name.partition(".")
+    if path.parent.parent.name != "Datasets" or not dump.startswith("discogs_") or rest not in KINDS:
+        return path.exists()
+    found = load_index(path.parent.parent.parent).get(path.parent.name, {}).get("dumps", {}).get(dump, {})
+    return any(name == path.name for _, _, name in found.values())
+
+
+def status(download_dir: Path, month: str, filename: str) -> dict:
+    """
+    Returns {"downloaded", "verified", "extracted", "converted"} flags for one dump.
+    """
+    found = artifacts(download_dir, month, filename)
+    return {stage: any(STAGES[kind] == stage for kind in found)
+            for stage in ("downloaded", "verified", "extracted", "converted")}
+
+
+def find(download_dir: Path, kind: str) -> list:
+    """
+    Returns the paths of every artifact of one kind ("gz", "xml", ...), by month and name.
+    """
+    paths = []
+    for month, entry in sorted(load_index(download_dir).items()):
+        for dump, found in sorted(entry["dumps"].items()):
+            if kind in found:
+                paths.append(Path(download_dir) / "Datasets" / month / found[kind][2])
+    return paths
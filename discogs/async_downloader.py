@@ -0,0 +1,307 @@
+# discogs/async_downloader.py
+
+import os
+import time
+import asyncio
+import threading
+from pathlib import Path
+from rich.console import Console
+
+from discogs import telemetry
+from discogs.checksum import ChecksumMismatch, new_hash, check
+from discogs.downloader import (
+    CONNECTIONS, SEGMENT_SIZE, _CHECKPOINT_BYTES, RangeNotSupported, _download_progress, _target_path,
+    _selected_files, _already_downloaded, _record_download, _print_summary, _partial_paths, _load_resume_map,
+    _save_resume_map, _pwrite, _advance_hash,
+)
+
+console = Console()
+
+CONCURRENCY = 8  # Transfers in flight across all files
+_READ_SIZE = 256 * 1024
+
+
+def require_aiohttp():
+    """
+    Imports aiohttp lazily so the threaded engine keeps working without it.
+    Raises a RuntimeError with install instructions when it is missing.
+    """
+    try:
+        import aiohttp
+    except ImportError:
+        raise RuntimeError(
+            "The async download engine needs aiohttp. Install it with: pip install 'DiscogsDataProcessorCLI[async]'"
+        )
+    return aiohttp
+
+
+def _token_bucket(bytes_per_second: float):
+    """
+    Shared bandwidth limiter state (None = unlimited). The bucket starts empty and
+    holds at most one second of tokens, so short bursts are allowed but the average
+    rate is capped.
+    """
+    if not bytes_per_second:
+        return None
+    return {"rate": float(bytes_per_second), "tokens": 0.0, "stamp": time.monotonic()}
+
+
+async def _take(bucket, n: int):
+    """
+    Takes n bytes' worth of tokens, sleeping while the bucket is in debt. Everything
+    runs on one event loop, so no lock is needed.
+    """
+    if bucket is None:
+        return
+    now = time.monotonic()
+    bucket["tokens"] = min(bucket["rate"], bucket["tokens"] + (now - bucket["stamp"]) * bucket["rate"])
+    bucket["stamp"] = now
+    bucket["tokens"] -= n
+    if bucket["tokens"] < 0:
+        await asyncio.sleep(-bucket["tokens"] / bucket["rate"])
+
+
+def _open_file(url: str, target_path: Path, size: int, segment_size: int, expected: str) -> dict:
+    """
+    Prepares one segmented download, sharing the .part / resume map layout of the
+    threaded engine so either engine can continue the other's partial download.
+    """
+    part_path, map_path = _partial_paths(target_path)
+    segments = [(start, min(start + segment_size, size) - 1) for start in range(0, size, segment_size)]
+    done = _load_resume_map(map_path, url, size, segment_size) if part_path.exists() else None
+    if done is None:
+        done = [0] * len(segments)
+        with open(part_path, "wb") as f:
+            f.truncate(size)
+    return {
+        "url": url, "target": target_path, "part": part_path, "map": map_path, "size": size,
+        "segment_size": segment_size, "segments": segments, "done": done, "unsaved": 0,
+        "fd": os.open(part_path, os.O_RDWR | getattr(os, "O_BINARY", 0)), "lock": threading.Lock(),
+        "hash": new_hash() if expected else None, "hashed": 0, "hashing": False,
+    }
+
+
+def _save(file: dict):
+    """
+    Flushes a file's data and then records its per-segment progress in the resume map.
+    """
+    os.fsync(file["fd"])
+    _save_resume_map(file["map"], file["url"], file["size"], file["segment_size"], list(file["done"]))
+
+
+async def _hash_written(file: dict):
+    """
+    Advances the file's hash over the contiguous written prefix in a worker thread, so
+    the event loop keeps streaming; skipped while another segment is already hashing.
+    """
+    if file["hash"] is None or file["hashing"]:
+        return
+    file["hashing"] = True
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None, _advance_hash, file["fd"], file["segments"], file["done"], file)
+    finally:
+        file["hashing"] = False
+
+
+async def _fetch_segment(aiohttp, session, file: dict, i: int, transfers: asyncio.Semaphore,
+                         connections: asyncio.Semaphore, bucket, progress, task_id, retries: int = 5):
+    """
+    Fetches the missing part of segment i of a file with a Range request, holding one
+    global transfer slot and one of the file's connection slots while streaming.
+    Retries with backoff, continuing after the last byte written.
+    """
+    start, end = file["segments"][i]
+    for attempt in range(retries):
+        offset = start + file["done"][i]
+        if offset > end:
+            return
+        try:
+            async with connections, transfers:
+                headers = {"Range": f"bytes={offset}-{end}"}
+                async with session.get(file["url"], headers=headers) as response:
+                    response.raise_for_status()
+                    if response.status != 206:
+                        raise RangeNotSupported(file["url"])
+                    async for chunk in response.content.iter_chunked(_READ_SIZE):
+                        chunk = chunk[:end + 1 - offset]
+                        await _take(bucket, len(chunk))
+                        _pwrite(file["fd"], chunk, offset, file["lock"])  # Page-cache write; cheap enough inline
+                        offset += len(chunk)
+                        file["done"][i] += len(chunk)
+                        progress.update(task_id, advance=len(chunk))
+                        file["unsaved"] += len(chunk)
+                        if file["unsaved"] >= _CHECKPOINT_BYTES:
+                            file["unsaved"] = 0
+                            _save(file)
+                            await _hash_written(file)
+            if offset > end:
+                return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == retries - 1:
+                raise RuntimeError(f"Segment {i + 1} failed after {retries} retries: {e}")
+            await asyncio.sleep(min(1.5 * 2 ** attempt, 30))
+    if start + file["done"][i] <= end:
+        raise RuntimeError(f"Segment {i + 1} incomplete after {retries} attempts")
+
+
+async def _fetch_whole(aiohttp, session, url: str, target_path: Path, transfers: asyncio.Semaphore, bucket,
+                       progress, task_id, expected: str) -> Path:
+    """
+    Single-stream fallback for servers that do not serve ranges (or files of unknown size).
+    """
+    part_path, _ = _partial_paths(target_path)
+    hasher = new_hash() if expected else None
+    async with transfers, session.get(url) as response:
+        response.raise_for_status()
+        with open(part_path, "wb") as f:
+            async for chunk in response.content.iter_chunked(_READ_SIZE):
+                await _take(bucket, len(chunk))
+                f.write(chunk)
+                if hasher:
+                    hasher.update(chunk)
+                progress.update(task_id, advance=len(chunk))
+    part_path.replace(target_path)
+    if hasher:
+        check(target_path, hasher.hexdigest(), expected)
+    return target_path
+
+
+async def _download_one(aiohttp, session, url: str, target_path: Path, size: int, expected: str,
+                        transfers: asyncio.Semaphore, bucket, progress, task_id, connections: int,
+                        segment_size: int) -> Path:
+    """
+    Downloads one file as concurrent segment tasks, checking it against `expected`
+    when a digest is published. On failure or cancellation the remaining segments
+    are cancelled and the resume map is saved before re-raising.
+    """
+    if not size:
+        return await _fetch_whole(aiohttp, session, url, target_path, transfers, bucket, progress, task_id, expected)
+
+    file = _open_file(url, target_path, size, segment_size, expected)
+    progress.update(task_id, completed=sum(file["done"]))
+    slots = asyncio.Semaphore(connections)
+    tasks = [
+        asyncio.ensure_future(_fetch_segment(aiohttp, session, file, i, transfers, slots, bucket, progress, task_id))
+        for i, (start, end) in enumerate(file["segments"]) if start + file["done"][i] <= end
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        _save(file)
+        os.close(file["fd"])
+        raise
+
+    if file["hash"]:
+        await asyncio.get_running_loop().run_in_executor(
+            None, _advance_hash, file["fd"], file["segments"], file["done"], file)
+    os.close(file["fd"])
+    file["part"].replace(target_path)
+    file["map"].unlink(missing_ok=True)
+    if file["hash"]:
+        check(target_path, file["hash"].hexdigest(), expected)
+    return target_path
+
+
+async def _download_all(aiohttp, jobs: list, progress, concurrency: int, bytes_per_second: float,
+                        connections: int, segment_size: int, cancel: threading.Event = None) -> list:
+    """
+    Runs every download on one event loop under a global cap of `concurrency` transfers
+    and one shared bandwidth bucket. Setting `cancel` (from any thread) stops all
+    transfers cooperatively; partial files keep their resume maps.
+    Jobs are (url, target path, size, expected sha256, progress task).
+    Returns (target path or exception) per job.
+    """
+    transfers = asyncio.Semaphore(concurrency)
+    bucket = _token_bucket(bytes_per_second)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency, keepalive_timeout=60)
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        async def fetch(url, target_path, size, expected, task_id):
+            try:
+                return await _download_one(aiohttp, session, url, target_path, size, expected, transfers, bucket,
+                                           progress, task_id, connections, segment_size)
+            except RangeNotSupported:
+                for path in _partial_paths(target_path):
+                    path.unlink(missing_ok=True)
+                progress.update(task_id, completed=0)
+                return await _fetch_whole(aiohttp, session, url, target_path, transfers, bucket, progress, task_id,
+                                          expected)
+
+        async def run(url, target_path, size, expected, task_id):
+            try:
+                return await fetch(url, target_path, size, expected, task_id)
+            except ChecksumMismatch as e:
+                console.print(f"[yellow]⚠ Checksum mismatch, downloading again:[/] {e}")
+                progress.update(task_id, completed=0)
+            try:
+                return await fetch(url, target_path, size, expected, task_id)
+            except ChecksumMismatch as e:
+                raise RuntimeError(f"Checksum mismatch after downloading again: {e}")
+
+        tasks = [asyncio.ensure_future(run(*job)) for job in jobs]
+
+        async def watch():
+            while not cancel.is_set():
+                await asyncio.sleep(0.2)
+            for task in tasks:
+                task.cancel()
+
+        watcher = asyncio.ensure_future(watch()) if cancel is not None else None
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            if watcher:
+                watcher.cancel()
+
+
+def download_files_async(files: list, selected_indexes, download_dir: Path, concurrency: int = CONCURRENCY,
+                         limit_rate: float = 0, connections: int = CONNECTIONS, segment_size: int = SEGMENT_SIZE,
+                         cancel: threading.Event = None) -> list[Path]:
+    """
+    Asyncio counterpart of download_files_threaded: all files and their ranged segments
+    are multiplexed on one event loop, with at most `concurrency` transfers in flight
+    overall and the total bandwidth capped at `limit_rate` bytes/s (0 = unlimited).
+    Shows the same progress bars and returns the downloaded paths.
+    """
+    aiohttp = require_aiohttp()
+    paths = []
+    total_bytes = 0
+    start_time = time.time()
+
+    with telemetry.stage("download", engine="async", files=len(selected_indexes)) as metrics, _download_progress() as progress:
+        jobs = []
+        for url, listed_size, expected in _selected_files(files, selected_indexes):
+            target_path = _target_path(url, download_dir)
+            if _already_downloaded(target_path, expected):
+                paths.append(target_path)
+                continue
+            total_bytes += listed_size
+            task_id = progress.add_task("Downloading", filename=target_path.name, total=listed_size or None)
+            jobs.append((url, target_path, listed_size, expected, task_id))
+
+        try:
+            results = asyncio.run(_download_all(aiohttp, jobs, progress, concurrency, limit_rate, connections,
+                                                segment_size, cancel))
+        except KeyboardInterrupt:
+            console.print("[yellow]⚠ Download interrupted; partial files will resume next time.[/yellow]")
+            raise
+        for result in results:
+            if isinstance(result, asyncio.CancelledError):
+                console.print("[yellow]⚠ Download cancelled; it will resume next time.[/yellow]")
+            elif isinstance(result, BaseException):
+                console.print(f"[red]Error downloading file:[/] {result}")
+            else:
+                _record_download(result)
+                paths.append(result)
+
+        metrics["bytes_in"] = total_bytes
+        metrics["downloaded"] = len(jobs)
+        metrics["skipped"] = len(selected_indexes) - len(jobs)
+
+    _print_summary(paths, total_bytes, time.time() - start_time)
+    return paths
@@ -0,0 +1,98 @@
+# discogs/checkpoint.py
+
+import os
+import glob
+import shutil
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+MANIFEST_NAME = "checkpoint.json"  # Kept inside the chunked_<type> folder it describes
+MANIFEST_VERSION = 1
+
+
+def manifest_path(chunk_dir: Path) -> Path:
+    return chunk_dir / MANIFEST_NAME
+
+
+def source_state(path: Path) -> dict:
+    """
+    Identity of the dump a chunk folder was cut from; a changed dump invalidates the checkpoint.
+    """
+    stat = path.stat()
+    return {"name": path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _remove(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+@contextmanager
+def atomic_path(path: Path):
+    """
+    Yields a temporary path next to `path`; whatever was written there replaces `path`
+    in one rename when the block succeeds, and is removed when it fails. A crash at any
+    point leaves either the old file or the complete new one, never a torn one.
+    Folders work too: an old folder is renamed aside first and deleted after the swap
+    (a crash in between leaves no output, but still never a partial one).
+    """
+    for stale in path.parent.glob(glob.escape(path.name) + ".*.tmp"):
+        _remove(stale)  # Left by a run that was killed while writing
+    # Per process, so a worker orphaned by a killed run can never share a temp file with a new one
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        yield tmp_path
+        if tmp_path.is_dir() and path.is_dir():
+            # os.replace only moves a folder onto an empty one
+            old_path = path.with_name(f"{path.name}.{os.getpid()}.old.tmp")
+            os.replace(path, old_path)
+            os.replace(tmp_path, path)
+            _remove(old_path)
+        else:
+            os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            _remove(tmp_path)
+
+
+def load(chunk_dir: Path):
+    """
+    Returns the checkpoint manifest of a chunk folder, or None when there is none
+    (or it cannot be read, which just means starting over).
+    """
+    try:
+        with open(manifest_path(chunk_dir), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def save(chunk_dir: Path, manifest: dict):
+    """
+    Writes the manifest atomically (temp file + rename).
+    """
+    manifest["version"] = MANIFEST_VERSION
+    with atomic_path(manifest_path(chunk_dir)) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+
+def chunking_state(chunk_dir: Path, source: Path, records_per_file: int, oversized_bytes: int = None):
+    """
+    Returns the manifest of an earlier, matching chunking of `source` (same file, same
+    chunk size, same oversized-record limit), or None when the folder has to be rebuilt
+    from scratch.
+    """
+    manifest = load(chunk_dir)
+    if manifest is None or manifest.get("source") != source_state(source):
+        return None
+    if manifest.get("records_per_file") != records_per_file:
+        return None
+    if manifest.get("oversized_bytes") != oversized_bytes:
+        return None
+    return manifest
+
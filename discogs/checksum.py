@@ -0,0 +1,139 @@
+# discogs/checksum.py
+
+import os
+import re
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from discogs.http_client import get_session
+
+SIDECAR_SUFFIX = ".sha256"  # Written next to a dump once its digest matched the CHECKSUM file
+_READ_SIZE = 1024 * 1024
+
+
+class ChecksumMismatch(Exception):
+    """
+    A downloaded dump does not match the digest published in the month's CHECKSUM file.
+    """
+
+
+def parse_checksums(text: str) -> dict:
+    """
+    Parses a Discogs CHECKSUM file (sha256sum format: "<hex digest>  <filename>" per line).
+    Returns {filename: digest}.
+    """
+    checksums = {}
+    for line in text.splitlines():
+        match = re.match(r"([0-9a-fA-F]{64})\s+\*?(\S+)", line.strip())
+        if match:
+            checksums[Path(match.group(2)).name] = match.group(1).lower()
+    return checksums
+
+
+@lru_cache(maxsize=None)
+def fetch_checksums(url: str) -> dict:
+    """
+    Downloads and parses a CHECKSUM file (once per process). Returns {} when it is missing
+    or unreachable, so dumps without published digests can still be downloaded (just not verified).
+    """
+    try:
+        r = get_session().get(url, timeout=30)
+        r.raise_for_status()
+    except Exception:
+        return {}
+    return parse_checksums(r.text)
+
+
+def published_digest(checksum_url, filename: str) -> Optional[str]:
+    """
+    Returns the digest the month's CHECKSUM file lists for a dump, or None (also when the
+    listing has no CHECKSUM file for that month).
+    """
+    if not isinstance(checksum_url, str) or not checksum_url:
+        return None
+    return fetch_checksums(checksum_url).get(filename)
+
+
+def new_hash():
+    """
+    Returns a fresh hash object of the algorithm Discogs publishes (SHA-256).
+    """
+    return hashlib.sha256()
+
+
+def hash_range(fd: int, hasher, start: int, end: int):
+    """
+    Feeds bytes [start, end) of an open file into hasher. Used to catch up on a resumed
+    prefix once, or to follow segments that were written out of order.
+    """
+    while start < end:
+        if hasattr(os, "pread"):
+            block = os.pread(fd, min(_READ_SIZE, end - start), start)
+        else:
+            os.lseek(fd, start, os.SEEK_SET)
+            block = os.read(fd, min(_READ_SIZE, end - start))
+        if not block:
+            raise OSError(f"Unexpected end of file at byte {start}")
+        hasher.update(block)
+        start += len(block)
+
+
+def hash_file(path: Path, hasher=None, end: Optional[int] = None):
+    """
+    Hashes the first `end` bytes of a file (all of it by default) into hasher (a new one
+    if not given) and returns the hasher.
+    """
+    hasher = hasher or new_hash()
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        hash_range(fd, hasher, 0, os.fstat(fd).st_size if end is None else end)
+    finally:
+        os.close(fd)
+    return hasher
+
+
+def sidecar_path(gz_path: Path) -> Path:
+    """
+    Returns the verification record of a dump: <file>.sha256.
+    """
+    return gz_path.with_name(gz_path.name + SIDECAR_SUFFIX)
+
+
+def check(gz_path: Path, digest: str, expected: Optional[str]):
+    """
+    Compares a download's digest with the published one. On a match the digest is
+    recorded next to the file (sha256sum format); on a mismatch the file is removed
+    and ChecksumMismatch is raised. Nothing is recorded when no digest is published.
+    """
+    if not expected:
+        return
+    if digest != expected:
+        gz_path.unlink(missing_ok=True)
+        sidecar_path(gz_path).unlink(missing_ok=True)
+        raise ChecksumMismatch(f"{gz_path.name}: sha256 {digest[:12]}… does not match the published {expected[:12]}…")
+    with open(sidecar_path(gz_path), "w", encoding="utf-8") as f:
+        f.write(f"{digest}  {gz_path.name}\n")
+
+
+def verified_digest(gz_path: Path) -> Optional[str]:
+    """
+    Returns the digest recorded for a dump when it was verified, or None.
+    """
+    try:
+        text = sidecar_path(gz_path).read_text(encoding="utf-8")
+    except OSError:
+        return None
+    return parse_checksums(text).get(gz_path.name)
+
+
+def status(gz_path: Path, expected: Optional[str] = None) -> str:
+    """
+    Verification status of a downloaded dump: "verified" (a digest was recorded and, if
+    `expected` is given, still matches it), "mismatch" or "unverified" (no record).
+    """
+    recorded = verified_digest(gz_path)
+    if recorded is None:
+        return "unverified"
+    return "mismatch" if expected and recorded != expected else "verified"
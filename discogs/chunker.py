@@ -1,10 +1,14 @@
 # discogs/chunker.py
 
 import re
+import mmap
+import shutil
 from pathlib import Path
 from rich.console import Console
 from rich.progress import Progress, BarColumn, TimeElapsedColumn, TextColumn
 
+from discogs import telemetry, checkpoint
+
 
 def sanitize_line(line: str) -> str:
     """
@@ -16,80 +20,296 @@ def sanitize_line(line: str) -> str:
     return line
 
 
-def chunk_xml_by_type(xml_file: Path, content_type: str, records_per_file: int = 10000) -> Path:
+# What makes a record need sanitize_line: illegal control bytes (found by deleting every
+# other byte, which runs at memory speed), U+FFFE/U+FFFF, and '&' that doesn't start an entity.
+# Records without any of them are copied as-is.
+_NON_CONTROL_BYTES = bytes(b for b in range(256) if b in (0x09, 0x0A, 0x0D) or b >= 0x20)
+_BARE_AMPERSAND = re.compile(rb'&(?![a-zA-Z0-9#]+;)')
+
+
+def _needs_sanitize(data: bytes) -> bool:
+    return (
+        bool(data.translate(None, _NON_CONTROL_BYTES))
+        or b"\xef\xbf\xbe" in data or b"\xef\xbf\xbf" in data
+        or _BARE_AMPERSAND.search(data) is not None
+    )
+
+
+def sanitize_record(record: bytes) -> bytes:
+    """
+    Byte-level counterpart of sanitize_line for a whole record.
+    Only decodes and rewrites the record when it actually contains something to fix.
+    """
+    if not _needs_sanitize(record):
+        return record
+    return sanitize_line(record.decode("utf-8", errors="ignore")).encode("utf-8")
+
+
+def _find_open_tag(buf, pos: int, open_tag: bytes) -> int:
+    """
+    Finds the next `<tag` at or after pos that is really the tag (not a longer name
+    like `<releases` or `<release_date`). Returns -1 if there is none.
+    """
+    while True:
+        idx = buf.find(open_tag, pos)
+        if idx < 0:
+            return -1
+        follow = idx + len(open_tag)
+        if follow >= len(buf) or buf[follow:follow + 1] in (b" ", b"\t", b"\r", b"\n", b">", b"/"):
+            return idx
+        pos = follow
+
+
+def _find_record(buf, pos: int, open_tag: bytes, close_tag: bytes) -> tuple:
+    """
+    Locates the next complete record in buf starting at pos, tracking nested tags of the
+    same name (e.g. sublabels inside a label). Returns (start, end) byte offsets;
+    start is -1 when no record starts in buf, end is -1 when the record is incomplete.
+    """
+    start = _find_open_tag(buf, pos, open_tag)
+    if start < 0:
+        return -1, -1
+
+    gt = buf.find(b">", start)
+    if gt < 0:
+        return start, -1
+    if buf[gt - 1:gt] == b"/":  # <tag ... /> is a complete (empty) record
+        return start, gt + 1
+
+    depth = 1
+    scan = gt + 1
+    while True:
+        close = buf.find(close_tag, scan)
+        if close < 0:
+            return start, -1
+        nested = _find_open_tag(buf, scan, open_tag)
+        if 0 <= nested < close:
+            gt = buf.find(b">", nested)
+            if buf[gt - 1:gt] != b"/":
+                depth += 1
+            scan = gt + 1
+            continue
+        depth -= 1
+        scan = close + len(close_tag)
+        if depth == 0:
+            return start, scan
+
+
+def record_tags(content_type: str) -> tuple:
+    """
+    Returns the (open, close) byte markers of a content type's records, e.g. (b"<release", b"</release>").
+    """
+    record_tag = content_type[:-1].lower().encode()  # e.g., "releases" → "release"
+    return b"<" + record_tag, b"</" + record_tag + b">"
+
+
+def iter_record_spans(buf, content_type: str, pos: int = 0):
+    """
+    Yields the (start, end) byte offsets of every complete record in a buffer
+    (bytes or an mmap of an extracted dump), starting the search at byte pos.
+    """
+    open_tag, close_tag = record_tags(content_type)
+    while True:
+        start, end = _find_record(buf, pos, open_tag, close_tag)
+        if end < 0:
+            return
+        yield start, end
+        pos = end
+
+
+def iter_records(stream, content_type: str, read_size: int = 1024 * 1024):
+    """
+    Splits a binary XML stream into raw record byte strings (`<release ...>...</release>`).
+    Works on fixed-size reads, so record boundaries don't need to fall on line breaks.
+    While a record is larger than the buffer, each read doubles it instead, so a huge
+    record is searched and copied a logarithmic number of times rather than once per read.
+    """
+    open_tag, close_tag = record_tags(content_type)
+
+    buf = b""
+    while True:
+        data = stream.read(max(read_size, len(buf)))
+        buf += data
+        pos = 0
+        while True:
+            start, end = _find_record(buf, pos, open_tag, close_tag)
+            if end < 0:
+                break
+            yield buf[start:end]
+            pos = end
+
+        if not data:
+            return
+
+        # Keep the unfinished record (or a possible partial `<tag`) for the next read
+        keep = start if start >= 0 else max(pos, len(buf) - len(open_tag))
+        buf = buf[keep:]
+
+
+_DONTNEED = getattr(mmap, "MADV_DONTNEED", None)  # Not on every platform
+
+
+def _write_span(out, buf, start: int, end: int, piece_bytes: int = None) -> int:
+    """
+    Writes buf[start:end] through sanitize_record. With piece_bytes the span is copied
+    in pieces of at most about that size, each cut just before a `<`: sanitizing never
+    looks across a tag start, so the bytes written are the same as for the whole span.
+    The pages of an mmap are released as each piece is done, so the mapped file doesn't
+    pile up in resident memory either. Returns the number of bytes written.
+    """
+    if not piece_bytes:
+        data = sanitize_record(buf[start:end])
+        out.write(data)
+        return len(data)
+
+    written = 0
+    while start < end:
+        cut = end if end - start <= piece_bytes else buf.rfind(b"<", start + 1, start + piece_bytes)
+        if cut <= start:  # No tag in this piece (one huge text value): go on to the next one
+            cut = buf.find(b"<", start + piece_bytes, end)
+            cut = end if cut < 0 else cut
+        data = sanitize_record(buf[start:cut])
+        out.write(data)
+        written += len(data)
+        if _DONTNEED is not None and isinstance(buf, mmap.mmap):
+            first, last = start - start % mmap.PAGESIZE, cut - cut % mmap.PAGESIZE
+            if last > first:
+                buf.madvise(_DONTNEED, first, last - first)
+        start = cut
+    return written
+
+
+def _replay_records(xml_file: Path, content_type: str, end_offset: int, on_record):
+    """
+    Calls on_record for the records before end_offset, which an earlier, interrupted
+    run already chunked. Only searches for record boundaries; nothing is copied.
+    """
+    if not end_offset:
+        return
+    with open(xml_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start, end in iter_record_spans(mm, content_type):
+            if end > end_offset:
+                break
+            on_record(mm, start, end)
+
+
+def chunk_xml_by_type(xml_file: Path, content_type: str, records_per_file: int = 10000, memory: dict = None,
+                      on_record=None) -> Path:
     """
     Splits a large XML file into smaller, valid XML files (chunks).
     Each chunk contains up to `records_per_file` XML records.
+    The file is memory-mapped and record boundaries are found with byte searches,
+    so line breaks can fall anywhere; each chunk's span of records is copied in one
+    piece, without decoding, unless it contains characters that sanitize_line would fix.
+    With a memory plan (see discogs.memory) spans are copied in bounded pieces, and
+    every record larger than memory["oversized_bytes"] gets a chunk of its own, listed
+    in the manifest, so the converter can flatten it apart from the others.
+    Every chunk is written to a temp file and renamed into place, then recorded in the
+    folder's checkpoint manifest with the byte offset where the next chunk starts; an
+    interrupted run resumes from there (or does nothing if chunking had finished).
+    on_record(buf, start, end) is called for every record of the file, in order (the
+    records a resumed run already chunked are found again for it first), e.g. to hash
+    them while they are in memory anyway (see discogs.delta.hashing_records).
     Returns the folder path where chunked files are stored.
     """
-    record_tag = content_type[:-1].lower()  # e.g., "releases" → "release"
-    start_pat = re.compile(fr'<{record_tag}\b', re.IGNORECASE)  # Match opening tag
-    end_pat = re.compile(fr'</{record_tag}>', re.IGNORECASE)    # Match closing tag
-
     chunk_folder = xml_file.parent / f"chunked_{content_type}"  # Output folder
+    console = Console()
+
+    piece_bytes = memory and memory["piece_bytes"]
+    oversized_bytes = memory and memory["oversized_bytes"]
+
+    manifest = checkpoint.chunking_state(chunk_folder, xml_file, records_per_file, oversized_bytes)
+    if manifest is None:
+        # No usable checkpoint: whatever is in the folder belongs to another run
+        shutil.rmtree(chunk_folder, ignore_errors=True)
+        manifest = {"source": checkpoint.source_state(xml_file), "records_per_file": records_per_file,
+                    "oversized_bytes": oversized_bytes, "chunking": {"chunks": 0, "offset": 0, "done": False}}
     chunk_folder.mkdir(parents=True, exist_ok=True)
+    state = manifest["chunking"]
+    if on_record is not None:
+        _replay_records(xml_file, content_type, state["offset"], on_record)
+    if state["done"]:
+        console.print(f"[green]✔ Already chunked into {state['chunks']} file(s): {chunk_folder}")
+        return chunk_folder
+    if state["chunks"]:
+        console.print(f"[bold]↻ Resuming chunking[/] after {state['chunks']} chunk(s) at byte {state['offset']:,}")
+    for stray in chunk_folder.glob("chunk_*.xml"):
+        if int(stray.stem.split("_")[1]) > state["chunks"]:
+            stray.unlink()  # Never recorded, so possibly incomplete
 
-    console = Console()
-    chunk_count = 0
-    record_count = 0
-    inside_record = False
-    buffer_lines = []  # Stores lines of current XML record
-    current_chunk_file = None
-
-    # Helper function to open a new chunk file
-    def open_new_chunk():
-        nonlocal chunk_count, current_chunk_file, record_count
-        chunk_count += 1
-        chunk_path = chunk_folder / f"chunk_{chunk_count:05}.xml"
-        current_chunk_file = open(chunk_path, "w", encoding="utf-8")
-        current_chunk_file.write(f'<?xml version="1.0" encoding="utf-8"?>\n<{content_type}>\n')
-        record_count = 0
+    header = f'<?xml version="1.0" encoding="utf-8"?>\n<{content_type}>\n'.encode()
+    footer = f"\n</{content_type}>".encode()
+    total_size = xml_file.stat().st_size
 
-    # Helper function to close the current chunk file
-    def close_chunk():
-        nonlocal current_chunk_file
-        if current_chunk_file:
-            current_chunk_file.write(f"</{content_type}>")
-            current_chunk_file.close()
-            current_chunk_file = None
+    chunk_count = state["chunks"]
 
-    open_new_chunk()
+    # Helper function to write one chunk from a span of the source file, then checkpoint it
+    def write_chunk(buf, start, end, records):
+        nonlocal chunk_count
+        chunk_count += 1
+        with checkpoint.atomic_path(chunk_folder / f"chunk_{chunk_count:05}.xml") as tmp_path:
+            with open(tmp_path, "wb") as out:
+                out.write(header)
+                size = _write_span(out, buf, start, end, piece_bytes)
+                out.write(footer)
+        state.update(chunks=chunk_count, offset=end)
+        checkpoint.save(chunk_folder, manifest)
+        metrics["chunks"] = chunk_count
+        metrics["records"] += records
+        metrics["bytes_out"] += len(header) + size + len(footer)
 
     # Setup progress bar for visual feedback
-    with Progress(
+    with telemetry.stage(
+        "chunk", file=xml_file.name, bytes_in=total_size - state["offset"], bytes_out=0, records=0, chunks=0
+    ) as metrics, Progress(
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         "[progress.percentage]{task.percentage:.1f}%",
         "•",
         TimeElapsedColumn()
-    ) as progress:
-        task = progress.add_task(f"Chunking {xml_file.name}", total=xml_file.stat().st_size)
-
-        # Read and process XML file line by line
-        with xml_file.open("r", encoding="utf-8", errors="ignore") as f:
-            for raw_line in f:
-                line = sanitize_line(raw_line)
-                progress.update(task, advance=len(raw_line))
-
-                if not inside_record:
-                    # Detect start of a record
-                    if start_pat.search(line):
-                        inside_record = True
-                        buffer_lines = [line]
-                else:
-                    buffer_lines.append(line)
-                    if end_pat.search(line):
-                        # Write complete record to current chunk
-                        current_chunk_file.write("".join(buffer_lines) + "\n")
-                        record_count += 1
-                        inside_record = False
-                        buffer_lines = []
-
-                        # If chunk is full, start a new one
-                        if record_count >= records_per_file:
-                            close_chunk()
-                            open_new_chunk()
-
-    close_chunk()
+    ) as progress, open(xml_file, "rb") as f:
+        task = progress.add_task(f"Chunking {xml_file.name}", total=total_size, completed=state["offset"])
+
+        if total_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = state["offset"]
+                chunk_start = -1
+                record_count = 0
+
+                for start, end in iter_record_spans(mm, content_type, pos):
+                    if on_record is not None:
+                        on_record(mm, start, end)
+                    # An oversized record closes the current chunk and goes into one of its own
+                    if oversized_bytes and end - start > oversized_bytes:
+                        if record_count:
+                            write_chunk(mm, chunk_start, pos, record_count)
+                        state.setdefault("oversized", []).append(f"chunk_{chunk_count + 1:05}")
+                        write_chunk(mm, start, end, 1)
+                        metrics["oversized"] = len(state["oversized"])
+                        progress.update(task, completed=end)
+                        chunk_start = -1
+                        record_count = 0
+                        pos = end
+                        continue
+
+                    if chunk_start < 0:
+                        chunk_start = start
+                    record_count += 1
+                    pos = end
+
+                    # If chunk is full, write it out in one piece
+                    if record_count >= records_per_file:
+                        write_chunk(mm, chunk_start, end, record_count)
+                        progress.update(task, completed=end)
+                        chunk_start = -1
+                        record_count = 0
+
+                if record_count:
+                    write_chunk(mm, chunk_start, pos, record_count)
+
+        progress.update(task, completed=total_size)
+
+    state["done"] = True
+    checkpoint.save(chunk_folder, manifest)
     console.print(f"[green]✔ Chunked into {chunk_count} file(s): {chunk_folder}")
-    return chunk_folder
\ No newline at end of file
+    return chunk_folder
@@ -3,7 +3,6 @@
 import json
 from pathlib import Path
 from rich.console import Console
-from rich.prompt import Prompt
 
 CONFIG_PATH = Path.home() / ".discogs_config.json"  # Path to the user's config file
 DEFAULT_DOWNLOAD_PATH = Path.home() / "Downloads" / "Discogs"  # Default download location
@@ -61,6 +60,8 @@ def configure_download_folder() -> None:
     Prompts the user to configure the download folder via CLI.
     Updates the config if a new folder is provided.
     """
+    from rich.prompt import Prompt
+
     console.print("[bold]Configure Discogs download folder[/bold]")
     current = get_download_dir()
     console.print(f"Current folder: [green]{current}[/green]")
@@ -1,9 +1,17 @@
 # discogs/converter.py
 
 import shutil
-import json
 import csv
+import json
+import tempfile
+import os
+from contextlib import contextmanager, nullcontext
+from time import perf_counter, process_time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from json.encoder import encode_basestring_ascii
+from fnmatch import fnmatchcase
 from pathlib import Path
 from rich.console import Console
 from rich.progress import (
@@ -16,15 +24,178 @@ from rich.progress import (
     TransferSpeedColumn,
 )
 
+from discogs import telemetry, checkpoint
+from discogs.artifacts import record as record_artifact, find as find_artifacts
 from discogs.chunker import chunk_xml_by_type
+from discogs.indexer import chunk_records_by_id
+from discogs.normalizer import TABLES, normalize_chunk_job, merge_table_segments
+from discogs.parquet_writer import require_pyarrow, write_parquet
+from discogs.sqlite_writer import DEFAULT_CACHE_BYTES, write_sqlite
+from discogs.shards import write_parts
+from discogs.schema_catalog import load_schema, save_schema, dump_month
 
 console = Console()
 
-def _scan_columns(chunk_file: Path, record_tag: str, column_set: set):
+ENGINES = ("auto", "etree", "expat", "lxml")
+
+# Flattened column holding the record id in the wide layout; indexed in SQLite output
+ID_COLUMNS = {
+    "releases": "releases_release_id",
+    "masters": "masters_master_id",
+    "artists": "artist_id_id",
+    "labels": "label_id_id",
+}
+
+# Spill segments are read back with csv.reader, whose default 128 KB field limit a single
+# huge record (e.g. a release with thousands of tracks) easily exceeds
+csv.field_size_limit(2 ** 31 - 1)
+
+def _json_list(values: list) -> str:
+    """
+    Same output as json.dumps() for a list of strings, without the encoder setup per call.
+    """
+    return "[" + ", ".join(map(encode_basestring_ascii, values)) + "]"
+
+def _collapse(nested: dict) -> dict:
+    """
+    Turns {column: [values]} into a row: the single value, or a JSON list for repeated values.
+    """
+    return {k: v[0] if len(v) == 1 else _json_list(v) for k, v in nested.items()}  # Use first or serialize list
+
+def parse_projection(columns=None, exclude_columns=None):
+    """
+    Turns --columns / --exclude-columns values (comma-separated flattened key names,
+    glob patterns allowed, e.g. "release_title_title,artist_*") into an
+    (include, exclude) pair of pattern tuples, or None when nothing is projected.
+    """
+    def patterns(values):
+        return tuple(p.strip() for value in values or () for p in value.split(",") if p.strip())
+
+    include, exclude = patterns(columns), patterns(exclude_columns)
+    return (include, exclude) if include or exclude else None
+
+def _key_filter(projection):
+    """
+    Returns a key -> bool check for a projection (None when everything is kept).
+    Answers are cached per key, so each flattened name is matched against the patterns once.
+    """
+    if projection is None:
+        return None
+    include, exclude = projection
+    cache = {}
+
+    def wanted(key):
+        keep = cache.get(key)
+        if keep is None:
+            keep = cache[key] = (
+                (not include or any(fnmatchcase(key, p) for p in include))
+                and not any(fnmatchcase(key, p) for p in exclude)
+            )
+        return keep
+
+    return wanted
+
+def _glob_tokens(pattern: str) -> list:
+    """
+    Splits a glob pattern into "*", "?", "[...]" and literal character tokens.
+    """
+    tokens = []
+    i = 0
+    while i < len(pattern):
+        close = pattern.find("]", i + 2) if pattern[i] == "[" else -1
+        if close > 0:
+            tokens.append(pattern[i:close + 1])
+            i = close + 1
+        else:
+            tokens.append(pattern[i])
+            i += 1
+    return tokens
+
+def _glob_may_start_with(pattern: str, prefix: str) -> bool:
+    """
+    True when some string starting with prefix could match the glob pattern.
+    """
+    tokens = _glob_tokens(pattern)
+
+    def closure(states):
+        states = set(states)
+        for i in list(states):
+            while i < len(tokens) and tokens[i] == "*":
+                i += 1
+                states.add(i)
+        return states
+
+    states = closure({0})
+    for ch in prefix:
+        following = set()
+        for i in states:
+            if i == len(tokens):
+                continue
+            token = tokens[i]
+            if token == "*":
+                following.add(i)
+            elif token == "?" or token == ch or (len(token) > 1 and fnmatchcase(ch, token)):
+                following.add(i + 1)
+        states = closure(following)
+        if not states:
+            return False
+    return True
+
+def _prefix_filter(projection):
+    """
+    Returns a cached prefix -> bool check telling whether any key starting with prefix
+    can survive the projection. Include patterns are matched as globs; an exclude pattern
+    like "tracklist_*" rules out every key under its literal stem.
+    """
+    include, exclude = projection
+    stems = [p[:-1] for p in exclude if p.endswith("*") and not any(c in p[:-1] for c in "*?[")]
+    cache = {}
+
+    def opens(prefix):
+        keep = cache.get(prefix)
+        if keep is None:
+            keep = cache[prefix] = (
+                (not include or any(_glob_may_start_with(p, prefix) for p in include))
+                and not any(prefix.startswith(stem) for stem in stems)
+            )
+        return keep
+
+    return opens
+
+def _lxml():
+    """
+    Returns lxml.etree, or None when lxml isn't installed.
+    """
+    try:
+        from lxml import etree
+        return etree
+    except ImportError:
+        return None
+
+def resolve_engine(engine: str) -> str:
+    """
+    Maps an --engine value to an installed parsing backend.
+    "auto" picks expat (stdlib, fastest here); "lxml" falls back to expat when lxml is missing.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (expected one of {', '.join(ENGINES)})")
+    if engine == "auto":
+        return "expat"
+    if engine == "lxml" and _lxml() is None:
+        console.print("[yellow]⚠ lxml is not installed; falling back to the expat engine.[/yellow]")
+        return "expat"
+    return engine
+
+def _scan_columns(chunk_file: Path, record_tag: str, column_set: set, engine: str = "etree", projection=None):
     """
     Scans an XML chunk file to identify all unique tag paths and attributes.
     Adds these as potential CSV columns.
     """
+    if engine != "etree" or projection is not None:
+        for record in _iter_records(chunk_file, record_tag, engine, projection):
+            column_set.update(record)
+        return
+
     current_path = []
     for event, elem in ET.iterparse(chunk_file, events=("start", "end")):
         if event == "start":
@@ -41,120 +212,888 @@ def _scan_columns(chunk_file: Path, record_tag: str, column_set: set):
             current_path.pop()
             elem.clear()
 
-def _write_rows(chunk_file: Path, writer: csv.DictWriter, columns: list, record_tag: str):
+def _iter_records_etree(source, record_tag: str, projection=None):
     """
-    Parses an XML chunk and writes each record as a CSV row using the given column list.
+    ElementTree engine: walks start/end events and builds the flattened record.
     """
+    wanted = _key_filter(projection)
     current_path = []
-    record_data = {}
     nested = {}
 
-    for event, elem in ET.iterparse(chunk_file, events=("start", "end")):
+    for event, elem in ET.iterparse(source, events=("start", "end")):
         if event == "start":
             current_path.append(elem.tag)
             # Collect attribute values
             for attr, val in elem.attrib.items():
                 key = "_".join(current_path[-2:] + [attr]) if len(current_path) >= 2 else f"{elem.tag}_{attr}"
-                nested.setdefault(key, []).append(val)
+                if wanted is None or wanted(key):
+                    nested.setdefault(key, []).append(val)
         elif event == "end":
             if elem.text and not elem.text.isspace():
                 # Collect text values
                 key = "_".join(current_path[-2:] + [elem.tag]) if len(current_path) >= 2 else elem.tag
-                nested.setdefault(key, []).append(elem.text.strip())
+                if wanted is None or wanted(key):
+                    nested.setdefault(key, []).append(elem.text.strip())
 
-            # End of a full record → flush it to CSV
+            # End of a full record → hand it to the caller
             if elem.tag == record_tag:
-                for k, v in nested.items():
-                    record_data[k] = v[0] if len(v) == 1 else json.dumps(v)  # Use first or serialize list
-                writer.writerow({col: record_data.get(col, "") for col in columns})
-                record_data.clear()
+                yield _collapse(nested)
                 nested.clear()
 
             current_path.pop()
             elem.clear()
 
-from time import perf_counter
+def _iter_records_expat(source, record_tag: str, projection=None, read_size: int = 1024 * 1024):
+    """
+    Expat engine: a SAX-style handler that builds only the flattened record,
+    without creating an Element per tag. Matches the ElementTree engine exactly:
+    an element's text is the character data before its first child.
+    """
+    wanted = _key_filter(projection)
+    stack = []  # [tag, column prefix, text frozen when the first child starts(, wanted text key, children wanted)]
+    nested = {}
+    records = []
+    text = ""
+
+    def start(tag, attrs):
+        nonlocal text
+        if stack:
+            parent = stack[-1]
+            if parent[2] is None:
+                parent[2] = text
+            prefix = parent[0] + "_" + tag
+        else:
+            prefix = tag
+        stack.append([tag, prefix, None])
+        text = ""
+        for attr, val in attrs.items():
+            key = prefix + "_" + attr
+            if key in nested:
+                nested[key].append(val)
+            else:
+                nested[key] = [val]
+
+    def characters(data):
+        nonlocal text
+        text += data
+
+    def end(tag):
+        nonlocal text
+        _, prefix, own_text = stack.pop()
+        if own_text is None:
+            own_text = text
+        text = ""
+        if own_text and not own_text.isspace():
+            key = prefix + "_" + tag if stack else tag
+            if key in nested:
+                nested[key].append(own_text.strip())
+            else:
+                nested[key] = [own_text.strip()]
+        if tag == record_tag:
+            records.append(_collapse(nested))
+            nested.clear()
+
+    # Projected handlers. Every key an element produces starts with its parent's tag, so
+    # below a parent that no wanted key can start with (see _prefix_filter) the handlers
+    # only track nesting. Character data is switched off outside elements whose text is
+    # wanted, so expat never hands the text of unrequested subtrees to Python.
+    opens = _prefix_filter(projection) if projection is not None else None
+    collecting = True
+
+    def start_projected(tag, attrs):
+        nonlocal text, collecting
+        if stack:
+            parent = stack[-1]
+            if parent[2] is None:
+                parent[2] = text
+            if not parent[4]:
+                stack.append([tag, None, "", None, opens(tag + "_")])
+                text = ""
+                if collecting:
+                    parser.CharacterDataHandler = None
+                    collecting = False
+                return
+            prefix = parent[0] + "_" + tag
+            text_key = prefix + "_" + tag
+        else:
+            prefix = text_key = tag
+        if not wanted(text_key):
+            text_key = None
+        stack.append([tag, prefix, None, text_key, opens(tag + "_")])
+        text = ""
+        if collecting != bool(text_key):
+            parser.CharacterDataHandler = characters if text_key else None
+            collecting = bool(text_key)
+        for attr, val in attrs.items():
+            key = prefix + "_" + attr
+            if not wanted(key):
+                continue
+            if key in nested:
+                nested[key].append(val)
+            else:
+                nested[key] = [val]
+
+    def end_projected(tag):
+        nonlocal text, collecting
+        _, _, own_text, text_key, _ = stack.pop()
+        if own_text is None:
+            own_text = text
+        text = ""
+        if collecting:  # Text after a child is never an element's own text
+            parser.CharacterDataHandler = None
+            collecting = False
+        if text_key and own_text and not own_text.isspace():
+            if text_key in nested:
+                nested[text_key].append(own_text.strip())
+            else:
+                nested[text_key] = [own_text.strip()]
+        if tag == record_tag:
+            records.append(_collapse(nested))
+            nested.clear()
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.buffer_size = 64 * 1024
+    if wanted is None:
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = characters
+    else:
+        parser.StartElementHandler = start_projected
+        parser.EndElementHandler = end_projected
+        parser.CharacterDataHandler = characters
+
+    f = source if hasattr(source, "read") else open(source, "rb")
+    try:
+        while True:
+            data = f.read(read_size)
+            parser.Parse(data, not data)
+            yield from records
+            records.clear()
+            if not data:
+                break
+    finally:
+        if f is not source:
+            f.close()
+
+def _iter_records_lxml(source, record_tag: str, projection=None):
+    """
+    lxml engine: iterparse filtered on the record tag, so only record boundaries reach
+    Python; each finished record subtree is then walked in document order.
+    """
+    wanted = _key_filter(projection)
+    etree = _lxml()
+    nested = {}
+    records = []
+
+    def walk(elem, parent_tag):
+        tag = elem.tag
+        prefix = f"{parent_tag}_{tag}" if parent_tag else tag
+        for attr, val in elem.attrib.items():
+            key = f"{prefix}_{attr}"
+            if wanted is None or wanted(key):
+                nested.setdefault(key, []).append(val)
+        for child in elem:
+            walk(child, tag)
+        text = elem.text
+        if text and not text.isspace():
+            key = f"{prefix}_{tag}" if parent_tag else tag
+            if wanted is None or wanted(key):
+                nested.setdefault(key, []).append(text.strip())
+        if tag == record_tag:
+            records.append(_collapse(nested))
+            nested.clear()
+
+    if isinstance(source, Path):
+        source = str(source)
+
+    depth = 0
+    for event, elem in etree.iterparse(source, events=("start", "end"), tag=record_tag,
+                                       remove_comments=True, remove_pis=True, huge_tree=True):
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 0:
+            parent = elem.getparent()
+            walk(elem, parent.tag if parent is not None else None)
+            yield from records
+            records.clear()
+
+            # Free the finished record and everything before it
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+_RECORD_ENGINES = {
+    "etree": _iter_records_etree,
+    "expat": _iter_records_expat,
+    "lxml": _iter_records_lxml,
+}
 
-def convert_chunks_to_csv(chunk_dir: Path, output_csv: Path, content_type: str):
+def _iter_records(source, record_tag: str, engine: str = "etree", projection=None):
     """
-    Converts all chunked XML files in a given folder into a single CSV file.
-    The function discovers all columns, parses each chunk, and writes rows.
+    Parses an XML chunk (path or binary file object) and yields each record as a flat
+    {column: value} dict. Repeated values are serialized as a JSON list, single values
+    are kept as-is. Every engine yields identical records.
+    With a projection (see parse_projection) unwanted keys are dropped while parsing,
+    before their values are stripped, collected or serialized.
     """
-    record_tag = content_type[:-1]  # e.g. "releases" → "release"
-    chunks = sorted(chunk_dir.glob("chunk_*.xml"))
+    return _RECORD_ENGINES[engine](source, record_tag, projection)
 
-    if not chunks:
-        console.print(f"[red]No XML chunks found in {chunk_dir}[/red]")
-        return
+def _write_rows(chunk_file: Path, writer: csv.DictWriter, columns: list, record_tag: str, engine: str = "etree",
+                projection=None):
+    """
+    Parses an XML chunk and writes each record as a CSV row using the given column list.
+    Returns the number of rows written.
+    """
+    rows = 0
+    for record in _iter_records(chunk_file, record_tag, engine, projection):
+        writer.writerow({col: record.get(col, "") for col in columns})
+        rows += 1
+    return rows
 
-    start_time = perf_counter()
+def _spill_chunk(chunk_file: Path, segment_path: Path, record_tag: str, engine: str = "etree",
+                 projection=None, known_columns=None) -> tuple:
+    """
+    Single-pass variant of _write_rows: writes each record of a chunk to a spill segment
+    without knowing the final column set. Columns are indexed in the order they are first
+    seen, so earlier rows are simply shorter. known_columns (e.g. from the schema catalog)
+    are indexed up front, in order, and only new keys get appended after them.
+    The segment is written to a temp file and renamed into place once complete.
+    Returns the segment's column list, row count, the columns actually present and
+    whether every row was written at the final width (no column was added after the
+    first row), which is what lets the merge copy the segment as-is.
+    """
+    columns = list(known_columns or ())
+    index = {col: i for i, col in enumerate(columns)}
+    unseen = set(columns)
+    rows = 0
+    first_width = None
 
-    # Step 1: Scan all chunks to detect all column names
-    column_set = set()
-    console.print("[bold]Step 1:[/] Scanning tags...")
+    with checkpoint.atomic_path(segment_path) as tmp_path, open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for record in _iter_records(chunk_file, record_tag, engine, projection):
+            for key in record:
+                if key not in index:
+                    index[key] = len(columns)
+                    columns.append(key)
+            if unseen:
+                unseen.difference_update(record)
+            row = [""] * len(columns)
+            for key, value in record.items():
+                row[index[key]] = value
+            writer.writerow(row)
+            rows += 1
+            if first_width is None:
+                first_width = len(row)  # Rows only ever get wider, so the first one is the narrowest
+
+    present = [col for col in columns if col not in unseen] if unseen else columns
+    return columns, rows, present, first_width is None or first_width == len(columns)
+
+def _spill_chunk_job(chunk_file: Path, segment_path: Path, record_tag: str, engine: str = "etree",
+                     projection=None, known_columns=None) -> dict:
+    """
+    Process-pool entry point around _spill_chunk.
+    Also reports which worker handled the chunk, how long it took and its peak RSS.
+    """
+    start, cpu_start = perf_counter(), process_time()
+    telemetry.start_job_peak()
+    columns, rows, present, full_width = _spill_chunk(chunk_file, segment_path, record_tag, engine, projection,
+                                                      known_columns)
+    return {
+        "columns": columns,
+        "present": present,
+        "full_width": full_width,
+        "rows": rows,
+        "seconds": perf_counter() - start,
+        "cpu_seconds": process_time() - cpu_start,
+        "worker": os.getpid(),
+        "peak_rss_mb": telemetry.job_peak_mb(),
+    }
+
+def _iter_merged_rows(segments: list, columns: list):
+    """
+    Yields the rows of all spill segments, in order, remapped onto `columns`.
+    Segment columns missing from `columns` (never filled in) are dropped.
+    Each segment is deleted once it has been read, to free disk space early.
+    """
+    position = {col: i for i, col in enumerate(columns)}
+    trash = len(columns)
+
+    for segment_path, seg_columns, _, _ in segments:
+        targets = [position.get(col, trash) for col in seg_columns]
+        with open(segment_path, "r", newline="", encoding="utf-8") as f:
+            if seg_columns == columns:  # Already in order (a schema catalog hit): only pad short rows
+                for values in csv.reader(f):
+                    if len(values) < trash:
+                        values += [""] * (trash - len(values))
+                    yield values
+            else:
+                for values in csv.reader(f):
+                    row = [""] * (len(columns) + 1)
+                    for target, value in zip(targets, values):
+                        row[target] = value
+                    del row[trash]
+                    yield row
+        segment_path.unlink()
+
+def spill_segments(segment_paths: list, jobs: list) -> list:
+    """
+    Pairs spill segment paths with their job results as the (path, columns, columns
+    present, full width) tuples _merge_segments takes. Completion records written before
+    full_width was tracked count as not full width, which only costs the copy.
+    """
+    return [(segment_path, job["columns"], job["present"], job.get("full_width", False))
+            for segment_path, job in zip(segment_paths, jobs)]
+
+def segments_copyable(segments: list, columns: list) -> bool:
+    """
+    True when every segment already holds full-width rows in exactly `columns` order,
+    so CSV segments can be concatenated byte for byte.
+    """
+    return all(seg_columns == columns and full_width for _, seg_columns, _, full_width in segments)
+
+def _merge_segments(segments: list, output_path: Path, output_format: str = "csv", batch_bytes: int = None,
+                    content_type: str = None, shards: dict = None) -> list:
+    """
+    Concatenates spill segments, in order, into the final CSV (or Parquet file).
+    Each segment is a (path, columns, columns present, full width) tuple (see
+    spill_segments); rows are remapped onto the sorted union of the present columns and
+    short rows padded, which yields exactly the file the two-pass scan-then-write path
+    produces. When every segment was already written in that exact column order (a schema
+    catalog hit) with no row short of it, CSV segments are copied byte for byte.
+    The output only appears under its name once it is complete. batch_bytes bounds the
+    text per Parquet record batch (see write_parquet). SQLite output is one table named
+    after content_type, indexed on its record id. With a shard spec (see discogs.shards)
+    output_path is a folder of part files plus their manifest. Returns the columns written.
+    """
+    with checkpoint.atomic_path(output_path) as tmp_path:
+        return _merge_segments_into(segments, tmp_path, output_format, batch_bytes, content_type, shards)
+
+def _merge_segments_into(segments: list, output_path: Path, output_format: str, batch_bytes: int = None,
+                         content_type: str = None, shards: dict = None) -> list:
+    columns = sorted(set().union(*(present for _, _, present, _ in segments)))
+
+    if shards:
+        write_parts(_iter_merged_rows(segments, columns), columns, output_path, output_format, shards["bytes"],
+                    shards["rows"], ID_COLUMNS.get(content_type), batch_bytes, content_type)
+        return columns
 
-    with Progress(
+    if output_format == "csv" and segments_copyable(segments, columns):
+        with open(output_path, "w", newline="", encoding="utf-8") as out:
+            csv.writer(out).writerow(columns)
+            for segment_path, _, _, _ in segments:
+                with open(segment_path, "r", newline="", encoding="utf-8") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+                segment_path.unlink()
+        return columns
+
+    rows = _iter_merged_rows(segments, columns)
+    if output_format == "parquet":
+        write_parquet(rows, columns, output_path, batch_bytes=batch_bytes)
+    elif output_format == "sqlite":
+        id_column = ID_COLUMNS.get(content_type)
+        write_sqlite(rows, columns, output_path, content_type or "records",
+                     index_columns=[id_column] if id_column in columns else [],
+                     cache_bytes=min(batch_bytes or DEFAULT_CACHE_BYTES, DEFAULT_CACHE_BYTES))
+    else:
+        with open(output_path, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            writer.writerows(rows)
+
+    return columns
+
+def _progress() -> Progress:
+    return Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         "[progress.percentage]{task.percentage:.1f}%",
         "•",
         TimeElapsedColumn()
-    ) as p:
+    )
+
+def _convert_two_pass(chunks: list, output_csv: Path, record_tag: str, engine: str = "etree", projection=None,
+                      timings: dict = None) -> list:
+    """
+    Original conversion path: scans every chunk for columns, then parses it again to write rows.
+    The scan time is recorded in timings["scan_seconds"]. Returns the columns written.
+    """
+    # Step 1: Scan all chunks to detect all column names
+    column_set = set()
+    console.print("[bold]Step 1:[/] Scanning tags...")
+    scan_start = perf_counter()
+
+    with telemetry.stage("scan", chunks=len(chunks)), _progress() as p:
         task = p.add_task("Scanning...", total=len(chunks))
         for chunk in chunks:
-            _scan_columns(chunk, record_tag, column_set)
+            _scan_columns(chunk, record_tag, column_set, engine, projection)
             p.update(task, advance=1)
 
     columns = sorted(column_set)
+    if timings is not None:
+        timings["scan_seconds"] = perf_counter() - scan_start
 
     # Step 2: Write rows into CSV
     console.print(f"[bold]Step 2:[/] Writing [green]{output_csv.name}[/green] with {len(columns)} columns...")
 
-    with open(output_csv, "w", newline="", encoding="utf-8") as f:
+    with telemetry.stage("write", chunks=len(chunks)), checkpoint.atomic_path(output_csv) as tmp_path, \
+            open(tmp_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=columns)
         writer.writeheader()
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            "[progress.percentage]{task.percentage:.1f}%",
-            "•",
-            TimeElapsedColumn()
-        ) as p:
+        with _progress() as p:
             task = p.add_task("Converting...", total=len(chunks))
             for chunk in chunks:
-                _write_rows(chunk, writer, columns, record_tag)
+                telemetry.count(records=_write_rows(chunk, writer, columns, record_tag, engine, projection))
                 p.update(task, advance=1)
 
-    duration = perf_counter() - start_time
-    output_size_mb = output_csv.stat().st_size / (1024 * 1024)
+    return columns
+
+def _report_workers(jobs: list, wall_seconds: float):
+    """
+    Prints the parallel speedup and the per-worker throughput of a conversion run.
+    Speedup is the CPU time spent flattening divided by the wall time it took.
+    """
+    cpu_seconds = sum(job["cpu_seconds"] for job in jobs)
+    speedup = cpu_seconds / wall_seconds if wall_seconds else 0.0
+    console.print(f"[bold white]⚡ Speedup:[/] {speedup:.2f}x ({cpu_seconds:.1f}s of CPU work in {wall_seconds:.1f}s)")
+
+    per_worker = {}
+    for job in jobs:
+        stats = per_worker.setdefault(job["worker"], {"chunks": 0, "rows": 0, "seconds": 0.0})
+        stats["chunks"] += 1
+        stats["rows"] += job["rows"]
+        stats["seconds"] += job["seconds"]
+
+    for n, stats in enumerate(per_worker.values(), start=1):
+        rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+        console.print(f"   worker {n}: {stats['chunks']} chunks • {stats['rows']} records • {rate:,.0f} records/s")
+
+def _run_chunk_jobs(job, chunks: list, segment_paths: list, job_args: tuple, workers: int, on_done=None,
+                    alone=()) -> list:
+    """
+    Runs `job(chunk, segment_path, *job_args)` for every chunk, in a process pool when
+    workers > 1, with a progress bar. on_done(i, result) is called as each job finishes.
+    Chunks whose index is in `alone` (oversized records, see discogs.memory) run one
+    at a time in this process once the pool has exited, so they never share the
+    memory budget with other workers. Returns the job results in chunk order.
+    """
+    jobs = [None] * len(chunks)
+    pooled = [i for i in range(len(chunks)) if i not in alone]
+
+    def finish(i, result):
+        jobs[i] = result
+        if on_done:
+            on_done(i, result)
+        p.update(task, advance=1)
+
+    step_start = perf_counter()
+    with telemetry.stage("flatten", chunks=len(chunks), workers=workers), _progress() as p:
+        task = p.add_task("Converting...", total=len(chunks))
+        if workers > 1 and pooled:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(job, chunks[i], segment_paths[i], *job_args): i for i in pooled}
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+                    telemetry.worker_peak(jobs[futures[future]].get("peak_rss_mb"), workers)
+        else:
+            for i in pooled:
+                finish(i, job(chunks[i], segment_paths[i], *job_args))
+        for i in sorted(alone):
+            finish(i, job(chunks[i], segment_paths[i], *job_args))
+        telemetry.count(records=sum(job["rows"] for job in jobs))
+    step_seconds = perf_counter() - step_start
+
+    if workers > 1 and jobs:
+        _report_workers(jobs, step_seconds)
+    return jobs
+
+def _done_path(segment_path: Path) -> Path:
+    return segment_path.with_name(segment_path.name + ".done.json")
+
+def _segment_done(segment_path: Path):
+    """
+    Returns the recorded job result of a finished segment, or None when the chunk still
+    has to be converted (never finished, or its segment was already merged away).
+    """
+    try:
+        with open(_done_path(segment_path), "r", encoding="utf-8") as f:
+            done = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all((segment_path / name if name else segment_path).exists() for name in done["files"]):
+        return None
+    return done["result"]
+
+def _checkpointed_jobs(job, chunks: list, segment_paths: list, job_args: tuple, workers: int, resume: bool) -> list:
+    """
+    _run_chunk_jobs for a checkpointed chunk folder: chunks whose segment was recorded as
+    finished by an earlier, interrupted run are skipped, and every newly finished segment
+    (already renamed into place by its job) gets a small completion record next to it.
+    Chunks the manifest lists as oversized records are flattened on their own.
+    Returns the job results in chunk order.
+    """
+    jobs = [_segment_done(path) for path in segment_paths] if resume else [None] * len(chunks)
+    todo = [i for i, result in enumerate(jobs) if result is None]
+    if len(todo) < len(chunks):
+        console.print(f"[bold]↻ Resuming:[/] {len(chunks) - len(todo)}/{len(chunks)} chunks already converted")
+
+    def record(i, result):
+        segment_path = segment_paths[todo[i]]
+        files = sorted(f.name for f in segment_path.iterdir()) if segment_path.is_dir() else [""]
+        with checkpoint.atomic_path(_done_path(segment_path)) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"result": result, "files": files}, f)
+
+    manifest = checkpoint.load(chunks[0].parent) if chunks else None
+    oversized = set(manifest["chunking"].get("oversized", ())) if manifest else set()
+    alone = {n for n, i in enumerate(todo) if chunks[i].stem in oversized}
+    if alone:
+        console.print(f"[bold]🐘 {len(alone)} oversized record(s)[/] will be flattened one at a time after the others")
+
+    results = _run_chunk_jobs(job, [chunks[i] for i in todo], [segment_paths[i] for i in todo], job_args, workers,
+                              on_done=record, alone=alone)
+    for i, result in zip(todo, results):
+        jobs[i] = result
+    return jobs
+
+@contextmanager
+def _segment_folder(chunks: list, output_dir: Path, key: dict):
+    """
+    Yields (segment folder, resume) for a conversion. Chunks cut by chunk_xml_by_type
+    carry a checkpoint manifest: their segments are kept in <chunk folder>/segments and
+    survive a crash, so the next run with the same settings resumes (resume=True).
+    Other chunk folders get a temporary segment folder next to the output, as before.
+    Either way the segments are gone once the conversion has finished.
+    """
+    chunk_dir = chunks[0].parent
+    manifest = checkpoint.load(chunk_dir)
+    if manifest is None or not manifest.get("chunking", {}).get("done"):
+        with tempfile.TemporaryDirectory(prefix=".segments_", dir=output_dir) as tmp:
+            yield Path(tmp), False
+        return
+
+    segment_dir = chunk_dir / "segments"
+    resume = manifest.get("conversion") == key and segment_dir.is_dir()
+    if not resume:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        manifest["conversion"] = key
+        checkpoint.save(chunk_dir, manifest)
+    segment_dir.mkdir(exist_ok=True)
+    yield segment_dir, resume
+    shutil.rmtree(segment_dir, ignore_errors=True)
+    manifest.pop("conversion", None)
+    checkpoint.save(chunk_dir, manifest)
+
+def _convert_single_pass(chunks: list, output_path: Path, record_tag: str, workers: int = 1,
+                         output_format: str = "csv", engine: str = "etree", projection=None,
+                         known_columns=None, timings: dict = None, write_bytes: int = None, shards: dict = None) -> list:
+    """
+    Parses every chunk once, spilling rows to per-chunk segments while the schema evolves,
+    then merges the segments under the final sorted header.
+    With workers > 1 the chunks are flattened in a process pool; segments are still
+    merged in chunk order, so the output matches the serial run exactly.
+    known_columns seeds every segment's column order (see _spill_chunk); when no new
+    column shows up the merge is a plain copy. Merge time and whether the segments
+    were copied are recorded in timings. Chunks from a checkpointed folder resume
+    where an interrupted run stopped (see _segment_folder). write_bytes bounds the
+    Parquet record batches of the merge; shards splits the output into parts (see
+    discogs.shards). Returns the columns written.
+    """
+    key = {"layout": "wide", "record_tag": record_tag, "projection": projection and [list(p) for p in projection],
+           "known_columns": known_columns and list(known_columns)}
+    with _segment_folder(chunks, output_path.parent, key) as (segment_dir, resume):
+        segment_paths = [segment_dir / f"{chunk.stem}.csv" for chunk in chunks]
+
+        # Step 1: Parse each chunk once into a spill segment
+        if workers > 1:
+            console.print(f"[bold]Step 1:[/] Converting chunks (single pass, {workers} workers)...")
+        else:
+            console.print("[bold]Step 1:[/] Converting chunks (single pass)...")
+        jobs = _checkpointed_jobs(_spill_chunk_job, chunks, segment_paths,
+                                  (record_tag, engine, projection, known_columns), workers, resume)
+
+        # Step 2: Merge segments in chunk order under the final header
+        console.print(f"[bold]Step 2:[/] Merging {len(jobs)} segments into [green]{output_path.name}[/green]...")
+        segments = spill_segments(segment_paths, jobs)
+        merge_start = perf_counter()
+        with telemetry.stage("merge", segments=len(segments)):
+            columns = _merge_segments(segments, output_path, output_format, write_bytes,
+                                      content_type=f"{record_tag}s", shards=shards)  # e.g. "release" → "releases"
+        if timings is not None:
+            timings["merge_seconds"] = perf_counter() - merge_start
+            timings["merge_copied"] = output_format == "csv" and not shards and segments_copyable(segments, columns)
+        return columns
+
+def _convert_normalized(chunks: list, output_dir: Path, content_type: str, workers: int = 1,
+                        output_format: str = "csv", write_bytes: int = None) -> dict:
+    """
+    Writes the chunks as a parent table plus child tables keyed by record id
+    (see discogs.normalizer.TABLES), one CSV (or Parquet) file per table inside output_dir.
+    Returns {table name: output path}.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with _segment_folder(chunks, output_dir, {"layout": "normalized", "content_type": content_type}) as (tmp, resume):
+        segment_dirs = [tmp / chunk.stem for chunk in chunks]
+
+        # Step 1: Split each chunk into per-table segments
+        console.print(f"[bold]Step 1:[/] Normalizing chunks{f' ({workers} workers)' if workers > 1 else ''}...")
+        _checkpointed_jobs(normalize_chunk_job, chunks, segment_dirs, (content_type,), workers, resume)
+
+        # Step 2: Concatenate segments in chunk order
+        console.print(f"[bold]Step 2:[/] Merging tables into [green]{output_dir.name}/[/green]...")
+        with telemetry.stage("merge", segments=len(segment_dirs)):
+            return merge_table_segments(segment_dirs, output_dir, content_type, output_format, write_bytes)
 
-    # Final status output
-    console.print(f"\n[green]✔ CSV saved:[/] {output_csv}")
-    console.print("[bold green]✔ Conversion completed[/bold green]")
-    console.print(f"[bold white]📄 Chunks processed:[/] {len(chunks)} files")
-    console.print(f"[bold white]🧩 Output CSV:[/] {output_csv.name}")
-    console.print(f"[bold white]💾 Output size:[/] {output_size_mb:.2f} MB")
-    console.print(f"[bold white]🗂 Saved to:[/] {output_csv.parent}")
-    console.print(f"[bold white]⏱ Duration:[/] {duration:.1f} seconds")
+def resolve_workers(workers: int) -> int:
+    """
+    Normalizes a --workers value: 0 or less means one worker per CPU core.
+    """
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+LAYOUTS = ("wide", "normalized")
+FORMATS = ("csv", "parquet", "sqlite")
+
+def layout_output_path(output_csv: Path, layout: str, output_format: str = "csv", shards: dict = None) -> Path:
+    """
+    Where a layout writes its result: the CSV (or .parquet / .sqlite) file itself for "wide",
+    a folder of table files next to it (same name, no suffix) for "normalized", and a
+    <name>.csv.parts (or .parquet.parts) folder of part files for sharded output.
+    """
+    if layout == "normalized":
+        return output_csv.with_suffix("")
+    if shards:
+        return output_csv.with_name(f"{output_csv.stem}.{output_format}.parts")
+    return output_csv.with_suffix(f".{output_format}")
 
-def convert_xml_to_csv(xml_path: Path, content_type: str) -> Path:
+def output_size(path: Path) -> int:
     """
-    Full pipeline: chunk an XML file and convert the chunks to a CSV file.
-    Temporary chunked files are deleted after the process.
+    Size of an output file, or of all files in an output folder.
+    """
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+    return path.stat().st_size
+
+def check_output_options(layout: str, output_format: str, projection=None, shards: dict = None):
+    """
+    Validates layout/format values, raising ValueError for unknown ones (or a column
+    projection on the normalized layout, whose tables have fixed columns, or sharding
+    anything but wide CSV or Parquet) and RuntimeError when Parquet is requested
+    without pyarrow installed.
+    """
+    if projection is not None and layout == "normalized":
+        raise ValueError("--columns/--exclude-columns only apply to the wide layout")
+    if shards and (layout != "wide" or output_format == "sqlite"):
+        raise ValueError("--shard-size/--shard-rows only apply to the wide layout in csv or parquet")
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout} (expected one of {', '.join(LAYOUTS)})")
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown format: {output_format} (expected one of {', '.join(FORMATS)})")
+    if output_format == "parquet":
+        require_pyarrow()
+
+def convert_chunks_to_csv(chunk_dir: Path, output_csv: Path, content_type: str, single_pass: bool = True,
+                          workers: int = 1, layout: str = "wide", output_format: str = "csv", engine: str = "auto",
+                          projection=None, known_columns=None, timings: dict = None, memory: dict = None,
+                          shards: dict = None):
+    """
+    Converts all chunked XML files in a given folder into a single CSV file.
+    By default each chunk is parsed once and columns are discovered while writing;
+    with single_pass=False the chunks are scanned for columns first and then parsed again.
+    workers > 1 flattens chunks in parallel processes (single-pass mode only).
+    All modes produce byte-identical output.
+
+    layout="normalized" instead writes a parent table plus child tables keyed by the
+    record id into a folder next to output_csv (see layout_output_path).
+    output_format="parquet" writes Parquet files (bounded record batches) instead of CSV,
+    output_format="sqlite" a SQLite database per file (bulk-loaded, then indexed on the record id).
+    engine picks the XML parsing backend for the wide layout (see ENGINES / resolve_engine).
+    projection keeps only the matching flattened columns (see parse_projection).
+    known_columns (from the schema catalog) lets the wide layout skip the column scan:
+    segments are written in that column order and only widened when new paths show up.
+    memory is a --max-memory plan (see discogs.memory): its worker count replaces
+    `workers`, and Parquet batches are flushed by size.
+    shards (see discogs.shards) writes the wide layout as a folder of part files that roll
+    over at a size or row count, with a manifest of their rows, id ranges and checksums.
+    Returns the columns written for the wide layout.
+    """
+    check_output_options(layout, output_format, projection, shards)
+    engine = resolve_engine(engine)
+    if layout == "normalized" and content_type not in TABLES:
+        raise ValueError(f"No normalized layout for content type: {content_type}")
+
+    record_tag = content_type[:-1]  # e.g. "releases" → "release"
+    chunks = sorted(chunk_dir.glob("chunk_*.xml"))
+
+    if not chunks:
+        console.print(f"[red]No XML chunks found in {chunk_dir}[/red]")
+        return
+
+    write_bytes = memory and memory["write_bytes"]
+    if memory:
+        workers = memory["workers"]
+    bytes_in = sum(chunk.stat().st_size for chunk in chunks)
+    with telemetry.stage("convert", content_type=content_type, layout=layout, output_format=output_format,
+                         engine=engine, workers=workers, chunks=len(chunks), bytes_in=bytes_in) as metrics:
+        start_time = perf_counter()
+
+        if layout == "normalized":
+            output_dir = layout_output_path(output_csv, layout)
+            tables = _convert_normalized(chunks, output_dir, content_type, workers=workers, output_format=output_format,
+                                         write_bytes=write_bytes)
+            duration = perf_counter() - start_time
+            metrics["bytes_out"] = sum(path.stat().st_size for path in tables.values())
+            output_size_mb = metrics["bytes_out"] / (1024 * 1024)
+
+            console.print(f"\n[green]✔ Tables saved:[/] {output_dir}")
+            console.print("[bold green]✔ Conversion completed[/bold green]")
+            console.print(f"[bold white]📄 Chunks processed:[/] {len(chunks)} files")
+            console.print(f"[bold white]🧩 Tables:[/] {', '.join(tables)}")
+            console.print(f"[bold white]💾 Output size:[/] {output_size_mb:.2f} MB")
+            console.print(f"[bold white]⏱ Duration:[/] {duration:.1f} seconds")
+            return
+
+        if not single_pass and output_format != "csv":
+            console.print(f"[yellow]⚠ --two-pass only writes CSV; using the single-pass engine for {output_format}.[/yellow]")
+            single_pass = True
+        if not single_pass and shards:
+            console.print("[yellow]⚠ --two-pass writes a single file; using the single-pass engine for shards.[/yellow]")
+            single_pass = True
+        if not single_pass and known_columns is not None:
+            console.print(f"[bold]🗃 Scan skipped:[/] {len(known_columns)} columns known from the schema catalog.")
+            single_pass = True
+            if timings is not None:
+                timings["scan_skipped"] = True
+        if not single_pass and workers > 1:
+            console.print("[yellow]⚠ --two-pass runs on a single core; ignoring --workers.[/yellow]")
+
+        output_path = layout_output_path(output_csv, layout, output_format, shards)
+        if single_pass:
+            columns = _convert_single_pass(chunks, output_path, record_tag, workers=workers, output_format=output_format,
+                                           engine=engine, projection=projection, known_columns=known_columns,
+                                           timings=timings, write_bytes=write_bytes, shards=shards)
+        else:
+            columns = _convert_two_pass(chunks, output_csv, record_tag, engine, projection, timings)
+
+        duration = perf_counter() - start_time
+        metrics["bytes_out"] = output_size(output_path)
+        output_size_mb = metrics["bytes_out"] / (1024 * 1024)
+        parts = f", {len(list(output_path.glob(f'part-*.{output_format}')))} parts" if shards else ""
+
+        # Final status output
+        console.print(f"\n[green]✔ {output_format.upper()} saved:[/] {output_path}")
+        console.print("[bold green]✔ Conversion completed[/bold green]")
+        console.print(f"[bold white]📄 Chunks processed:[/] {len(chunks)} files")
+        console.print(f"[bold white]🧩 Output {output_format.upper()}:[/] {output_path.name} ({len(columns)} columns{parts})")
+        console.print(f"[bold white]💾 Output size:[/] {output_size_mb:.2f} MB")
+        console.print(f"[bold white]🗂 Saved to:[/] {output_path.parent}")
+        console.print(f"[bold white]⏱ Duration:[/] {duration:.1f} seconds")
+        if duration and metrics.get("records"):
+            console.print(f"[bold white]📈 Throughput:[/] {metrics['records'] / duration:,.0f} rows/s "
+                          f"({metrics['records']:,} rows)")
+        return columns
+
+def schema_seed(data_path: Path, content_type: str, projection=None, rescan: bool = False):
+    """
+    Looks up the schema catalog for a dump (see discogs.schema_catalog).
+    Returns (catalog entry, known columns after the projection), or (None, None)
+    on a miss or when rescan is set.
+    """
+    if rescan:
+        return None, None
+    entry = load_schema(data_path, content_type)
+    if entry is None:
+        return None, None
+    wanted = _key_filter(projection)
+    return entry, [col for col in entry["columns"] if wanted is None or wanted(col)]
+
+def record_schema(data_path: Path, content_type: str, columns: list, entry, known_columns, timings: dict,
+                  partial: bool = False):
+    """
+    Stores the columns of a finished conversion in the schema catalog and, after a
+    catalog hit, prints how many columns were new and roughly how much time was saved:
+    the last recorded column scan (when --two-pass skipped it) and the difference to the
+    last remapping merge (when segments could be copied as-is).
+    A full conversion records exactly the columns it found; a partial one (projected
+    columns or selected ids) only widens the stored list.
+    """
+    stored = {
+        "scan_seconds": timings.get("scan_seconds"),
+        "merge_seconds": None if timings.get("merge_copied") else timings.get("merge_seconds"),
+    }
+    save_schema(data_path, content_type, columns, stored, replace=not partial)
+
+    if entry is None:
+        console.print(f"[bold white]🗃 Schema catalog:[/] recorded {len(columns)} columns for {dump_month(data_path)}")
+        return
+
+    saved = 0.0
+    if timings.get("scan_skipped") and entry.get("scan_seconds"):
+        saved += entry["scan_seconds"]
+    if timings.get("merge_copied") and entry.get("merge_seconds"):
+        saved += max(0.0, entry["merge_seconds"] - timings["merge_seconds"])
+    new_columns = len(set(columns) - set(known_columns))
+    source = f"{entry['month']}{', exact match' if entry['exact'] else ''}"
+    console.print(f"[bold white]🗃 Schema catalog:[/] {len(known_columns)} known columns ({source}), "
+                  f"{new_columns} new • saved ~{saved:.1f} seconds")
+
+def convert_xml_to_csv(xml_path: Path, content_type: str, single_pass: bool = True, workers: int = 1,
+                       layout: str = "wide", output_format: str = "csv", engine: str = "auto", ids=None,
+                       projection=None, rescan: bool = False, record_hashes: bool = False, memory: dict = None,
+                       shards: dict = None) -> Path:
+    """
+    Full pipeline: chunk an XML file and convert the chunks to a CSV file
+    (or, for the normalized layout, a folder of table CSVs).
+    With ids, only those records are pulled out through the record-offset index
+    (built on first use) and written to <name>_selected.csv instead.
+    The wide layout reuses the columns recorded in the schema catalog for this
+    content type (rescan=True ignores and replaces them).
+    record_hashes=True also stores the dump's record hash table, which next month's
+    `discogs diff` compares against (see discogs.delta); records are hashed as they are
+    chunked, without another pass over the file.
+    The chunk folder carries a checkpoint manifest, so a run that was killed resumes
+    from the last chunk written and the last segment converted, with the same output
+    as an uninterrupted run. memory (a --max-memory plan, see discogs.memory) bounds
+    the chunker, the flattening workers and the writer. shards writes the wide layout as
+    a folder of part files (see convert_chunks_to_csv). Temporary chunked files are
+    deleted after the process.
     """
     chunk_dir = xml_path.parent / f"chunked_{content_type}"
     output_csv = xml_path.with_suffix(".csv")
 
-    chunk_xml_by_type(xml_path, content_type)  # Split large XML into smaller parts
-    convert_chunks_to_csv(chunk_dir, output_csv, content_type)  # Convert chunks to CSV
+    check_output_options(layout, output_format, projection, shards)  # Fail before chunking, not after
+    if ids is not None:
+        output_csv = xml_path.with_name(f"{xml_path.stem}_selected.csv")
+        shutil.rmtree(chunk_dir, ignore_errors=True)  # Not resumable; never mix with a checkpointed full run
+        chunk_records_by_id(xml_path, content_type, ids)  # Only the requested records
+    else:
+        hashing = nullcontext()
+        if record_hashes:
+            from discogs.delta import hashing_records  # discogs.delta builds on this module
+            hashing = hashing_records(xml_path)
+        with hashing as on_record:  # Records are hashed while the chunker has them in memory
+            chunk_xml_by_type(xml_path, content_type, memory=memory,
+                              on_record=on_record)  # Split large XML into smaller parts (resumes a checkpoint)
+    entry, known_columns = schema_seed(xml_path, content_type, projection, rescan) if layout == "wide" else (None, None)
+    timings = {}
+    columns = convert_chunks_to_csv(chunk_dir, output_csv, content_type, single_pass=single_pass, workers=workers,
+                                    layout=layout, output_format=output_format, engine=engine, projection=projection,
+                                    known_columns=known_columns, timings=timings, memory=memory,
+                                    shards=shards)  # Convert chunks to CSV
+    if columns is not None:
+        record_schema(xml_path, content_type, columns, entry, known_columns, timings,
+                      partial=projection is not None or ids is not None)
     shutil.rmtree(chunk_dir, ignore_errors=True)  # Cleanup
 
-    return output_csv
+    output_path = layout_output_path(output_csv, layout, output_format, shards)
+    record_artifact(output_path)
+    return output_path
 
-def convert_interactively():
+def convert_interactively(single_pass: bool = True, workers: int = 1, layout: str = "wide", output_format: str = "csv",
+                          engine: str = "auto", ids=None, projection=None, rescan: bool = False,
+                          record_hashes: bool = False, memory: dict = None, shards: dict = None):
     """
     Prompts user to select XML files for conversion.
     """
@@ -163,9 +1102,7 @@ def convert_interactively():
     from discogs.utils import open_folder
 
     download_dir = get_download_dir()
-    dataset_dir = download_dir / "Datasets"
-
-    xml_files = list(dataset_dir.rglob("*.xml"))
+    xml_files = find_artifacts(download_dir, "xml")
     if not xml_files:
         console.print("[red]No XML files found to convert.[/red]")
         return
@@ -180,7 +1117,9 @@ def convert_interactively():
         if 0 <= idx < len(xml_files):
             file = xml_files[idx]
             content_type = file.stem.split("_")[-1]
-            convert_xml_to_csv(file, content_type)
+            convert_xml_to_csv(file, content_type, single_pass=single_pass, workers=workers, layout=layout,
+                               output_format=output_format, engine=engine, ids=ids, projection=projection,
+                               rescan=rescan, record_hashes=record_hashes, memory=memory, shards=shards)
             open_folder(file.parent)
         else:
             console.print("[red]Invalid selection.[/red]")
@@ -5,6 +5,8 @@ from rich.console import Console
 from discogs.selector import display_status_table, select_indices
 from discogs.config import get_download_dir
 from discogs.scraper import get_latest_files
+from discogs.checksum import sidecar_path
+from discogs.artifacts import is_present, record as record_artifact
 
 console = Console()
 
@@ -15,20 +17,20 @@ def delete_files():
     .gz, .xml, and .csv files from the dataset directory.
     """
     download_dir = get_download_dir()  # Get the base download directory from config
-    df = get_latest_files()  # Load the latest file list (as a DataFrame)
+    files = get_latest_files()  # Load the latest file list (one dict per dump)
 
-    if df.empty:
+    if not files:
         console.print("[red]No files found.[/red]")
         return
 
     # Show the current file status table
-    display_status_table(df, download_dir)
+    display_status_table(files, download_dir)
 
     # Let the user select which files to delete
-    selected = select_indices(df)
+    selected = select_indices(files)
 
     for i in selected:
-        row = df.iloc[i]
+        row = files[i]
         filename = Path(row["url"]).name
         year_month = row["month"]
         data_dir = download_dir / "Datasets" / year_month
@@ -37,14 +39,17 @@ def delete_files():
         xml_path = gz_path.with_suffix("")  # Extracted .xml file
         csv_path = xml_path.with_suffix(".csv")  # Converted .csv file
 
-        # Try deleting each file, one by one
+        # Try deleting each file, one by one (presence comes from the artifact index)
         for file in [gz_path, xml_path, csv_path]:
-            if file.exists():
+            if is_present(file):
                 file.unlink()  # Delete the file
+                record_artifact(file)
                 console.print(f"[red]🗑 Deleted:[/] {file.name}")
             else:
                 console.print(f"[dim]• Not found:[/] {file.name}")
-
+        if is_present(sidecar_path(gz_path)):
+            sidecar_path(gz_path).unlink(missing_ok=True)  # Checksum record of the download
+            record_artifact(sidecar_path(gz_path))
 
 # Allow this script to be run directly
 if __name__ == "__main__":
@@ -0,0 +1,492 @@
+# discogs/delta.py
+
+import sys
+import csv
+import mmap
+import shutil
+import struct
+import hashlib
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from rich.console import Console
+
+from discogs import telemetry
+from discogs.artifacts import record as record_artifact
+from discogs.chunker import iter_records
+from discogs.converter import convert_chunks_to_csv, layout_output_path, output_size, _progress
+from discogs.extractor import open_gz
+from discogs.indexer import _record_id, write_records_xml
+from discogs.schema_catalog import dump_month
+
+console = Console()
+
+# Hash table layout (<dump>.hashes next to the dump): a fixed header followed by two
+# native-endian uint64 columns sorted by id: record ids and a 64-bit hash of each
+# record's raw XML. Tables are memory-mapped, never loaded, so diffing 15M+ releases
+# costs a page cache rather than gigabytes of RAM; only the new table is written.
+HASHES_MAGIC = b"DGHT"
+HASHES_VERSION = 1
+_HEADER = struct.Struct("<4sH2sQQQ")  # magic, version, byte order, records, source size, source mtime_ns
+_BYTE_ORDER = b"le" if sys.byteorder == "little" else b"be"
+_BATCH = 64 * 1024  # Pairs buffered before they are spilled to disk (and pairs per sorted run)
+_RUN_READ = 4096  # Pairs read at a time from each sorted run while merging
+
+
+def hashes_path(data_path: Path) -> Path:
+    """
+    Returns the hash table that belongs to a dump (.xml or .xml.gz): <dump name>.hashes.
+    """
+    return data_path.with_name(data_path.name.partition(".")[0] + ".hashes")
+
+
+def record_hash(record: bytes) -> int:
+    """
+    64-bit content hash of a record's raw XML (BLAKE2b, truncated).
+    """
+    return int.from_bytes(hashlib.blake2b(record, digest_size=8).digest(), "little")
+
+
+def _read_header(path: Path):
+    """
+    Returns the unpacked table header, or None if the file is not a table this version can read.
+    """
+    with open(path, "rb") as f:
+        data = f.read(_HEADER.size)
+    if len(data) < _HEADER.size:
+        return None
+    header = _HEADER.unpack(data)
+    if header[:3] != (HASHES_MAGIC, HASHES_VERSION, _BYTE_ORDER):
+        return None
+    return header
+
+
+def hashes_are_current(data_path: Path) -> bool:
+    """
+    True when the hash table exists and was built from the dump as it is now.
+    """
+    path = hashes_path(data_path)
+    if not path.exists():
+        return False
+    header = _read_header(path)
+    stat = data_path.stat()
+    return header is not None and header[4:] == (stat.st_size, stat.st_mtime_ns)
+
+
+@contextmanager
+def open_table(path: Path):
+    """
+    Memory-maps a hash table and yields its (ids, hashes) columns as uint64 memoryviews.
+    """
+    header = _read_header(path)
+    if header is None:
+        raise ValueError(f"{path} is not a record hash table")
+    count = header[3]
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        ids_start = _HEADER.size
+        hashes_start = ids_start + 8 * count
+        ids = view[ids_start:hashes_start].cast("Q")
+        hashes = view[hashes_start:hashes_start + 8 * count].cast("Q")
+        try:
+            yield ids, hashes
+        finally:
+            # Views must be released before the mmap can close
+            for v in (ids, hashes, view):
+                v.release()
+
+
+def _sort_runs(ids_tmp: Path, hashes_tmp: Path, runs_tmp: Path, count: int) -> list:
+    """
+    Reads the spilled columns back _BATCH pairs at a time, sorts each batch by id and
+    writes it to runs_tmp as interleaved id, hash pairs. Returns (first pair, pairs) per run.
+    """
+    runs = []
+    with open(ids_tmp, "rb") as ids_in, open(hashes_tmp, "rb") as hashes_in, open(runs_tmp, "wb") as out:
+        for start in range(0, count, _BATCH):
+            ids, hashes = array("Q"), array("Q")
+            ids.fromfile(ids_in, min(_BATCH, count - start))
+            hashes.fromfile(hashes_in, len(ids))
+            run = array("Q")
+            for i in sorted(range(len(ids)), key=ids.__getitem__):
+                run.append(ids[i])
+                run.append(hashes[i])
+            run.tofile(out)
+            runs.append((start, len(ids)))
+    return runs
+
+
+def _read_run(runs_tmp: Path, start: int, length: int):
+    """
+    Yields the (id, hash) pairs of one sorted run, _RUN_READ at a time.
+    """
+    with open(runs_tmp, "rb") as f:
+        f.seek(start * 16)
+        while length:
+            block = array("Q")
+            block.fromfile(f, 2 * min(_RUN_READ, length))
+            yield from zip(block[::2], block[1::2])
+            length -= len(block) // 2
+
+
+@contextmanager
+def table_writer(path: Path, source: Path):
+    """
+    Yields add(record_id, digest), which collects the pairs of a hash table without
+    holding them in memory: both columns are spilled to temporary files in batches and
+    concatenated under the header when the block ends. Dumps are normally in id order;
+    when they aren't, the spilled pairs are sorted in runs of _BATCH and the runs merged,
+    so memory stays bounded by the run buffers rather than the table size. The table
+    replaces `path` only once it is complete; add.count is the number of pairs so far.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    ids_tmp, hashes_tmp = path.with_name(path.name + ".ids.tmp"), path.with_name(path.name + ".hashes.tmp")
+    runs_tmp = path.with_name(path.name + ".runs.tmp")
+    in_order, last = True, -1
+
+    try:
+        with open(ids_tmp, "wb") as ids_out, open(hashes_tmp, "wb") as hashes_out:
+            ids, hashes = array("Q"), array("Q")
+
+            def add(record_id: int, digest: int):
+                nonlocal in_order, last, ids, hashes
+                if record_id < last:
+                    in_order = False
+                last = record_id
+                ids.append(record_id)
+                hashes.append(digest)
+                add.count += 1
+                if len(ids) >= _BATCH:
+                    ids.tofile(ids_out)
+                    hashes.tofile(hashes_out)
+                    ids, hashes = array("Q"), array("Q")
+
+            add.count = 0
+            yield add
+            ids.tofile(ids_out)
+            hashes.tofile(hashes_out)
+            count = add.count
+
+        stat = source.stat()
+        with open(tmp_path, "wb") as out:
+            out.write(_HEADER.pack(HASHES_MAGIC, HASHES_VERSION, _BYTE_ORDER, count, stat.st_size, stat.st_mtime_ns))
+            if in_order:
+                for column in (ids_tmp, hashes_tmp):
+                    with open(column, "rb") as f:
+                        shutil.copyfileobj(f, out, 1024 * 1024)
+            else:
+                runs = _sort_runs(ids_tmp, hashes_tmp, runs_tmp, count)
+                # Ids go straight into the table, hashes to a column file appended after them;
+                # merge() is stable, so equal ids keep their dump order like a full sort would
+                with open(hashes_tmp, "wb") as hashes_out:
+                    ids, hashes = array("Q"), array("Q")
+                    for record_id, digest in merge(*(_read_run(runs_tmp, start, length) for start, length in runs),
+                                                   key=lambda pair: pair[0]):
+                        ids.append(record_id)
+                        hashes.append(digest)
+                        if len(ids) >= _BATCH:
+                            ids.tofile(out)
+                            hashes.tofile(hashes_out)
+                            ids, hashes = array("Q"), array("Q")
+                    ids.tofile(out)
+                    hashes.tofile(hashes_out)
+                with open(hashes_tmp, "rb") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+        tmp_path.replace(path)
+    finally:
+        for leftover in (ids_tmp, hashes_tmp, runs_tmp, tmp_path):
+            leftover.unlink(missing_ok=True)
+
+
+def _write_table(pairs, path: Path, source: Path) -> int:
+    """
+    Writes (id, hash) pairs into a hash table (see table_writer). Returns the record count.
+    """
+    with table_writer(path, source) as add:
+        for record_id, digest in pairs:
+            add(record_id, digest)
+    return add.count
+
+
+@contextmanager
+def _open_dump(data_path: Path, content_type: str):
+    """
+    Streams the raw records of an extracted (.xml) or still compressed (.gz) dump.
+    Yields (records, position) where position() is how far into the file the read got.
+    """
+    with open(data_path, "rb") as raw:
+        if data_path.suffix == ".gz":
+            with open_gz(raw) as f:
+                yield iter_records(f, content_type), raw.tell
+        else:
+            yield iter_records(raw, content_type), raw.tell
+
+
+def _hashed_records(records, progress, task, position, skipped: list):
+    """
+    Yields (id, hash, raw record) for every record with an id; counts the others in skipped[0].
+    """
+    for count, record in enumerate(records, start=1):
+        record_id = _record_id(record, 0, len(record))
+        if record_id is None:
+            skipped[0] += 1
+            continue
+        yield record_id, record_hash(record), record
+        if count % 10000 == 0:
+            progress.update(task, completed=position())
+
+
+def build_hashes(data_path: Path, content_type: str) -> Path:
+    """
+    Streams a dump (.xml or .xml.gz) once and stores its record id → content hash table.
+    Returns the table path.
+    """
+    skipped = [0]
+    with _progress() as progress, _open_dump(data_path, content_type) as (records, position):
+        task = progress.add_task(f"Hashing {data_path.name}", total=data_path.stat().st_size)
+        pairs = ((record_id, digest) for record_id, digest, _ in
+                 _hashed_records(records, progress, task, position, skipped))
+        count = _write_table(pairs, hashes_path(data_path), data_path)
+        progress.update(task, completed=data_path.stat().st_size)
+
+    output_path = hashes_path(data_path)
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    console.print(f"[green]✔ Hashed {count:,} records:[/] {output_path} ({size_mb:.2f} MB)")
+    if skipped[0]:
+        console.print(f"[yellow]⚠ Skipped {skipped[0]} record(s) without an id.[/yellow]")
+    return output_path
+
+
+@contextmanager
+def hashing_records(xml_path: Path):
+    """
+    Yields on_record(buf, start, end) for chunk_xml_by_type: it hashes every record span
+    the chunker walks over, so the dump's hash table is stored as a by-product of
+    chunking instead of in a second pass over the file.
+    """
+    skipped = 0
+    output_path = hashes_path(xml_path)
+    with table_writer(output_path, xml_path) as add:
+        def on_record(buf, start: int, end: int):
+            nonlocal skipped
+            record_id = _record_id(buf, start, end)
+            if record_id is None:
+                skipped += 1
+            else:
+                add(record_id, record_hash(buf[start:end]))
+
+        yield on_record
+
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    console.print(f"[green]✔ Hashed {add.count:,} records:[/] {output_path} ({size_mb:.2f} MB)")
+    if skipped:
+        console.print(f"[yellow]⚠ Skipped {skipped} record(s) without an id.[/yellow]")
+
+
+def ensure_hashes(data_path: Path, content_type: str) -> Path:
+    """
+    Returns the hash table of a dump, or of the table itself when given a .hashes file;
+    the table is (re)built first when it is missing or stale.
+    """
+    if data_path.suffix == ".hashes":
+        return data_path
+    if not hashes_are_current(data_path):
+        build_hashes(data_path, content_type)
+    return hashes_path(data_path)
+
+
+def find_base(data_path: Path, content_type: str):
+    """
+    Finds what a dump is diffed against by default: the latest earlier month of the same
+    content type, looking in the sibling Datasets/<month>/ folders (or the dump's own
+    folder). A stored hash table is preferred over an extracted or compressed dump.
+    Returns a path, or None when there is no earlier month.
+    """
+    month = dump_month(data_path)
+    folder = data_path.parent
+    pattern = f"*/discogs_*_{content_type}.*" if folder.parent.name == "Datasets" else f"discogs_*_{content_type}.*"
+    root = folder.parent if folder.parent.name == "Datasets" else folder
+    preference = {".hashes": 0, ".xml": 1, ".xml.gz": 2}
+
+    candidates = []
+    for path in root.glob(pattern):
+        suffix = path.name[path.name.index("."):]
+        if suffix in preference and dump_month(path) < month:
+            candidates.append((dump_month(path), -preference[suffix], path))
+    return max(candidates)[2] if candidates else None
+
+
+def _add(delta: dict, record: bytes, content_type: str, records_per_file: int):
+    """
+    Buffers a changed record; every records_per_file records become one chunk file.
+    """
+    delta["batch"].append(record)
+    delta["records"] += 1
+    if len(delta["batch"]) >= records_per_file:
+        _flush(delta, content_type)
+
+
+def _flush(delta: dict, content_type: str):
+    if not delta["batch"]:
+        return
+    delta["folder"].mkdir(parents=True, exist_ok=True)
+    delta["chunks"] += 1
+    write_records_xml(delta["batch"], content_type, delta["folder"] / f"chunk_{delta['chunks']:05}.xml")
+    delta["batch"] = []
+
+
+def _classify(hashed, base_ids, base_hashes, changes: dict, content_type: str, records_per_file: int):
+    """
+    Looks every (id, hash, record) of the new dump up in the base table, routes inserted
+    and updated records into their chunk folders and yields (id, hash) for the new table.
+    Ids normally arrive in order, so each lookup only bisects what lies after the last one.
+    """
+    count, lo, last = len(base_ids), 0, -1
+    for record_id, digest, record in hashed:
+        if record_id < last:
+            lo = 0
+        last = record_id
+        i = bisect_left(base_ids, record_id, lo)
+        lo = i
+        if i < count and base_ids[i] == record_id:
+            if base_hashes[i] != digest:
+                _add(changes["updated"], record, content_type, records_per_file)
+            else:
+                changes["unchanged"] += 1
+        else:
+            _add(changes["inserted"], record, content_type, records_per_file)
+        yield record_id, digest
+
+
+def _write_deleted(base_table: Path, new_table: Path, output_csv: Path) -> int:
+    """
+    Walks both sorted id columns side by side and writes the ids that only the base
+    table has to a one-column CSV. Returns how many were deleted.
+    """
+    deleted = 0
+    with open_table(base_table) as (base_ids, _), open_table(new_table) as (new_ids, _), \
+            open(output_csv, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(["id"])
+        j, count = 0, len(new_ids)
+        for record_id in base_ids:
+            while j < count and new_ids[j] < record_id:
+                j += 1
+            if j >= count or new_ids[j] != record_id:
+                writer.writerow([record_id])
+                deleted += 1
+    return deleted
+
+
+def diff_dump(data_path: Path, content_type: str, base: Path = None, workers: int = 1, layout: str = "wide",
+              output_format: str = "csv", engine: str = "auto", projection=None,
+              records_per_file: int = 10000) -> dict:
+    """
+    Month-over-month delta of a dump (.xml or .xml.gz, streamed once, never extracted):
+    each record is hashed and looked up in the base month's memory-mapped hash table.
+    Inserted and updated records are converted like a normal dump (same layouts, formats,
+    engines and projections) into <dump>_inserted / <dump>_updated outputs; ids that
+    disappeared go to <dump>_deleted.csv. The dump's own hash table is stored along the
+    way, so next month diffs against it.
+    base is an earlier dump or its .hashes file (default: see find_base).
+    Returns {"inserted", "updated", "deleted", "unchanged": counts, "outputs": {kind: path}}.
+    """
+    base = base or find_base(data_path, content_type)
+    if base is None:
+        raise FileNotFoundError(f"No earlier {content_type} dump or hash table to diff {data_path.name} against")
+    base_table = ensure_hashes(base, content_type)
+    new_table = hashes_path(data_path)
+    if base_table.resolve() == new_table.resolve():
+        raise ValueError(f"{data_path.name} cannot be diffed against itself")
+
+    stem = data_path.name.partition(".")[0]
+    changes = {kind: {"folder": data_path.parent / f"chunked_{content_type}_{kind}", "batch": [], "chunks": 0,
+                      "records": 0} for kind in ("inserted", "updated")}
+    changes["unchanged"] = 0
+    for kind in ("inserted", "updated"):
+        shutil.rmtree(changes[kind]["folder"], ignore_errors=True)  # Leftovers of an interrupted run
+
+    console.print(f"[bold]Diffing[/] {data_path.name} [bold]against[/] {base_table.name}")
+    start_time = perf_counter()
+    skipped = [0]
+    size = data_path.stat().st_size
+
+    with telemetry.stage("diff", content_type=content_type, bytes_in=size) as metrics:
+        # Step 1: Stream the dump, classify its records and write its own hash table
+        with _progress() as progress, _open_dump(data_path, content_type) as (records, position), \
+                open_table(base_table) as (base_ids, base_hashes):
+            task = progress.add_task(f"Hashing {data_path.name}", total=size)
+            hashed = _hashed_records(records, progress, task, position, skipped)
+            # The new table is written next to the dump only once it is complete
+            total = _write_table(_classify(hashed, base_ids, base_hashes, changes, content_type, records_per_file),
+                                 new_table, data_path)
+            progress.update(task, completed=size)
+        for kind in ("inserted", "updated"):
+            _flush(changes[kind], content_type)
+        telemetry.count(records=total)
+
+        # Step 2: Ids only the base month has
+        outputs = {"deleted": data_path.with_name(f"{stem}_deleted.csv")}
+        deleted = _write_deleted(base_table, new_table, outputs["deleted"])
+
+        # Step 3: Convert the changed records
+        for kind in ("inserted", "updated"):
+            folder = changes[kind]["folder"]
+            output_csv = data_path.with_name(f"{stem}_{kind}.csv")
+            output_path = layout_output_path(output_csv, layout, output_format)
+            if changes[kind]["records"]:
+                console.print(f"\n[bold]{kind.capitalize()}:[/] {changes[kind]['records']:,} records")
+                convert_chunks_to_csv(folder, output_csv, content_type, workers=workers, layout=layout,
+                                      output_format=output_format, engine=engine, projection=projection)
+                outputs[kind] = output_path
+            shutil.rmtree(folder, ignore_errors=True)
+        for output_path in outputs.values():
+            record_artifact(output_path)
+        metrics["bytes_out"] = sum(output_size(path) for path in outputs.values())
+
+    counts = {"inserted": changes["inserted"]["records"], "updated": changes["updated"]["records"],
+              "deleted": deleted, "unchanged": changes["unchanged"]}
+    duration = perf_counter() - start_time
+    console.print("\n[bold green]✔ Delta completed[/bold green]")
+    console.print(f"[bold white]🔁 Base:[/] {base_table.name}")
+    console.print(f"[bold white]📄 Records:[/] {total:,} • " + " • ".join(f"{n:,} {kind}" for kind, n in counts.items()))
+    for kind, path in outputs.items():
+        console.print(f"[bold white]🧩 {kind.capitalize()}:[/] {path.name} ({output_size(path) / (1024 * 1024):.2f} MB)")
+    console.print(f"[bold white]🗃 Hash table:[/] {new_table.name} ({new_table.stat().st_size / (1024 * 1024):.2f} MB)")
+    console.print(f"[bold white]⏱ Duration:[/] {duration:.1f} seconds")
+    if skipped[0]:
+        console.print(f"[yellow]⚠ Skipped {skipped[0]} record(s) without an id.[/yellow]")
+    return dict(counts, outputs=outputs)
+
+
+def select_dump():
+    """
+    Prompts user to select an extracted or downloaded dump to diff. Returns None if nothing was picked.
+    """
+    from rich.prompt import Prompt
+    from discogs.config import get_download_dir
+    from discogs.artifacts import find as find_artifacts
+
+    download_dir = get_download_dir()
+    dumps = find_artifacts(download_dir, "xml") + find_artifacts(download_dir, "gz")
+    if not dumps:
+        console.print("[red]No extracted or downloaded dumps found.[/red]")
+        return None
+
+    console.print("[bold]Select dump to diff:[/bold]")
+    for i, file in enumerate(dumps):
+        console.print(f"[{i + 1}] {file.relative_to(download_dir)}")
+
+    choice = Prompt.ask("Enter number", default="1")
+    try:
+        idx = int(choice.strip()) - 1
+    except ValueError:
+        idx = -1
+    if not 0 <= idx < len(dumps):
+        console.print("[red]Invalid selection.[/red]")
+        return None
+    return dumps[idx]
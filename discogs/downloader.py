@@ -1,6 +1,9 @@
 # discogs/downloader.py
 
+import os
+import json
 import time
+import threading
 import requests
 from time import sleep
 from pathlib import Path
@@ -13,36 +16,65 @@ from rich.progress import (
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from discogs import telemetry
+from discogs.http_client import get_session
+from discogs.checksum import (
+    ChecksumMismatch, new_hash, hash_file, hash_range, check, status, published_digest, sidecar_path,
+)
+from discogs.artifacts import is_present, record as record_artifact
+
 console = Console()
 
-def _download_file(url: str, target_path: Path, progress, task_id, retries: int = 5) -> Path:
+SEGMENT_SIZE = 64 * 1024 * 1024  # Bytes per ranged request
+CONNECTIONS = 4  # Concurrent ranged connections per file
+_CHECKPOINT_BYTES = 16 * 1024 * 1024  # Resume map is saved after this much new data
+
+def _download_file(url: str, target_path: Path, progress, task_id, retries: int = 5, expected: str = None) -> Path:
     """
     Downloads a file with support for resume and retry.
     Updates a Rich progress bar during download.
+    Data goes to <file>.part and is renamed into place when complete. With an `expected`
+    digest the bytes are hashed as they stream in (a resumed prefix is hashed once) and
+    the result is checked against it.
     """
-    headers = {}
+    part_path, map_path = _partial_paths(target_path)
+    if map_path.exists():
+        # Preallocated by a segmented download: its length says nothing about what was written
+        part_path.unlink(missing_ok=True)
+        map_path.unlink()
+    hasher = new_hash() if expected else None
     downloaded = 0
 
-    # If file exists, resume from where it left off
-    if target_path.exists():
-        downloaded = target_path.stat().st_size
-        headers["Range"] = f"bytes={downloaded}-"
-
-    total_size = int(requests.head(url).headers.get("Content-Length", 0))
+    # If a partial file exists, resume from where it left off
+    if part_path.exists():
+        downloaded = part_path.stat().st_size
+        if hasher:
+            hash_file(part_path, hasher, downloaded)
+        progress.update(task_id, completed=downloaded)
 
     for attempt in range(retries):
+        headers = {"Range": f"bytes={downloaded}-"} if downloaded else {}
         try:
-            with requests.get(url, headers=headers, stream=True, timeout=10) as response:
+            with get_session().get(url, headers=headers, stream=True, timeout=10) as response:
                 response.raise_for_status()
+                if downloaded and response.status_code != 206:
+                    # The server sent the whole file again: start over instead of appending it
+                    downloaded = 0
+                    hasher = new_hash() if expected else None
 
                 mode = "ab" if downloaded else "wb"
-                with open(target_path, mode) as f:
+                with open(part_path, mode) as f:
                     for chunk in response.iter_content(chunk_size=1024 * 64):
                         if chunk:
                             f.write(chunk)
+                            if hasher:
+                                hasher.update(chunk)
                             downloaded += len(chunk)
                             progress.update(task_id, completed=downloaded)
 
+            part_path.replace(target_path)
+            if hasher:
+                check(target_path, hasher.hexdigest(), expected)
             return target_path  # Download completed
 
         except requests.RequestException as e:
@@ -53,17 +85,220 @@ def _download_file(url: str, target_path: Path, progress, task_id, retries: int
             else:
                 raise RuntimeError(f"Download failed after {retries} retries: {e}")
 
-def download_files_threaded(df, selected_indexes, download_dir: Path) -> list[Path]:
+class RangeNotSupported(Exception):
     """
-    Downloads multiple files concurrently using threads.
-    Displays a combined progress bar for all downloads.
+    The server answered a Range request with the whole file.
     """
-    urls = [df.iloc[i]["url"] for i in selected_indexes]
-    paths = []
-    total_bytes = 0
-    start_time = time.time()
 
-    with Progress(
+def _probe(url: str) -> tuple:
+    """
+    Asks the server for a file's size and whether it serves byte ranges; only needed
+    when the S3 listing did not provide the size.
+    Returns (size in bytes or 0 if unknown, ranges supported).
+    """
+    headers = get_session().head(url, allow_redirects=True, timeout=10).headers
+    return int(headers.get("Content-Length", 0)), headers.get("Accept-Ranges", "").lower() == "bytes"
+
+def _partial_paths(target_path: Path) -> tuple:
+    """
+    Returns the preallocated data file and the resume map of an unfinished segmented download.
+    """
+    return target_path.with_name(target_path.name + ".part"), target_path.with_name(target_path.name + ".part.json")
+
+def _load_resume_map(map_path: Path, url: str, size: int, segment_size: int):
+    """
+    Returns the bytes already written per segment, or None when there is no map
+    or it belongs to a different file, size or segment layout.
+    """
+    try:
+        with open(map_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (state.get("url"), state.get("size"), state.get("segment_size")) != (url, size, segment_size):
+        return None
+    return state["done"]
+
+def _save_resume_map(map_path: Path, url: str, size: int, segment_size: int, done: list):
+    """
+    Atomically records how many bytes of every segment are on disk.
+    """
+    tmp_path = map_path.with_name(map_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "size": size, "segment_size": segment_size, "done": done}, f)
+    tmp_path.replace(map_path)
+
+def _pwrite(fd: int, data: bytes, offset: int, lock: threading.Lock):
+    """
+    Writes data at an absolute file offset; falls back to seek + write under a lock
+    where os.pwrite is unavailable (Windows).
+    """
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data, offset = data[written:], offset + written
+    else:
+        with lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            os.write(fd, data)
+
+def _advance_hash(fd: int, segments: list, done: list, state: dict):
+    """
+    Feeds the bytes between the hashed position and the first incomplete segment into
+    state["hash"]. Segments finish out of order, so the hash follows the contiguous
+    written prefix, reading fresh data back while it is still in the page cache; a
+    resumed download catches up on the prefix it already has once.
+    """
+    frontier = segments[-1][1] + 1
+    for (start, end), n in zip(segments, done):
+        if start + n <= end:
+            frontier = start + n
+            break
+    if frontier > state["hashed"]:
+        hash_range(fd, state["hash"], state["hashed"], frontier)
+        state["hashed"] = frontier
+
+def _download_segment(url: str, fd: int, segments: list, i: int, done: list, state: dict, progress, task_id,
+                      retries: int = 5):
+    """
+    Fetches the missing part of segment i with a Range request and writes it in place.
+    Retries with backoff, each time continuing after the last byte written.
+    """
+    start, end = segments[i]
+    for attempt in range(retries):
+        if state["stop"].is_set():
+            return
+        offset = start + done[i]
+        if offset > end:
+            return
+        try:
+            headers = {"Range": f"bytes={offset}-{end}"}
+            with get_session().get(url, headers=headers, stream=True, timeout=10) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise RangeNotSupported(url)
+                for chunk in response.iter_content(chunk_size=1024 * 256):
+                    if state["stop"].is_set():
+                        return
+                    chunk = chunk[:end + 1 - offset]  # Never write past the segment
+                    _pwrite(fd, chunk, offset, state["lock"])
+                    offset += len(chunk)
+                    done[i] += len(chunk)
+                    progress.update(task_id, advance=len(chunk))
+                    state["checkpoint"](len(chunk))
+            if offset > end:
+                return
+        except requests.RequestException as e:
+            if attempt == retries - 1:
+                raise RuntimeError(f"Segment {i + 1} failed after {retries} retries: {e}")
+            sleep(min(1.5 * 2 ** attempt, 30))
+    if start + done[i] <= end:
+        raise RuntimeError(f"Segment {i + 1} incomplete after {retries} attempts")
+
+def _download_segmented(url: str, target_path: Path, size: int, progress, task_id, connections: int = CONNECTIONS,
+                        segment_size: int = SEGMENT_SIZE, retries: int = 5, expected: str = None) -> Path:
+    """
+    Downloads one file over several connections: the file is split into byte ranges
+    that are fetched concurrently and written in place into a preallocated .part file.
+    A resume map next to it records the bytes written per segment, so an interrupted
+    download only fetches what is missing. The finished file is renamed into place and,
+    with an `expected` digest, checked against it.
+    """
+    part_path, map_path = _partial_paths(target_path)
+    segments = [(start, min(start + segment_size, size) - 1) for start in range(0, size, segment_size)]
+    done = _load_resume_map(map_path, url, size, segment_size) if part_path.exists() else None
+    if done is None:
+        done = [0] * len(segments)
+        with open(part_path, "wb") as f:
+            f.truncate(size)  # Preallocate (sparse where supported)
+    progress.update(task_id, completed=sum(done))
+
+    state = {"stop": threading.Event(), "lock": threading.Lock(), "unsaved": 0,
+             "hash": new_hash() if expected else None, "hashed": 0, "hash_lock": threading.Lock()}
+    fd = os.open(part_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+
+    def save():
+        os.fsync(fd)  # Map entries must never run ahead of the data
+        _save_resume_map(map_path, url, size, segment_size, list(done))
+
+    def checkpoint(n: int):
+        with state["lock"]:
+            state["unsaved"] += n
+            if state["unsaved"] < _CHECKPOINT_BYTES:
+                return
+            state["unsaved"] = 0
+            save()
+        # Hash what became contiguous; whoever finds the hasher busy just carries on
+        if state["hash"] and state["hash_lock"].acquire(blocking=False):
+            try:
+                _advance_hash(fd, segments, done, state)
+            finally:
+                state["hash_lock"].release()
+
+    state["checkpoint"] = checkpoint
+    try:
+        missing = [i for i, (start, end) in enumerate(segments) if start + done[i] <= end]
+        with ThreadPoolExecutor(max_workers=max(1, min(connections, len(missing)))) as executor:
+            futures = [executor.submit(_download_segment, url, fd, segments, i, done, state, progress, task_id, retries)
+                       for i in missing]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            finally:
+                state["stop"].set()  # Lets the other segments stop early after a failure
+    except BaseException:
+        with state["lock"]:
+            save()
+        os.close(fd)
+        raise
+
+    if state["hash"]:
+        with state["hash_lock"]:
+            _advance_hash(fd, segments, done, state)
+    os.close(fd)
+    part_path.replace(target_path)
+    map_path.unlink(missing_ok=True)
+    if state["hash"]:
+        check(target_path, state["hash"].hexdigest(), expected)
+    return target_path
+
+def _fetch_once(url: str, target_path: Path, size: int, ranges: bool, progress, task_id, connections: int,
+                segment_size: int, expected: str) -> Path:
+    """
+    Downloads over several connections when the server supports ranges (and the size
+    is known), otherwise over one resumable stream. S3 serves ranges, so listed files
+    go straight to the segmented path and fall back only if a range is refused.
+    """
+    if ranges and size and connections > 1:
+        try:
+            return _download_segmented(url, target_path, size, progress, task_id, connections, segment_size,
+                                       expected=expected)
+        except RangeNotSupported:
+            for path in _partial_paths(target_path):
+                path.unlink(missing_ok=True)
+            progress.update(task_id, completed=0)
+    return _download_file(url, target_path, progress, task_id, expected=expected)
+
+def _fetch(url: str, target_path: Path, size: int, ranges: bool, progress, task_id, connections: int,
+           segment_size: int, expected: str = None) -> Path:
+    """
+    Downloads a file, fetching it once more from scratch if it does not match its published checksum.
+    """
+    try:
+        return _fetch_once(url, target_path, size, ranges, progress, task_id, connections, segment_size, expected)
+    except ChecksumMismatch as e:
+        console.print(f"[yellow]⚠ Checksum mismatch, downloading again:[/] {e}")
+        progress.update(task_id, completed=0)
+    try:
+        return _fetch_once(url, target_path, size, ranges, progress, task_id, connections, segment_size, expected)
+    except ChecksumMismatch as e:
+        raise RuntimeError(f"Checksum mismatch after downloading again: {e}")
+
+def _download_progress() -> Progress:
+    """
+    The combined progress display shared by the download engines: one bar per file.
+    """
+    return Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description} → [bold blue]{task.fields[filename]}", justify="right"),
         BarColumn(),
@@ -74,47 +309,114 @@ def download_files_threaded(df, selected_indexes, download_dir: Path) -> list[Pa
         TransferSpeedColumn(),
         "•",
         TimeRemainingColumn(),
-    ) as progress:
+    )
+
+def _target_path(url: str, download_dir: Path) -> Path:
+    """
+    Where a dump is stored: Datasets/<year-month>/<filename>, with the month taken
+    from the date in the filename. Creates the folder.
+    """
+    filename = Path(urlparse(url).path).name
+    date_str = filename.split("_")[1]
+    year_month = datetime.strptime(date_str, "%Y%m%d").strftime("%Y-%m")
+    target_folder = download_dir / "Datasets" / year_month
+    target_folder.mkdir(parents=True, exist_ok=True)
+    return target_folder / filename
+
+def _selected_files(files: list, selected_indexes) -> list:
+    """
+    Returns (url, listed size, published sha256) for the selected rows; the size is 0 when
+    the listing has none and the digest None when the month has no CHECKSUM file.
+    """
+    selected = []
+    for i in selected_indexes:
+        row = files[i]
+        expected = published_digest(row.get("checksum_url"), Path(urlparse(row["url"]).path).name)
+        selected.append((row["url"], int(row.get("size_bytes") or 0), expected))
+    return selected
+
+def _already_downloaded(target_path: Path, expected: str) -> bool:
+    """
+    True when a finished download is on disk. Files that were never verified are hashed
+    once against the published digest; a corrupt one is removed so it is downloaded again.
+    """
+    if not is_present(target_path):
+        return False
+    if expected and status(target_path, expected) != "verified":
+        console.print(f"[cyan]🔎 Verifying:[/] {target_path.name}")
+        try:
+            check(target_path, hash_file(target_path).hexdigest(), expected)
+        except ChecksumMismatch as e:
+            console.print(f"[yellow]⚠ Checksum mismatch, downloading again:[/] {e}")
+            return False
+        finally:
+            _record_download(target_path)
+    console.print(f"[yellow]⚠ Already downloaded:[/] {target_path.name}")
+    return True
+
+def _record_download(target_path: Path):
+    """
+    Updates the artifact index for a finished (or discarded) download and its checksum record.
+    """
+    record_artifact(target_path)
+    record_artifact(sidecar_path(target_path))
+
+def _print_summary(paths: list, total_bytes: int, duration: float):
+    """
+    Prints the final download summary.
+    """
+    console.print(f"\n[green]📥 {len(paths)} file(s) downloaded[/]")
+    console.print(f"[cyan]💾 Total size:[/] {total_bytes / (1024 ** 2):.1f} MB")
+    console.print(f"[cyan]⏱ Duration:[/] {duration:.1f} seconds")
+
+def download_files_threaded(files: list, selected_indexes, download_dir: Path, connections: int = CONNECTIONS,
+                            segment_size: int = SEGMENT_SIZE) -> list[Path]:
+    """
+    Downloads multiple files concurrently using threads, each one split over
+    `connections` ranged connections of `segment_size` bytes where the server allows it.
+    Displays a combined progress bar for all downloads.
+    """
+    files = _selected_files(files, selected_indexes)
+    paths = []
+    total_bytes = 0
+    start_time = time.time()
+
+    with telemetry.stage("download", engine="threads", files=len(files)) as metrics, _download_progress() as progress:
         with ThreadPoolExecutor(max_workers=8) as executor:
             futures = []
 
-            for url in urls:
-                filename = Path(urlparse(url).path).name
-
-                # Extract date from filename and create target folder
-                date_str = filename.split("_")[1]
-                year_month = datetime.strptime(date_str, "%Y%m%d").strftime("%Y-%m")
-                target_folder = download_dir / "Datasets" / year_month
-                target_folder.mkdir(parents=True, exist_ok=True)
-                target_path = target_folder / filename
+            for url, listed_size, expected in files:
+                target_path = _target_path(url, download_dir)
+                filename = target_path.name
 
-                # Skip already downloaded files
-                if target_path.exists():
-                    console.print(f"[yellow]⚠ Already downloaded:[/] {filename}")
+                # Skip already downloaded (and intact) files
+                if _already_downloaded(target_path, expected):
                     paths.append(target_path)
                     continue
 
                 # Prepare progress bar for this file
-                total = int(requests.head(url).headers.get("Content-Length", 0))
+                # Sizes come from the S3 listing; only unlisted files cost a HEAD request
+                total, ranges = (listed_size, True) if listed_size else _probe(url)
                 total_bytes += total
                 task_id = progress.add_task("Downloading", filename=filename, total=total)
-                future = executor.submit(_download_file, url, target_path, progress, task_id)
+                future = executor.submit(_fetch, url, target_path, total, ranges, progress, task_id,
+                                         connections, segment_size, expected)
                 futures.append(future)
 
             # Wait for all downloads to finish
             for future in as_completed(futures):
                 try:
                     result = future.result()
+                    _record_download(result)
                     paths.append(result)
                 except Exception as e:
                     console.print(f"[red]Error downloading file:[/] {e}")
 
-    duration = time.time() - start_time
-    size_mb = total_bytes / (1024 ** 2)
+        metrics["bytes_in"] = total_bytes
+        metrics["downloaded"] = len(futures)
+        metrics["skipped"] = len(files) - len(futures)
 
     # Final summary
-    console.print(f"\n[green]📥 {len(paths)} file(s) downloaded[/]")
-    console.print(f"[cyan]💾 Total size:[/] {size_mb:.1f} MB")
-    console.print(f"[cyan]⏱ Duration:[/] {duration:.1f} seconds")
+    _print_summary(paths, total_bytes, time.time() - start_time)
 
     return paths
\ No newline at end of file
@@ -1,25 +1,126 @@
 # discogs/extractor.py
 
 import gzip
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
+from time import perf_counter, process_time
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TimeElapsedColumn, TextColumn
 
+from discogs import telemetry
+from discogs.artifacts import record as record_artifact, find as find_artifacts
+from discogs.checkpoint import atomic_path
+
 console = Console()  # Global console instance for consistent output
 
-def extract_gz(gz_path: Path, delete_original: bool = False) -> Path:
+GZIP_BACKENDS = ("auto", "isal", "zlib-ng", "gzip")
+_BUFFER_SIZE = 4 * 1024 * 1024  # Size of each of the two decompression buffers
+
+
+def _gzip_module(backend: str = "auto"):
+    """
+    Picks the inflate implementation: ISA-L (python-isal) or zlib-ng (zlib-ng bindings)
+    when installed, the standard library's gzip otherwise. All three read the same files.
+    Returns (backend name, module with a gzip-compatible open()).
+    """
+    if backend not in GZIP_BACKENDS:
+        raise ValueError(f"Unknown gzip backend: {backend} (expected one of {', '.join(GZIP_BACKENDS)})")
+    if backend in ("auto", "isal"):
+        try:
+            from isal import igzip
+            return "isal", igzip
+        except ImportError:
+            if backend == "isal":
+                raise RuntimeError("The isal backend needs python-isal: pip install isal")
+    if backend in ("auto", "zlib-ng"):
+        try:
+            from zlib_ng import gzip_ng
+            return "zlib-ng", gzip_ng
+        except ImportError:
+            if backend == "zlib-ng":
+                raise RuntimeError("The zlib-ng backend needs the zlib-ng bindings: pip install zlib-ng")
+    return "gzip", gzip
+
+
+def open_gz(fileobj, backend: str = "auto"):
+    """
+    Opens a .gz stream (path or binary file object) for reading with the fastest installed backend.
+    """
+    return _gzip_module(backend)[1].open(fileobj, "rb")
+
+
+def _decompress(gz_path: Path, xml_path: Path, on_progress=None, backend: str = "auto") -> int:
+    """
+    Double-buffered extraction: a reader thread inflates into one of two preallocated
+    buffers while this thread writes the other one to disk (both release the GIL, so
+    they overlap). on_progress gets the compressed bytes consumed so far.
+    The XML is renamed into place once complete, so an existing one is never partial.
+    Returns the number of bytes written.
+    """
+    free, full = queue.Queue(), queue.Queue()
+    for _ in range(2):
+        free.put(bytearray(_BUFFER_SIZE))
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        try:
+            with open(gz_path, "rb") as raw, open_gz(raw, backend) as f:
+                while not stop.is_set():
+                    buf = free.get()
+                    n = f.readinto(buf)
+                    full.put((buf, n, raw.tell()))
+                    if not n:
+                        return
+        except Exception as e:
+            errors.append(e)
+        full.put((None, 0, 0))  # End marker (after an error, or unread after EOF)
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    written = 0
+    try:
+        with atomic_path(xml_path) as tmp_path:
+            with open(tmp_path, "wb") as out:
+                while True:
+                    buf, n, position = full.get()
+                    if not n:
+                        break
+                    out.write(memoryview(buf)[:n])
+                    written += n
+                    free.put(buf)
+                    if on_progress:
+                        on_progress(position)
+            if errors:
+                raise errors[0]  # Before the rename: a failed extraction never looks complete
+    finally:
+        stop.set()
+        free.put(bytearray(_BUFFER_SIZE))  # Unblocks a reader still waiting for a buffer
+        reader.join()
+
+    if errors:
+        raise errors[0]
+    return written
+
+
+def extract_gz(gz_path: Path, delete_original: bool = False, backend: str = "auto") -> Path:
     """
     Extracts a single .gz file into its original XML format.
-    Optionally deletes the .gz file after extraction.
+    Decompression and disk writes run concurrently (see _decompress), using ISA-L or
+    zlib-ng when installed. Optionally deletes the .gz file after extraction.
     """
     if gz_path.suffix != ".gz":
         raise ValueError("File is not a .gz file")
 
     xml_path = gz_path.with_suffix("")  # Remove ".gz" to get .xml filename
     total_size = gz_path.stat().st_size
+    backend_name = _gzip_module(backend)[0]
 
     # Display progress bar while extracting
-    with Progress(
+    with telemetry.stage("extract", file=gz_path.name, backend=backend_name, bytes_in=total_size) as metrics, Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
@@ -28,30 +129,90 @@ def extract_gz(gz_path: Path, delete_original: bool = False) -> Path:
         TimeElapsedColumn()
     ) as progress:
         task = progress.add_task(f"Extracting {gz_path.name}", total=total_size)
-
-        with gzip.open(gz_path, 'rb') as f_in, open(xml_path, 'wb') as f_out:
-            while True:
-                chunk = f_in.read(1024 * 1024)  # Read in 1MB chunks
-                if not chunk:
-                    break
-                f_out.write(chunk)
-                progress.update(task, advance=len(chunk))
+        metrics["bytes_out"] = _decompress(gz_path, xml_path, lambda position: progress.update(task, completed=position),
+                                           backend_name)
 
     console.print(f"[green]✔ Extracted:[/] {xml_path}")
+    record_artifact(xml_path)
 
     # Optionally remove the original .gz file after extraction
     if delete_original:
         gz_path.unlink()
+        record_artifact(gz_path)
         console.print(f"[yellow]🗑 Deleted original:[/] {gz_path}")
 
     return xml_path
 
-def extract_gz_files(files: list[Path], delete_original: bool = False) -> list[Path]:
+def _extract_job(gz_path: Path, backend: str, updates) -> dict:
+    """
+    Process-pool entry point: extracts one dump and reports progress through a queue.
     """
-    Extracts multiple .gz files in sequence.
+    start, cpu_start = perf_counter(), process_time()
+    written = _decompress(gz_path, gz_path.with_suffix(""), lambda position: updates.put((gz_path, position)), backend)
+    return {
+        "bytes_out": written,
+        "seconds": perf_counter() - start,
+        "cpu_seconds": process_time() - cpu_start,
+    }
+
+def _extract_parallel(files: list, workers: int, backend: str) -> list:
+    """
+    Extracts several dumps at once in a process pool, one progress bar per file.
+    Returns the job results in file order.
+    """
+    results = [None] * len(files)
+    total_in = sum(file.stat().st_size for file in files)
+
+    with telemetry.stage("extract", files=len(files), workers=workers, backend=_gzip_module(backend)[0],
+                         bytes_in=total_in) as metrics, Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        "[progress.percentage]{task.percentage:>3.1f}%",
+        "•",
+        TimeElapsedColumn()
+    ) as progress, multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+        tasks = {file: progress.add_task(f"Extracting {file.name}", total=file.stat().st_size) for file in files}
+        updates = manager.Queue()
+        futures = {executor.submit(_extract_job, file, backend, updates): i for i, file in enumerate(files)}
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            while not updates.empty():
+                file, position = updates.get()
+                progress.update(tasks[file], completed=position)
+            for future in done:
+                i = futures[future]
+                results[i] = future.result()
+                progress.update(tasks[files[i]], completed=files[i].stat().st_size)
+
+        metrics["bytes_out"] = sum(result["bytes_out"] for result in results)
+
+    cpu_seconds = sum(result["cpu_seconds"] for result in results)
+    console.print(f"[bold white]⚡ Extracted {len(files)} files with {workers} workers:[/] "
+                  f"{cpu_seconds:.1f}s of CPU work in {metrics['wall_seconds']:.1f}s")
+    return results
+
+def extract_gz_files(files: list[Path], delete_original: bool = False, workers: int = 1,
+                     backend: str = "auto") -> list[Path]:
+    """
+    Extracts multiple .gz files, one after another or, with workers > 1,
+    several at once in separate processes.
     Returns a list of extracted XML file paths.
     """
-    return [extract_gz(file, delete_original=delete_original) for file in files]
+    if workers <= 1 or len(files) < 2:
+        return [extract_gz(file, delete_original=delete_original, backend=backend) for file in files]
+
+    _extract_parallel(files, min(workers, len(files)), backend)
+    for file in files:
+        console.print(f"[green]✔ Extracted:[/] {file.with_suffix('')}")
+        record_artifact(file.with_suffix(""))
+        if delete_original:
+            file.unlink()
+            record_artifact(file)
+            console.print(f"[yellow]🗑 Deleted original:[/] {file}")
+    return [file.with_suffix("") for file in files]
 
 def get_extracted_path(gz_path: Path) -> Path:
     """
@@ -59,34 +220,38 @@ def get_extracted_path(gz_path: Path) -> Path:
     """
     return gz_path.with_suffix("")
 
-def extract_interactively():
+def extract_interactively(workers: int = 1):
     """
-    Prompts user to select .gz files for extraction.
+    Prompts user to select .gz files for extraction (comma-separated numbers or 'all').
+    Several files are extracted in parallel when workers > 1.
     """
     from rich.prompt import Prompt
     from discogs.config import get_download_dir
     from discogs.utils import open_folder
 
     download_dir = get_download_dir()
-    dataset_dir = download_dir / "Datasets"
-
-    gz_files = list(dataset_dir.rglob("*.gz"))
+    gz_files = find_artifacts(download_dir, "gz")
     if not gz_files:
         console.print("[red]No .gz files found to extract.[/red]")
         return
 
-    console.print("[bold]Select .gz file to extract:[/bold]")
+    console.print("[bold]Select .gz file(s) to extract:[/bold]")
     for i, file in enumerate(gz_files):
         console.print(f"[{i + 1}] {file.relative_to(download_dir)}")
 
-    choice = Prompt.ask("Enter number", default="1")
+    choice = Prompt.ask("Enter number(s) (comma-separated or 'all')", default="1")
     try:
-        idx = int(choice.strip()) - 1
-        if 0 <= idx < len(gz_files):
-            file = gz_files[idx]
-            extract_gz(file)
-            open_folder(file.parent)
+        if choice.strip().lower() == "all":
+            indices = list(range(len(gz_files)))
         else:
-            console.print("[red]Invalid selection.[/red]")
-    except:
-        console.print("[red]Invalid input.[/red]")
\ No newline at end of file
+            indices = [int(x.strip()) - 1 for x in choice.split(",")]
+    except ValueError:
+        console.print("[red]Invalid input.[/red]")
+        return
+    if not all(0 <= idx < len(gz_files) for idx in indices):
+        console.print("[red]Invalid selection.[/red]")
+        return
+
+    files = [gz_files[idx] for idx in dict.fromkeys(indices)]
+    extract_gz_files(files, workers=workers)
+    open_folder(files[0].parent)
@@ -0,0 +1,51 @@
+# discogs/http_client.py
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_HOSTS = 4  # Hosts to keep connection pools for (the S3 bucket is the only one in practice)
+POOL_SIZE = 64  # Keep-alive connections per host (opened lazily): 8 files × up to 8 ranged connections
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_adapter = None
+_local = threading.local()
+_lock = threading.Lock()
+
+
+def _shared_adapter() -> HTTPAdapter:
+    """
+    Returns the one transport adapter (and so the one connection pool) of the process.
+    Failed connects and retryable statuses are retried with exponential backoff before
+    a response reaches the caller; interrupted bodies are resumed by the downloader.
+    """
+    global _adapter
+    with _lock:
+        if _adapter is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=("HEAD", "GET"),
+                respect_retry_after_header=True,
+            )
+            _adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE,
+                                   max_retries=retry)
+        return _adapter
+
+
+def get_session() -> requests.Session:
+    """
+    Returns this thread's session. Every thread gets its own Session (sessions are not
+    thread-safe), but all of them share one pooled adapter, so keep-alive connections
+    are reused across threads and requests.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = _shared_adapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
@@ -0,0 +1,273 @@
+# discogs/indexer.py
+
+import os
+import re
+import sys
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from rich.console import Console
+from rich.progress import Progress, BarColumn, TimeElapsedColumn, TextColumn
+
+from discogs.chunker import iter_record_spans, sanitize_record
+
+console = Console()
+
+# Sidecar layout (<dump>.idx next to the XML): a fixed header followed by three
+# native-endian columns sorted by id: ids (uint64), byte offsets (uint64) and
+# record lengths (uint32). Keeping the ids contiguous lets lookups bisect them
+# straight out of the memory-mapped file.
+INDEX_MAGIC = b"DGIX"
+INDEX_VERSION = 1
+_HEADER = struct.Struct("<4sH2sQQQ")  # magic, version, byte order, records, source size, source mtime_ns
+_BYTE_ORDER = b"le" if sys.byteorder == "little" else b"be"
+_ENTRY_SIZE = 8 + 8 + 4  # Bytes per record across the three columns
+
+_ID_ATTRIBUTE = re.compile(rb'\sid="(\d+)"')  # <release id="1" ...>, <master id="1">
+_ID_ELEMENT = re.compile(rb"<id>\s*(\d+)\s*</id>")  # <artist><id>1</id>, <label><id>1</id>
+
+
+def index_path(xml_file: Path) -> Path:
+    """
+    Returns the path of the record-offset index that belongs to an extracted dump.
+    """
+    return xml_file.with_suffix(".idx")
+
+
+def _record_id(buf, start: int, end: int):
+    """
+    Reads the id of the record at buf[start:end]: the id attribute of the opening
+    tag (releases, masters) or the first <id> child (artists, labels).
+    Returns None when the record has no id.
+    """
+    gt = buf.find(b">", start, end)
+    match = _ID_ATTRIBUTE.search(buf, start, gt) or _ID_ELEMENT.search(buf, gt, end)
+    return int(match.group(1)) if match else None
+
+
+def build_index(xml_file: Path, content_type: str) -> Path:
+    """
+    Scans an extracted dump once, using the chunker's record boundary detection, and
+    writes (id, offset, length) for every record into a sorted binary sidecar file.
+    Returns the index path.
+    """
+    ids, offsets, lengths = array("Q"), array("Q"), array("I")
+    stat = xml_file.stat()
+    skipped = 0
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        "[progress.percentage]{task.percentage:.1f}%",
+        "•",
+        TimeElapsedColumn()
+    ) as progress, open(xml_file, "rb") as f:
+        task = progress.add_task(f"Indexing {xml_file.name}", total=stat.st_size)
+
+        if stat.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for count, (start, end) in enumerate(iter_record_spans(mm, content_type), start=1):
+                    record_id = _record_id(mm, start, end)
+                    if record_id is None:
+                        skipped += 1
+                        continue
+                    ids.append(record_id)
+                    offsets.append(start)
+                    lengths.append(end - start)
+                    if count % 10000 == 0:
+                        progress.update(task, completed=end)
+
+        progress.update(task, completed=stat.st_size)
+
+    # Dumps are normally already in id order; only sort when they aren't
+    if any(ids[i] > ids[i + 1] for i in range(len(ids) - 1)):
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        ids = array("Q", (ids[i] for i in order))
+        offsets = array("Q", (offsets[i] for i in order))
+        lengths = array("I", (lengths[i] for i in order))
+
+    # Written under a temp name and renamed once complete: the header alone would make a
+    # truncated index look current
+    output_path = index_path(xml_file)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as out:
+            out.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, _BYTE_ORDER, len(ids), stat.st_size, stat.st_mtime_ns))
+            ids.tofile(out)
+            offsets.tofile(out)
+            lengths.tofile(out)
+        tmp_path.replace(output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    console.print(f"[green]✔ Indexed {len(ids):,} records:[/] {output_path} ({size_mb:.2f} MB)")
+    if skipped:
+        console.print(f"[yellow]⚠ Skipped {skipped} record(s) without an id.[/yellow]")
+    return output_path
+
+
+def _read_header(path: Path):
+    """
+    Returns the unpacked index header, or None if the file is not an index this version can
+    read or is not exactly as long as its record count says (e.g. truncated).
+    """
+    with open(path, "rb") as f:
+        data = f.read(_HEADER.size)
+        size = os.fstat(f.fileno()).st_size
+    if len(data) < _HEADER.size:
+        return None
+    header = _HEADER.unpack(data)
+    if header[:3] != (INDEX_MAGIC, INDEX_VERSION, _BYTE_ORDER):
+        return None
+    if size != _HEADER.size + _ENTRY_SIZE * header[3]:
+        return None
+    return header
+
+
+def index_is_current(xml_file: Path) -> bool:
+    """
+    True when the sidecar index exists and was built from the XML file as it is now.
+    """
+    path = index_path(xml_file)
+    if not path.exists():
+        return False
+    header = _read_header(path)
+    stat = xml_file.stat()
+    return header is not None and header[4:] == (stat.st_size, stat.st_mtime_ns)
+
+
+def ensure_index(xml_file: Path, content_type: str) -> Path:
+    """
+    Returns the index of an extracted dump, building it first if it is missing or stale.
+    """
+    if not index_is_current(xml_file):
+        build_index(xml_file, content_type)
+    return index_path(xml_file)
+
+
+def find_records(xml_file: Path, content_type: str, ids) -> dict:
+    """
+    Looks up record ids through the memory-mapped index.
+    Returns {id: (offset, length)} for the ids that exist in the dump.
+    """
+    path = ensure_index(xml_file, content_type)
+    count = _read_header(path)[3]
+    found = {}
+    if not count:
+        return found
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        ids_start = _HEADER.size
+        offsets_start = ids_start + 8 * count
+        lengths_start = offsets_start + 8 * count
+        index_ids = view[ids_start:offsets_start].cast("Q")
+        index_offsets = view[offsets_start:lengths_start].cast("Q")
+        index_lengths = view[lengths_start:lengths_start + 4 * count].cast("I")
+        try:
+            for record_id in ids:
+                i = bisect_left(index_ids, record_id)
+                if i < count and index_ids[i] == record_id:
+                    found[record_id] = (index_offsets[i], index_lengths[i])
+        finally:
+            # Views must be released before the mmap can close
+            for v in (index_ids, index_offsets, index_lengths, view):
+                v.release()
+    return found
+
+
+def read_records(xml_file: Path, content_type: str, ids) -> dict:
+    """
+    Pulls the raw XML of the given records straight out of the dump via the index.
+    Returns {id: record bytes} in file order; missing ids are left out.
+    """
+    spans = find_records(xml_file, content_type, ids)
+    records = {}
+    with open(xml_file, "rb") as f:
+        for record_id, (offset, length) in sorted(spans.items(), key=lambda item: item[1][0]):
+            f.seek(offset)
+            records[record_id] = f.read(length)
+    return records
+
+
+def write_records_xml(records, content_type: str, output_path: Path):
+    """
+    Writes raw records into a standalone XML file with the dump's root element,
+    sanitized the same way the chunker does.
+    """
+    with open(output_path, "wb") as out:
+        out.write(f'<?xml version="1.0" encoding="utf-8"?>\n<{content_type}>\n'.encode())
+        for record in records:
+            out.write(sanitize_record(record))
+            out.write(b"\n")
+        out.write(f"</{content_type}>".encode())
+
+
+def chunk_records_by_id(xml_file: Path, content_type: str, ids, records_per_file: int = 10000) -> Path:
+    """
+    Index-backed counterpart of chunk_xml_by_type: writes only the requested records
+    into chunk files, so a handful of ids never needs a scan of the whole dump.
+    Returns the chunk folder.
+    """
+    ids = list(ids)
+    records = read_records(xml_file, content_type, ids)
+    missing = len(set(ids) - records.keys())
+    if missing:
+        console.print(f"[yellow]⚠ {missing} id(s) not found in {xml_file.name}.[/yellow]")
+
+    chunk_folder = xml_file.parent / f"chunked_{content_type}"
+    chunk_folder.mkdir(parents=True, exist_ok=True)
+    values = list(records.values())
+    for number, i in enumerate(range(0, len(values), records_per_file), start=1):
+        write_records_xml(values[i:i + records_per_file], content_type, chunk_folder / f"chunk_{number:05}.xml")
+
+    console.print(f"[green]✔ Pulled {len(records)} record(s) via index:[/] {chunk_folder}")
+    return chunk_folder
+
+
+def parse_ids(values) -> list:
+    """
+    Turns id arguments ("123", "1,2,3", "@ids.txt" with one id per line or comma-separated)
+    into a de-duplicated list of ints, keeping the given order.
+    """
+    ids = []
+    for value in values:
+        value = str(value)
+        if value.startswith("@"):
+            value = Path(value[1:]).read_text()
+        for part in re.split(r"[\s,]+", value):
+            if part:
+                ids.append(int(part))
+    return list(dict.fromkeys(ids))
+
+
+def select_xml_file():
+    """
+    Prompts user to select one of the extracted XML files. Returns None if nothing was picked.
+    """
+    from rich.prompt import Prompt
+    from discogs.config import get_download_dir
+    from discogs.artifacts import find as find_artifacts
+
+    download_dir = get_download_dir()
+    xml_files = find_artifacts(download_dir, "xml")
+    if not xml_files:
+        console.print("[red]No XML files found.[/red]")
+        return None
+
+    console.print("[bold]Select XML file:[/bold]")
+    for i, file in enumerate(xml_files):
+        console.print(f"[{i + 1}] {file.relative_to(download_dir)}")
+
+    choice = Prompt.ask("Enter number", default="1")
+    try:
+        idx = int(choice.strip()) - 1
+    except ValueError:
+        idx = -1
+    if not 0 <= idx < len(xml_files):
+        console.print("[red]Invalid selection.[/red]")
+        return None
+    return xml_files[idx]
@@ -1,17 +1,17 @@
 # discogs/main.py
 
 import typer
-from discogs.selector import show_welcome, display_status_table, select_indices
-from discogs.scraper import get_latest_files
-from discogs.downloader import download_files_threaded
-from discogs.extractor import extract_gz_files
-from discogs.converter import convert_xml_to_csv
+from contextlib import contextmanager
+from typing import List, Optional
 from discogs.config import get_download_dir
-from discogs.utils import open_folder
 from pathlib import Path
 from rich.console import Console
 import time
 
+# Every command imports what it needs when it runs (the converter, downloader, requests and
+# so on), so `--help`, `config` or a cached `show` do not pay for the whole pipeline at startup.
+# benchmarks/bench_startup.py guards this.
+
 # Initialize CLI app with help text
 app = typer.Typer(
     help="📦 Discogs CLI - Download, extract, and convert Discogs data dumps.",
@@ -20,25 +20,193 @@ app = typer.Typer(
 
 console = Console()
 
+def _check_output_options(layout: str, output_format: str, engine: str = "auto", projection=None, shards=None):
+    """
+    Rejects unknown --layout/--format/--engine values (or Parquet without pyarrow) before any work starts.
+    """
+    from discogs.converter import check_output_options, ENGINES
+    try:
+        check_output_options(layout, output_format, projection, shards)
+    except (ValueError, RuntimeError) as e:
+        raise typer.BadParameter(str(e))
+    if engine not in ENGINES:
+        raise typer.BadParameter(f"expected one of: {', '.join(ENGINES)}", param_hint="--engine")
+
+def _memory_plan(max_memory: Optional[str], workers: int, output_format: str):
+    """
+    Turns --max-memory into a memory plan (see discogs.memory), or None without one.
+    """
+    if max_memory is None:
+        return None
+    from discogs.memory import parse_size, plan, describe
+    try:
+        memory = plan(parse_size(max_memory), workers, output_format)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--max-memory")
+    if memory["workers"] < workers:
+        console.print(f"[yellow]⚠ --max-memory leaves room for {memory['workers']} of {workers} workers.[/yellow]")
+    console.print(f"[bold white]🧠 Memory plan:[/] {describe(memory)}")
+    return memory
+
+def _shard_spec(shard_size: Optional[str], shard_rows: int):
+    """
+    Turns --shard-size/--shard-rows into a shard spec (see discogs.shards), or None without them.
+    """
+    from discogs.shards import shard_spec
+    try:
+        return shard_spec(shard_size, shard_rows)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--shard-size/--shard-rows")
+
+DOWNLOADERS = ("threads", "async")
+
+def _download_options(downloader: str, connections: int, segment_size: int, concurrency: int, limit_rate: float) -> dict:
+    """
+    Validates the download options before any work starts and returns them as engine keyword
+    arguments (--segment-size and --limit-rate converted from MB to bytes).
+    """
+    if downloader not in DOWNLOADERS:
+        raise typer.BadParameter(f"expected one of: {', '.join(DOWNLOADERS)}", param_hint="--downloader")
+    if segment_size < 1:
+        raise typer.BadParameter("must be at least 1 (MB)", param_hint="--segment-size")
+    if concurrency < 1:
+        raise typer.BadParameter("must be at least 1", param_hint="--concurrency")
+    if limit_rate < 0:
+        raise typer.BadParameter("must be 0 (unlimited) or more", param_hint="--limit-rate")
+    options = {"connections": connections, "segment_size": segment_size * 1024 * 1024}
+    if downloader == "async":
+        from discogs.async_downloader import require_aiohttp
+        try:
+            require_aiohttp()
+        except RuntimeError as e:
+            raise typer.BadParameter(str(e), param_hint="--downloader")
+        options.update(engine="async", concurrency=concurrency, limit_rate=limit_rate * 1024 * 1024)
+    elif limit_rate:
+        raise typer.BadParameter("needs --downloader async", param_hint="--limit-rate")
+    return options
+
+def _download(files: list, indices, download_dir: Path, options: dict) -> List[Path]:
+    """
+    Downloads the selected files with the engine picked by --downloader.
+    """
+    options = dict(options)
+    if options.pop("engine", "threads") == "async":
+        from discogs.async_downloader import download_files_async
+        return download_files_async(files, indices, download_dir, **options)
+    from discogs.downloader import download_files_threaded
+    return download_files_threaded(files, indices, download_dir, **options)
+
+def _listing_options(offline: bool, refresh: bool) -> dict:
+    """
+    Validates --offline / --refresh, which pick how the cached S3 file list is used.
+    """
+    if offline and refresh:
+        raise typer.BadParameter("cannot be combined with --refresh", param_hint="--offline")
+    return {"offline": offline, "refresh": refresh}
+
+def _latest_files(listing: dict) -> list:
+    """
+    Returns the latest file list (from the local catalog when fresh), exiting with a
+    message when --offline finds nothing cached.
+    """
+    from discogs.scraper import get_latest_files
+    try:
+        return get_latest_files(**listing)
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+@contextmanager
+def _instrumented(command: str, metrics_out: Optional[Path], profile: Optional[str], profiler: str,
+                  memory: dict = None):
+    """
+    Runs a command as one "total" telemetry stage (with the pipeline stages nested inside), optionally
+    profiling a single stage, and writes the --metrics-out report even if the command fails.
+    Under --max-memory the per-stage resource report is printed at the end.
+    """
+    from discogs import telemetry
+    if profile and profile not in ("total", *telemetry.STAGES):
+        raise typer.BadParameter(f"expected one of: {', '.join(('total', *telemetry.STAGES))}", param_hint="--profile")
+    if profiler not in telemetry.PROFILERS:
+        raise typer.BadParameter(f"expected one of: {', '.join(telemetry.PROFILERS)}", param_hint="--profiler")
+    telemetry.configure(command, profile, profiler, metrics_out.parent if metrics_out else None)
+    try:
+        with telemetry.stage("total", command=command):
+            yield
+    finally:
+        if memory:
+            telemetry.print_resources(memory["max_memory"] / 1024 ** 2)
+        if metrics_out:
+            telemetry.write_report(metrics_out)
+
 @app.command(help="One-click pipeline: Fetch latest files, download, extract, and convert to CSV.")
-def run():
+def run(
+    two_pass: bool = typer.Option(False, "--two-pass", help="Scan chunks for columns before writing (parses every chunk twice; not with --stream)."),
+    workers: int = typer.Option(1, "--workers", "-w", help="Processes used to extract dumps and convert chunks (0 = all CPU cores)."),
+    stream: bool = typer.Option(False, "--stream", help="Convert straight from .gz without writing the extracted XML or chunk files."),
+    layout: str = typer.Option("wide", "--layout", help="Output layout: 'wide' (one CSV) or 'normalized' (parent + child tables)."),
+    output_format: str = typer.Option("csv", "--format", help="Output file format: 'csv', 'parquet' (needs pyarrow) or 'sqlite' (indexed on record ids)."),
+    engine: str = typer.Option("auto", "--engine", help="XML parser: 'auto', 'etree', 'expat' or 'lxml' (falls back to expat if missing)."),
+    columns: Optional[List[str]] = typer.Option(None, "--columns", help="Only keep these flattened columns (comma-separated, globs like 'artist_*' allowed)."),
+    exclude_columns: Optional[List[str]] = typer.Option(None, "--exclude-columns", help="Drop these flattened columns (comma-separated, globs allowed)."),
+    rescan: bool = typer.Option(False, "--rescan", help="Ignore the schema catalog and rediscover the columns."),
+    record_hashes: bool = typer.Option(False, "--record-hashes", help="Also store the per-record hash table that next month's 'discogs diff' compares against (hashed while chunking)."),
+    offline: bool = typer.Option(False, "--offline", help="Use the cached S3 file list without any network request."),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore the cached S3 file list and list the bucket again."),
+    connections: int = typer.Option(4, "--connections", help="Parallel ranged connections per file (1 = a single stream)."),
+    segment_size: int = typer.Option(64, "--segment-size", help="Size of each ranged download segment in MB."),
+    downloader: str = typer.Option("threads", "--downloader", help="Download engine: 'threads' or 'async' (one event loop, needs aiohttp)."),
+    concurrency: int = typer.Option(8, "--concurrency", help="Transfers in flight across all files (async engine)."),
+    limit_rate: float = typer.Option(0, "--limit-rate", help="Cap total download bandwidth in MB/s (async engine, 0 = unlimited)."),
+    shard_size: Optional[str] = typer.Option(None, "--shard-size", help="Split wide CSV/Parquet output into part files of about this size, e.g. 256M or 1G (MB by default), listed in a manifest."),
+    shard_rows: int = typer.Option(0, "--shard-rows", help="Split wide CSV/Parquet output into part files of at most this many rows (0 = no limit)."),
+    max_memory: Optional[str] = typer.Option(None, "--max-memory", help="Memory budget, e.g. 2G or 1500 (MB): sizes workers, chunks and write batches to fit, and reports the peak per stage."),
+    metrics_out: Optional[Path] = typer.Option(None, "--metrics-out", help="Write per-stage timings, throughput and memory to this .json (or appended .jsonl) file."),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Profile one stage (e.g. convert, chunk, flatten, merge)."),
+    profiler: str = typer.Option("cprofile", "--profiler", help="Profiler for --profile: 'cprofile' or 'sample' (collapsed stacks)."),
+):
     """
     Full automated pipeline: shows welcome screen, fetches files,
     lets user choose which ones to download, then downloads, extracts,
     and converts them to CSV.
     """
+    from discogs.converter import parse_projection, resolve_workers
+    projection = parse_projection(columns, exclude_columns)
+    shards = _shard_spec(shard_size, shard_rows)
+    _check_output_options(layout, output_format, engine, projection, shards)
+    if stream and two_pass:
+        raise typer.BadParameter("cannot be combined with --stream, which converts in a single pass", param_hint="--two-pass")
+    download_options = _download_options(downloader, connections, segment_size, concurrency, limit_rate)
+    listing = _listing_options(offline, refresh)
+    memory = _memory_plan(max_memory, resolve_workers(workers), output_format)
+    with _instrumented("run", metrics_out, profile, profiler, memory):
+        _run_pipeline(two_pass, workers, stream, layout, output_format, engine, projection, rescan, download_options,
+                      listing, memory, shards, record_hashes)
+
+def _run_pipeline(two_pass: bool, workers: int, stream: bool, layout: str, output_format: str, engine: str,
+                  projection, rescan: bool, download_options: dict, listing: dict, memory: dict = None,
+                  shards: dict = None, record_hashes: bool = False):
+    """
+    Body of the run command: fetch, select, download, then extract + convert (or stream).
+    """
+    from discogs.selector import show_welcome, display_status_table, select_indices
+    from discogs.converter import convert_xml_to_csv, resolve_workers
+    from discogs.extractor import extract_gz_files
+    from discogs.artifacts import is_present
+    from discogs.utils import open_folder
+
     show_welcome()
     download_dir = get_download_dir()
 
     typer.echo("\U0001F50D Fetching available Discogs files...")
-    df = get_latest_files()
+    files = _latest_files(listing)
 
-    if df.empty:
+    if not files:
         typer.echo("No data found.")
         raise typer.Exit()
 
-    display_status_table(df, download_dir)
-    indices = select_indices(df)
+    display_status_table(files, download_dir)
+    indices = select_indices(files)
 
     if not indices:
         typer.echo("No selection made.")
@@ -46,106 +214,270 @@ def run():
 
     start = time.time()
 
-    downloaded = download_files_threaded(df, indices, download_dir)
-    extracted = extract_gz_files(downloaded)
+    downloaded = _download(files, indices, download_dir, download_options)
 
-    for xml_file in extracted:
-        content_type = xml_file.stem.split("_")[-1]
-        convert_xml_to_csv(xml_file, content_type)
+    if stream:
+        from discogs.pipeline import convert_gz_files
+        convert_gz_files(downloaded, workers=resolve_workers(workers), layout=layout, output_format=output_format,
+                         engine=engine, projection=projection, rescan=rescan, memory=memory, shards=shards,
+                         record_hashes=record_hashes)
+    else:
+        # Extractions are written atomically, so an existing XML is complete; keeping it
+        # (rather than extracting again) lets an interrupted conversion resume its checkpoint
+        pending = [gz for gz in downloaded if not is_present(gz.with_suffix(""))]
+        for gz in downloaded:
+            if gz not in pending:
+                console.print(f"[yellow]⚠ Already extracted:[/] {gz.with_suffix('').name}")
+        extract_gz_files(pending, workers=resolve_workers(workers))
+        extracted = [gz.with_suffix("") for gz in downloaded]
+
+        for xml_file in extracted:
+            content_type = xml_file.stem.split("_")[-1]
+            convert_xml_to_csv(xml_file, content_type, single_pass=not two_pass, workers=resolve_workers(workers),
+                               layout=layout, output_format=output_format, engine=engine, projection=projection,
+                               rescan=rescan, memory=memory, shards=shards, record_hashes=record_hashes)
 
     duration = time.time() - start
     typer.secho(f"\n✅ Done in {duration:.1f} seconds!", fg="green")
     open_folder(download_dir)
 
 @app.command()
-@app.command()
-def download():
+def download(
+    offline: bool = typer.Option(False, "--offline", help="Use the cached S3 file list without any network request."),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore the cached S3 file list and list the bucket again."),
+    connections: int = typer.Option(4, "--connections", help="Parallel ranged connections per file (1 = a single stream)."),
+    segment_size: int = typer.Option(64, "--segment-size", help="Size of each ranged download segment in MB."),
+    downloader: str = typer.Option("threads", "--downloader", help="Download engine: 'threads' or 'async' (one event loop, needs aiohttp)."),
+    concurrency: int = typer.Option(8, "--concurrency", help="Transfers in flight across all files (async engine)."),
+    limit_rate: float = typer.Option(0, "--limit-rate", help="Cap total download bandwidth in MB/s (async engine, 0 = unlimited)."),
+    metrics_out: Optional[Path] = typer.Option(None, "--metrics-out", help="Write per-stage timings, throughput and memory to this .json (or appended .jsonl) file."),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Profile one stage (e.g. convert, chunk, flatten, merge)."),
+    profiler: str = typer.Option("cprofile", "--profiler", help="Profiler for --profile: 'cprofile' or 'sample' (collapsed stacks)."),
+):
     """
     Download selected Discogs data files only (no extract or convert).
     """
+    download_options = _download_options(downloader, connections, segment_size, concurrency, limit_rate)
+    listing = _listing_options(offline, refresh)
+    with _instrumented("download", metrics_out, profile, profiler):
+        _download_selected(download_options, listing)
+
+def _download_selected(download_options: dict, listing: dict):
+    """
+    Body of the download command: fetch the file list, let the user pick, download.
+    """
+    from discogs.selector import display_status_table, select_indices
+    from discogs.utils import open_folder
+
     download_dir = get_download_dir()
     typer.echo("\U0001F50D Fetching available Discogs files...")
-    df = get_latest_files()
+    files = _latest_files(listing)
 
-    if df.empty:
+    if not files:
         typer.echo("No data found.")
         raise typer.Exit()
 
-    display_status_table(df, download_dir)
-    indices = select_indices(df)
+    display_status_table(files, download_dir)
+    indices = select_indices(files)
     if not indices:
         typer.echo("No files selected.")
         raise typer.Exit()
 
-    download_files_threaded(df, indices, download_dir)
+    _download(files, indices, download_dir, download_options)
 
     open_folder(download_dir)
 
 @app.command()
-def convert():
+def convert(
+    two_pass: bool = typer.Option(False, "--two-pass", help="Scan chunks for columns before writing (parses every chunk twice)."),
+    workers: int = typer.Option(1, "--workers", "-w", help="Processes used to convert chunks (0 = all CPU cores)."),
+    layout: str = typer.Option("wide", "--layout", help="Output layout: 'wide' (one CSV) or 'normalized' (parent + child tables)."),
+    output_format: str = typer.Option("csv", "--format", help="Output file format: 'csv', 'parquet' (needs pyarrow) or 'sqlite' (indexed on record ids)."),
+    engine: str = typer.Option("auto", "--engine", help="XML parser: 'auto', 'etree', 'expat' or 'lxml' (falls back to expat if missing)."),
+    ids: Optional[List[str]] = typer.Option(None, "--ids", help="Only convert these record ids (comma-separated, or @file), via the record index."),
+    columns: Optional[List[str]] = typer.Option(None, "--columns", help="Only keep these flattened columns (comma-separated, globs like 'artist_*' allowed)."),
+    exclude_columns: Optional[List[str]] = typer.Option(None, "--exclude-columns", help="Drop these flattened columns (comma-separated, globs allowed)."),
+    rescan: bool = typer.Option(False, "--rescan", help="Ignore the schema catalog and rediscover the columns."),
+    record_hashes: bool = typer.Option(False, "--record-hashes", help="Also store the per-record hash table that next month's 'discogs diff' compares against."),
+    shard_size: Optional[str] = typer.Option(None, "--shard-size", help="Split wide CSV/Parquet output into part files of about this size, e.g. 256M or 1G (MB by default), listed in a manifest."),
+    shard_rows: int = typer.Option(0, "--shard-rows", help="Split wide CSV/Parquet output into part files of at most this many rows (0 = no limit)."),
+    max_memory: Optional[str] = typer.Option(None, "--max-memory", help="Memory budget, e.g. 2G or 1500 (MB): sizes workers, chunks and write batches to fit, and reports the peak per stage."),
+    metrics_out: Optional[Path] = typer.Option(None, "--metrics-out", help="Write per-stage timings, throughput and memory to this .json (or appended .jsonl) file."),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Profile one stage (e.g. convert, chunk, flatten, merge)."),
+    profiler: str = typer.Option("cprofile", "--profiler", help="Profiler for --profile: 'cprofile' or 'sample' (collapsed stacks)."),
+):
     """Convert extracted XML files to CSV (interactive mode)."""
-    from discogs.converter import convert_interactively
-    convert_interactively()
+    from discogs.converter import convert_interactively, resolve_workers, parse_projection
+    projection = parse_projection(columns, exclude_columns)
+    shards = _shard_spec(shard_size, shard_rows)
+    _check_output_options(layout, output_format, engine, projection, shards)
+    memory = _memory_plan(max_memory, resolve_workers(workers), output_format)
+    with _instrumented("convert", metrics_out, profile, profiler, memory):
+        convert_interactively(single_pass=not two_pass, workers=resolve_workers(workers), layout=layout,
+                              output_format=output_format, engine=engine, ids=_parse_ids(ids) if ids else None,
+                              projection=projection, rescan=rescan, record_hashes=record_hashes, memory=memory,
+                              shards=shards)
+
+@app.command()
+def diff(
+    file: Optional[Path] = typer.Option(None, "--file", "-f", help="Dump to diff, extracted (.xml) or not (.xml.gz) (default: choose interactively)."),
+    base: Optional[Path] = typer.Option(None, "--base", help="Earlier dump or its .hashes table to compare against (default: the latest earlier month found)."),
+    workers: int = typer.Option(1, "--workers", "-w", help="Processes used to convert changed records (0 = all CPU cores)."),
+    layout: str = typer.Option("wide", "--layout", help="Output layout: 'wide' (one CSV) or 'normalized' (parent + child tables)."),
+    output_format: str = typer.Option("csv", "--format", help="Output file format: 'csv', 'parquet' (needs pyarrow) or 'sqlite' (indexed on record ids)."),
+    engine: str = typer.Option("auto", "--engine", help="XML parser: 'auto', 'etree', 'expat' or 'lxml' (falls back to expat if missing)."),
+    columns: Optional[List[str]] = typer.Option(None, "--columns", help="Only keep these flattened columns (comma-separated, globs like 'artist_*' allowed)."),
+    exclude_columns: Optional[List[str]] = typer.Option(None, "--exclude-columns", help="Drop these flattened columns (comma-separated, globs allowed)."),
+    metrics_out: Optional[Path] = typer.Option(None, "--metrics-out", help="Write per-stage timings, throughput and memory to this .json (or appended .jsonl) file."),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Profile one stage (e.g. diff, convert, flatten, merge)."),
+    profiler: str = typer.Option("cprofile", "--profiler", help="Profiler for --profile: 'cprofile' or 'sample' (collapsed stacks)."),
+):
+    """Convert only the records inserted, updated or deleted since the previous month."""
+    from discogs.converter import resolve_workers, parse_projection
+    from discogs.delta import diff_dump, select_dump
+    projection = parse_projection(columns, exclude_columns)
+    _check_output_options(layout, output_format, engine, projection)
+    data_path = file or select_dump()
+    if data_path is None:
+        raise typer.Exit()
+    if not data_path.is_file():
+        raise typer.BadParameter(f"{data_path} does not exist", param_hint="--file")
+    content_type = data_path.name.partition(".")[0].split("_")[-1]
+
+    with _instrumented("diff", metrics_out, profile, profiler):
+        try:
+            diff_dump(data_path, content_type, base=base, workers=resolve_workers(workers), layout=layout,
+                      output_format=output_format, engine=engine, projection=projection)
+        except (FileNotFoundError, ValueError) as e:
+            console.print(f"[red]{e}[/red]")
+            raise typer.Exit(1)
+
+def _parse_ids(values: list) -> list:
+    """
+    Parses id arguments for --ids / lookup, turning bad input into a usage error.
+    """
+    from discogs.indexer import parse_ids
+    try:
+        return parse_ids(values)
+    except (ValueError, OSError) as e:
+        raise typer.BadParameter(str(e), param_hint="ids")
+
+@app.command()
+def index(file: Optional[Path] = typer.Option(None, "--file", "-f", help="Extracted XML dump to index (default: choose interactively).")):
+    """Build the record-offset index used by lookup and convert --ids."""
+    from discogs.indexer import build_index, select_xml_file
+    xml_file = file or select_xml_file()
+    if xml_file is None:
+        raise typer.Exit()
+    build_index(xml_file, xml_file.stem.split("_")[-1])
+
+@app.command()
+def lookup(
+    ids: List[str] = typer.Argument(..., help="Record ids to pull out (space/comma-separated, or @file)."),
+    file: Optional[Path] = typer.Option(None, "--file", "-f", help="Extracted XML dump to search (default: choose interactively)."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write the records to this XML file instead of printing them."),
+):
+    """Pull single records out of an extracted dump by id, using the record-offset index."""
+    from discogs.indexer import read_records, write_records_xml, select_xml_file, sanitize_record
+    wanted = _parse_ids(ids)
+    xml_file = file or select_xml_file()
+    if xml_file is None:
+        raise typer.Exit()
+    content_type = xml_file.stem.split("_")[-1]
+
+    start = time.perf_counter()
+    records = read_records(xml_file, content_type, wanted)
+    duration = time.perf_counter() - start
+
+    if output:
+        write_records_xml(records.values(), content_type, output)
+        console.print(f"[green]✔ Saved {len(records)} record(s):[/] {output}")
+    else:
+        for record in records.values():
+            typer.echo(sanitize_record(record).decode("utf-8", errors="replace"))
+
+    missing = [str(i) for i in wanted if i not in records]
+    if missing:
+        console.print(f"[yellow]⚠ Not found:[/] {', '.join(missing)}")
+    console.print(f"[dim]Found {len(records)}/{len(wanted)} record(s) in {duration * 1000:.1f} ms[/dim]")
 
 @app.command()
-def extract():
+def extract(
+    workers: int = typer.Option(1, "--workers", "-w", help="Dumps extracted in parallel processes (0 = all CPU cores)."),
+    metrics_out: Optional[Path] = typer.Option(None, "--metrics-out", help="Write per-stage timings, throughput and memory to this .json (or appended .jsonl) file."),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Profile one stage (e.g. convert, chunk, flatten, merge)."),
+    profiler: str = typer.Option("cprofile", "--profiler", help="Profiler for --profile: 'cprofile' or 'sample' (collapsed stacks)."),
+):
     """Extract downloaded .gz files (interactive mode)."""
     from discogs.extractor import extract_interactively
-    extract_interactively()
+    from discogs.converter import resolve_workers
+    with _instrumented("extract", metrics_out, profile, profiler):
+        extract_interactively(workers=resolve_workers(workers))
 
 @app.command("delete")
-def delete(all: bool = typer.Option(False, "--all", help="Delete all downloaded, extracted and converted files.")):
+def delete(
+    all: bool = typer.Option(False, "--all", help="Delete all downloaded, extracted and converted files."),
+    offline: bool = typer.Option(False, "--offline", help="Use the cached S3 file list without any network request."),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore the cached S3 file list and list the bucket again."),
+):
     """
     Deletes selected or all downloaded, extracted, and converted files.
     """
+    import shutil
+    from discogs.selector import display_status_table, select_indices
+    from discogs.artifacts import artifacts, record as record_artifact
+
+    listing = _listing_options(offline, refresh)
     download_dir = get_download_dir()
-    df = get_latest_files()
+    files = _latest_files(listing)
 
-    if df.empty:
+    if not files:
         console.print("[red]No files found.[/red]")
         raise typer.Exit()
 
-    display_status_table(df, download_dir)
+    display_status_table(files, download_dir)
 
     # If --all is passed, select all files
-    selected = list(range(len(df))) if all else select_indices(df, allow_all=True)
+    selected = list(range(len(files))) if all else select_indices(files, allow_all=True)
 
     if not selected:
         console.print("[yellow]No files selected.[/yellow]")
         raise typer.Exit()
 
     for i in selected:
-        row = df.iloc[i]
-        year_month = row["month"]
+        row = files[i]
         filename = Path(row["url"]).name
-        data_dir = download_dir / "Datasets" / year_month
-
-        gz_file = data_dir / filename
-        xml_file = gz_file.with_suffix("")
-        csv_file = xml_file.with_suffix(".csv")
-
-        for file in [gz_file, xml_file, csv_file]:
-            if file.exists():
-                try:
-                    file.unlink()
-                    console.print(f"[green]✔ Deleted:[/] {file.name}")
-                except Exception as e:
-                    console.print(f"[red]✗ Failed to delete {file.name}:[/] {e}")
-            else:
-                console.print(f"[dim]• Not found:[/] {file.name}")
+
+        # Every artifact the index knows for this dump: download, checksum record,
+        # extraction and each converted output (files and folders alike)
+        found = artifacts(download_dir, row["month"], filename)
+        if not found:
+            console.print(f"[dim]• Not found:[/] {filename}")
+        for path in found.values():
+            try:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink(missing_ok=True)
+                record_artifact(path)
+                console.print(f"[green]✔ Deleted:[/] {path.name}")
+            except Exception as e:
+                console.print(f"[red]✗ Failed to delete {path.name}:[/] {e}")
 
 @app.command()
-def show():
+def show(
+    offline: bool = typer.Option(False, "--offline", help="Use the cached S3 file list without any network request."),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore the cached S3 file list and list the bucket again."),
+):
     """
     Displays the list of available Discogs dump files.
     """
-    from discogs.selector import show_welcome
-    from discogs.scraper import get_latest_files
-    from discogs.config import get_download_dir
+    from discogs.selector import show_welcome, display_status_table
 
+    listing = _listing_options(offline, refresh)
     show_welcome()
-    df = get_latest_files()
-    display_status_table(df, get_download_dir())
+    files = _latest_files(listing)
+    display_status_table(files, get_download_dir())
 
 @app.command()
 def config():
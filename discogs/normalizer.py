@@ -0,0 +1,263 @@
+# discogs/normalizer.py
+
+import os
+import csv
+import shutil
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from time import perf_counter, process_time
+
+from discogs import telemetry
+from discogs.checkpoint import atomic_path
+from discogs.parquet_writer import write_parquet
+from discogs.sqlite_writer import DEFAULT_CACHE_BYTES, write_sqlite
+
+# Relational layout per content type.
+# Every table is (rows path, {column: field path}). The rows path is an ElementTree path
+# relative to the record ("" = the record itself); a "|" nests one level deeper and the
+# outer row's position is kept as a key column. Field paths are a child tag ("title"),
+# an attribute ("@id"), a child's attribute ("master_id/@is_main_release") or "." for
+# the row element's own text.
+# Child tables are keyed by the record id plus the 1-based position of the row.
+TABLES = {
+    "releases": {
+        "id": "@id",
+        "tables": {
+            "releases": ("", {
+                "status": "@status",
+                "title": "title",
+                "country": "country",
+                "released": "released",
+                "notes": "notes",
+                "data_quality": "data_quality",
+                "master_id": "master_id",
+                "is_main_release": "master_id/@is_main_release",
+            }),
+            "release_artists": ("artists/artist", {
+                "artist_id": "id", "name": "name", "anv": "anv", "join": "join", "role": "role", "tracks": "tracks",
+            }),
+            "release_extraartists": ("extraartists/artist", {
+                "artist_id": "id", "name": "name", "anv": "anv", "join": "join", "role": "role", "tracks": "tracks",
+            }),
+            "release_labels": ("labels/label", {
+                "label_id": "@id", "name": "@name", "catno": "@catno",
+            }),
+            "release_formats": ("formats/format", {
+                "name": "@name", "qty": "@qty", "text": "@text",
+            }),
+            "release_format_descriptions": ("formats/format|descriptions/description", {
+                "description": ".",
+            }),
+            "release_genres": ("genres/genre", {"genre": "."}),
+            "release_styles": ("styles/style", {"style": "."}),
+            "tracks": ("tracklist/track", {
+                "track_position": "position", "title": "title", "duration": "duration",
+            }),
+            "identifiers": ("identifiers/identifier", {
+                "type": "@type", "value": "@value", "description": "@description",
+            }),
+            "videos": ("videos/video", {
+                "src": "@src", "duration": "@duration", "embed": "@embed", "title": "title", "description": "description",
+            }),
+            "release_companies": ("companies/company", {
+                "company_id": "id", "name": "name", "catno": "catno",
+                "entity_type": "entity_type", "entity_type_name": "entity_type_name",
+            }),
+        },
+    },
+    "masters": {
+        "id": "@id",
+        "tables": {
+            "masters": ("", {
+                "main_release": "main_release",
+                "title": "title",
+                "year": "year",
+                "data_quality": "data_quality",
+            }),
+            "master_artists": ("artists/artist", {
+                "artist_id": "id", "name": "name", "anv": "anv", "join": "join", "role": "role",
+            }),
+            "master_genres": ("genres/genre", {"genre": "."}),
+            "master_styles": ("styles/style", {"style": "."}),
+            "master_videos": ("videos/video", {
+                "src": "@src", "duration": "@duration", "embed": "@embed", "title": "title", "description": "description",
+            }),
+        },
+    },
+    "artists": {
+        "id": "id",
+        "tables": {
+            "artists": ("", {
+                "name": "name",
+                "realname": "realname",
+                "profile": "profile",
+                "data_quality": "data_quality",
+            }),
+            "artist_urls": ("urls/url", {"url": "."}),
+            "artist_namevariations": ("namevariations/name", {"name": "."}),
+            "artist_aliases": ("aliases/name", {"alias_id": "@id", "name": "."}),
+            "artist_members": ("members/name", {"member_id": "@id", "name": "."}),
+            "artist_groups": ("groups/name", {"group_id": "@id", "name": "."}),
+        },
+    },
+    "labels": {
+        "id": "id",
+        "tables": {
+            "labels": ("", {
+                "name": "name",
+                "contactinfo": "contactinfo",
+                "profile": "profile",
+                "data_quality": "data_quality",
+                "parent_label_id": "parentLabel/@id",
+                "parent_label_name": "parentLabel",
+            }),
+            "label_urls": ("urls/url", {"url": "."}),
+            "label_sublabels": ("sublabels/label", {"sublabel_id": "@id", "name": "."}),
+        },
+    },
+}
+
+
+def table_columns(content_type: str) -> dict:
+    """
+    Returns {table name: header} for the normalized layout of a content type.
+    """
+    spec = TABLES[content_type]
+    key = f"{content_type[:-1]}_id"
+    headers = {}
+    for table, (rows_path, fields) in spec["tables"].items():
+        if not rows_path:
+            headers[table] = ["id", *fields]
+        elif "|" in rows_path:
+            outer = rows_path.split("|")[0].split("/")[-1]
+            headers[table] = [key, f"{outer}_position", "position", *fields]
+        else:
+            headers[table] = [key, "position", *fields]
+    return headers
+
+
+def _field(elem, path: str) -> str:
+    """
+    Reads one field path (see TABLES) from an element; missing values become "".
+    """
+    if path == ".":
+        text = elem.text
+    elif "@" in path:
+        node_path, attr = path.split("@")
+        node = elem.find(node_path.rstrip("/")) if node_path else elem
+        return node.get(attr, "") if node is not None else ""
+    else:
+        text = elem.findtext(path)
+    return text.strip() if text else ""
+
+
+def _table_rows(record, record_id: str, rows_path: str, fields: dict):
+    """
+    Yields the CSV rows one table gets from a single record.
+    """
+    values = list(fields.values())
+    if not rows_path:
+        yield [record_id, *(_field(record, f) for f in values)]
+    elif "|" in rows_path:
+        outer_path, inner_path = rows_path.split("|")
+        for outer_pos, outer in enumerate(record.iterfind(outer_path), start=1):
+            for pos, elem in enumerate(outer.iterfind(inner_path), start=1):
+                yield [record_id, outer_pos, pos, *(_field(elem, f) for f in values)]
+    else:
+        for pos, elem in enumerate(record.iterfind(rows_path), start=1):
+            yield [record_id, pos, *(_field(elem, f) for f in values)]
+
+
+def _iter_record_elements(source, record_tag: str):
+    """
+    Yields each complete top-level record element, ignoring nested elements
+    with the same tag (e.g. sublabels inside a label).
+    """
+    depth = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if elem.tag != record_tag:
+            continue
+        if event == "start":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                yield elem
+                elem.clear()
+
+
+def normalize_chunk_job(source, segment_dir: Path, content_type: str) -> dict:
+    """
+    Writes the records of one XML chunk (path or file object) into headerless
+    per-table CSV segments inside segment_dir. Safe to run in a worker process.
+    """
+    start, cpu_start = perf_counter(), process_time()
+    telemetry.start_job_peak()
+    spec = TABLES[content_type]
+    segment_dir.mkdir(parents=True, exist_ok=True)
+
+    files = {table: open(segment_dir / f"{table}.csv", "w", newline="", encoding="utf-8") for table in spec["tables"]}
+    writers = {table: csv.writer(f) for table, f in files.items()}
+    rows = 0
+    try:
+        for record in _iter_record_elements(source, content_type[:-1]):
+            record_id = _field(record, spec["id"])
+            for table, (rows_path, fields) in spec["tables"].items():
+                writers[table].writerows(_table_rows(record, record_id, rows_path, fields))
+            rows += 1
+    finally:
+        for f in files.values():
+            f.close()
+
+    return {
+        "columns": [],
+        "rows": rows,
+        "seconds": perf_counter() - start,
+        "cpu_seconds": process_time() - cpu_start,
+        "worker": os.getpid(),
+        "peak_rss_mb": telemetry.job_peak_mb(),
+    }
+
+
+def _iter_segment_rows(segment_paths: list):
+    """
+    Yields the rows of headerless table segments in order, deleting each once read.
+    """
+    for segment_path in segment_paths:
+        with open(segment_path, "r", newline="", encoding="utf-8") as f:
+            yield from csv.reader(f)
+        segment_path.unlink()
+
+
+def merge_table_segments(segment_dirs: list, output_dir: Path, content_type: str, output_format: str = "csv",
+                         batch_bytes: int = None) -> dict:
+    """
+    Concatenates per-chunk table segments, in order, into one CSV per table
+    (with a header) inside output_dir, or one Parquet file per table (record batches
+    bounded by batch_bytes, see write_parquet), or one SQLite database per table,
+    indexed on its first column (the record id, or the parent record id).
+    Segments are deleted once merged; each table file appears under its name only
+    once it is complete. Returns {table name: output path}.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs = {}
+    for table, header in table_columns(content_type).items():
+        output_path = output_dir / f"{table}.{output_format}"
+        with atomic_path(output_path) as tmp_path:
+            if output_format == "parquet":
+                write_parquet(_iter_segment_rows([d / f"{table}.csv" for d in segment_dirs]), header, tmp_path,
+                              batch_bytes=batch_bytes)
+            elif output_format == "sqlite":
+                write_sqlite(_iter_segment_rows([d / f"{table}.csv" for d in segment_dirs]), header, tmp_path, table,
+                             index_columns=header[:1],
+                             cache_bytes=min(batch_bytes or DEFAULT_CACHE_BYTES, DEFAULT_CACHE_BYTES))
+            else:
+                with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+                    csv.writer(out).writerow(header)
+                    for segment_dir in segment_dirs:
+                        segment_path = segment_dir / f"{table}.csv"
+                        with open(segment_path, "r", newline="", encoding="utf-8") as f:
+                            shutil.copyfileobj(f, out, 1024 * 1024)
+                        segment_path.unlink()
+        outputs[table] = output_path
+    return outputs
@@ -0,0 +1,61 @@
+# discogs/parquet_writer.py
+
+from pathlib import Path
+
+DEFAULT_BATCH_ROWS = 50_000  # Rows per record batch / Parquet row group
+DEFAULT_COMPRESSION = "zstd"
+
+
+def require_pyarrow():
+    """
+    Imports pyarrow lazily so the CSV paths keep working without it.
+    Raises a RuntimeError with install instructions when it is missing.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError(
+            "Parquet output needs pyarrow. Install it with: pip install 'DiscogsDataProcessorCLI[parquet]'"
+        )
+    return pyarrow, pyarrow.parquet
+
+
+def write_parquet(rows, columns: list, output_path: Path, batch_rows: int = DEFAULT_BATCH_ROWS,
+                  compression: str = DEFAULT_COMPRESSION, batch_bytes: int = None) -> int:
+    """
+    Writes an iterable of row lists (aligned with `columns`) to a Parquet file.
+    Rows are gathered into fixed-size record batches and each batch is written as
+    its own row group, so memory stays bounded by `batch_rows`. With batch_bytes a
+    batch is also flushed once its values add up to that many characters, which
+    keeps wide or huge rows from piling up. All columns are dictionary-encoded
+    strings; empty values are stored as nulls.
+    Returns the number of rows written.
+    """
+    pa, pq = require_pyarrow()
+    schema = pa.schema([(col, pa.string()) for col in columns])
+
+    written = 0
+    batch = []
+
+    with pq.ParquetWriter(output_path, schema, compression=compression, use_dictionary=True) as writer:
+        def flush():
+            arrays = [pa.array([value or None for value in values], type=pa.string()) for values in zip(*batch)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema), row_group_size=len(batch))
+
+        size = 0
+        for row in rows:
+            batch.append(row)
+            if batch_bytes:
+                size += sum(map(len, row))
+            if len(batch) >= batch_rows or (batch_bytes and size >= batch_bytes):
+                flush()
+                written += len(batch)
+                batch = []
+                size = 0
+
+        if batch:
+            flush()
+            written += len(batch)
+
+    return written
@@ -0,0 +1,276 @@
+# discogs/pipeline.py
+
+import io
+import queue
+import tempfile
+import threading
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
+
+from discogs import telemetry
+from discogs.artifacts import record as record_artifact
+from discogs.chunker import iter_records, sanitize_record
+from discogs.converter import (
+    _spill_chunk_job, _merge_segments, _report_workers, layout_output_path, check_output_options, resolve_engine,
+    schema_seed, record_schema, output_size, spill_segments, segments_copyable,
+)
+from discogs.extractor import open_gz
+from discogs.normalizer import normalize_chunk_job, merge_table_segments
+
+console = Console()
+
+_DONE = object()  # Marks the end of the batch queue
+
+
+def _spill_batch_job(batch: bytes, segment_path: Path, record_tag: str, engine: str, projection=None,
+                     known_columns=None) -> dict:
+    """
+    Flattens one in-memory batch of records into a spill segment (runs in a worker process).
+    """
+    return _spill_chunk_job(io.BytesIO(batch), segment_path, record_tag, engine, projection, known_columns)
+
+
+def _normalize_batch_job(batch: bytes, segment_dir: Path, content_type: str) -> dict:
+    """
+    Normalized-layout counterpart of _spill_batch_job.
+    """
+    return normalize_chunk_job(io.BytesIO(batch), segment_dir, content_type)
+
+
+def _put(batches: queue.Queue, item, stop: threading.Event) -> bool:
+    """
+    Blocking put that gives up once the consumer has stopped.
+    A full queue is what throttles the reader (backpressure).
+    """
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_batches(gz_path: Path, content_type: str, batches: queue.Queue, stop: threading.Event,
+                  errors: list, records_per_batch: int, progress, task, memory: dict = None, batch_bytes: int = None,
+                  on_record=None):
+    """
+    Reader stage: decompresses the .gz, splits it into records in memory and
+    queues them as (small well-formed XML document of `records_per_batch` records, alone).
+    With a memory plan batches are also closed at batch_bytes, and a record larger than
+    memory["oversized_bytes"] is queued as a batch of its own with alone=True.
+    on_record(record, 0, len(record)) sees every raw record first (see chunk_xml_by_type).
+    """
+    header = f"<{content_type}>\n".encode()
+    footer = f"\n</{content_type}>".encode()
+    oversized_bytes = memory and memory["oversized_bytes"]
+
+    try:
+        with open(gz_path, "rb") as raw, open_gz(raw) as f:
+            batch = []
+            size = 0
+            for record in iter_records(f, content_type):
+                if on_record is not None:
+                    on_record(record, 0, len(record))
+                if oversized_bytes and len(record) > oversized_bytes:
+                    if batch and not _put(batches, (header + b"\n".join(batch) + footer, False), stop):
+                        return
+                    if not _put(batches, (header + sanitize_record(record) + footer, True), stop):
+                        return
+                    batch = []
+                    size = 0
+                    continue
+
+                batch.append(sanitize_record(record))
+                size += len(batch[-1])
+                if len(batch) >= records_per_batch or (batch_bytes and size >= batch_bytes):
+                    if not _put(batches, (header + b"\n".join(batch) + footer, False), stop):
+                        return
+                    batch = []
+                    size = 0
+                    progress.update(task, completed=raw.tell())
+
+            if batch:
+                _put(batches, (header + b"\n".join(batch) + footer, False), stop)
+            progress.update(task, completed=raw.tell())
+    except Exception as e:
+        errors.append(e)
+    finally:
+        _put(batches, _DONE, stop)
+
+
+def convert_gz_to_csv(gz_path: Path, content_type: str, workers: int = 1, layout: str = "wide",
+                      output_format: str = "csv", engine: str = "auto", projection=None, rescan: bool = False,
+                      records_per_batch: int = 10000, queue_size: int = 4, memory: dict = None,
+                      shards: dict = None, record_hashes: bool = False) -> Path:
+    """
+    Streams a .gz dump straight into CSV without writing the extracted XML or chunk files.
+    A reader thread feeds batches through a bounded queue; they are flattened into
+    spill segments (in a process pool when workers > 1) and merged in order at the end.
+    The wide layout is seeded from the schema catalog like convert_xml_to_csv.
+    With a memory plan (see discogs.memory) the batches held at once (queued, being
+    read and handed to the pool) share memory["piece_bytes"], oversized records are
+    flattened here while the pool is idle, and Parquet batches are flushed by size.
+    shards writes the wide layout as a folder of part files (see discogs.shards).
+    record_hashes=True stores the dump's record hash table for `discogs diff`, hashing
+    records as the reader splits them out.
+    The output is identical to the one produced by extract + convert with the same options.
+    """
+    check_output_options(layout, output_format, projection, shards)
+    write_bytes = batch_bytes = None
+    if memory:
+        workers = memory["workers"]
+        write_bytes = memory["write_bytes"]
+        batch_bytes = memory["piece_bytes"] // (queue_size + 1 + 2 * workers)
+    record_tag = content_type[:-1]  # e.g. "releases" → "release"
+    output_csv = gz_path.with_suffix("").with_suffix(".csv")
+    output_path = layout_output_path(output_csv, layout, output_format, shards)
+    if layout == "normalized":
+        job, job_args, segment_suffix = _normalize_batch_job, (content_type,), ""
+        output_path.mkdir(parents=True, exist_ok=True)
+    else:
+        entry, known_columns = schema_seed(gz_path, content_type, projection, rescan)
+        job, job_args, segment_suffix = _spill_batch_job, (record_tag, resolve_engine(engine), projection, known_columns), ".csv"
+    start_time = perf_counter()
+
+    batches = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+
+    hashing = nullcontext()
+    if record_hashes:
+        from discogs.delta import hashing_records  # discogs.delta builds on the converter
+        hashing = hashing_records(gz_path)
+
+    with hashing as on_record, telemetry.stage("stream", file=gz_path.name, content_type=content_type, layout=layout,
+                                                 output_format=output_format, workers=workers,
+                                                 bytes_in=gz_path.stat().st_size) as metrics:
+        with tempfile.TemporaryDirectory(prefix=".segments_", dir=output_path if layout == "normalized" else output_csv.parent) as tmp:
+            segment_dir = Path(tmp)
+            segment_paths = []
+            jobs = []
+            pending = deque()
+            executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+            console.print(f"[bold]Step 1:[/] Streaming [green]{gz_path.name}[/green] → segments...")
+            with telemetry.stage("flatten", workers=workers), Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                "[progress.percentage]{task.percentage:.1f}%",
+                "•",
+                TimeElapsedColumn()
+            ) as progress:
+                task = progress.add_task("Streaming...", total=gz_path.stat().st_size)
+                reader = threading.Thread(
+                    target=_read_batches,
+                    args=(gz_path, content_type, batches, stop, errors, records_per_batch, progress, task, memory,
+                          batch_bytes, on_record),
+                    daemon=True,
+                )
+                reader.start()
+                step_start = perf_counter()
+
+                try:
+                    while True:
+                        item = batches.get()
+                        if item is _DONE:
+                            break
+                        batch, alone = item
+
+                        segment_path = segment_dir / f"batch_{len(segment_paths) + 1:05}{segment_suffix}"
+                        segment_paths.append(segment_path)
+                        if executor and alone:
+                            # Let the pool run dry first, so the oversized record has the budget to itself
+                            while pending:
+                                jobs.append(pending.popleft().result())
+                                telemetry.worker_peak(jobs[-1].get("peak_rss_mb"), workers)
+                            jobs.append(job(batch, segment_path, *job_args))
+                        elif executor:
+                            pending.append(executor.submit(job, batch, segment_path, *job_args))
+                            # Bound the batches held by the pool, oldest first to keep order
+                            if len(pending) >= workers * 2:
+                                jobs.append(pending.popleft().result())
+                                telemetry.worker_peak(jobs[-1].get("peak_rss_mb"), workers)
+                        else:
+                            jobs.append(job(batch, segment_path, *job_args))
+
+                    while pending:
+                        jobs.append(pending.popleft().result())
+                        telemetry.worker_peak(jobs[-1].get("peak_rss_mb"), workers)
+                finally:
+                    stop.set()
+                    if executor:
+                        executor.shutdown(cancel_futures=True)
+                    reader.join()
+
+                telemetry.count(records=sum(result["rows"] for result in jobs))
+                step_seconds = perf_counter() - step_start
+
+            if errors:
+                raise errors[0]
+
+            if executor:
+                _report_workers(jobs, step_seconds)
+
+            # Step 2: Merge segments in stream order under the final header
+            console.print(f"[bold]Step 2:[/] Merging {len(jobs)} segments into [green]{output_path.name}[/green]...")
+            if layout == "normalized":
+                with telemetry.stage("merge", segments=len(segment_paths)):
+                    tables = merge_table_segments(segment_paths, output_path, content_type, output_format, write_bytes)
+                summary = f"{len(tables)} tables"
+                bytes_out = sum(path.stat().st_size for path in tables.values())
+            else:
+                segments = spill_segments(segment_paths, jobs)
+                merge_start = perf_counter()
+                with telemetry.stage("merge", segments=len(segments)):
+                    columns = _merge_segments(segments, output_path, output_format, write_bytes, content_type,
+                                              shards)
+                timings = {
+                    "merge_seconds": perf_counter() - merge_start,
+                    "merge_copied": output_format == "csv" and not shards and segments_copyable(segments, columns),
+                }
+                summary = f"{len(columns)} columns"
+                if shards:
+                    summary += f", {len(list(output_path.glob(f'part-*.{output_format}')))} parts"
+                bytes_out = output_size(output_path)
+            metrics["chunks"] = len(jobs)
+            metrics["bytes_out"] = bytes_out
+
+    duration = perf_counter() - start_time
+    records = sum(result["rows"] for result in jobs)
+    output_size_mb = bytes_out / (1024 * 1024)
+
+    console.print(f"\n[green]✔ Saved:[/] {output_path}")
+    console.print("[bold green]✔ Streaming conversion completed[/bold green]")
+    console.print(f"[bold white]📄 Records processed:[/] {records} in {len(jobs)} batches")
+    console.print(f"[bold white]🧩 Output:[/] {output_path.name} ({summary})")
+    console.print(f"[bold white]💾 Output size:[/] {output_size_mb:.2f} MB")
+    console.print(f"[bold white]⏱ Duration:[/] {duration:.1f} seconds")
+    if layout != "normalized":
+        record_schema(gz_path, content_type, columns, entry, known_columns, timings, partial=projection is not None)
+    record_artifact(output_path)
+
+    return output_path
+
+
+def convert_gz_files(files: list[Path], workers: int = 1, layout: str = "wide", output_format: str = "csv",
+                     engine: str = "auto", projection=None, rescan: bool = False, memory: dict = None,
+                     shards: dict = None, record_hashes: bool = False) -> list[Path]:
+    """
+    Streams multiple .gz dumps to CSV in sequence.
+    Returns a list of output paths.
+    """
+    outputs = []
+    for gz_path in files:
+        content_type = gz_path.with_suffix("").stem.split("_")[-1]
+        outputs.append(convert_gz_to_csv(gz_path, content_type, workers=workers, layout=layout,
+                                         output_format=output_format, engine=engine, projection=projection,
+                                         rescan=rescan, memory=memory, shards=shards,
+                                         record_hashes=record_hashes))
+    return outputs
@@ -0,0 +1,97 @@
+# discogs/schema_catalog.py
+
+import re
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+CATALOG_NAME = ".schema_catalog.json"
+_FINGERPRINT_BYTES = 64 * 1024  # Bytes hashed from each end of the dump
+
+
+def catalog_path(data_path: Path) -> Path:
+    """
+    Returns where the schema catalog lives for a dump: the download directory when the
+    file sits in Datasets/<month>/, otherwise the file's own folder.
+    """
+    if data_path.parent.parent.name == "Datasets":
+        return data_path.parent.parent.parent / CATALOG_NAME
+    return data_path.parent / CATALOG_NAME
+
+
+def dump_month(data_path: Path) -> str:
+    """
+    Returns the dump month ("2025-04") from a file name like discogs_20250401_releases.xml.
+    """
+    match = re.search(r"_(\d{4})(\d{2})\d{2}_", data_path.name)
+    return f"{match.group(1)}-{match.group(2)}" if match else "unknown"
+
+
+def fingerprint(data_path: Path) -> str:
+    """
+    Cheap identity of a dump file: its size plus a hash of its first and last 64 KB.
+    """
+    size = data_path.stat().st_size
+    digest = hashlib.sha1(str(size).encode())
+    with open(data_path, "rb") as f:
+        digest.update(f.read(_FINGERPRINT_BYTES))
+        if size > _FINGERPRINT_BYTES:
+            f.seek(max(_FINGERPRINT_BYTES, size - _FINGERPRINT_BYTES))
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _load_catalog(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_schema(data_path: Path, content_type: str):
+    """
+    Looks up the known columns for a dump: the entry for its own month if there is one,
+    otherwise the closest earlier month (or the latest one) of the same content type.
+    Returns the entry with "month" and "exact" (same month and fingerprint) added, or None.
+    """
+    entries = _load_catalog(catalog_path(data_path)).get(content_type, {})
+    if not entries:
+        return None
+
+    month = dump_month(data_path)
+    earlier = [m for m in sorted(entries) if m <= month]
+    chosen = month if month in entries else (earlier or sorted(entries))[-1]
+    entry = dict(entries[chosen], month=chosen)
+    entry["exact"] = chosen == month and entry.get("fingerprint") == fingerprint(data_path)
+    return entry
+
+
+def save_schema(data_path: Path, content_type: str, columns: list, timings: dict = None, replace: bool = False) -> dict:
+    """
+    Records the columns of a converted dump under its content type and month.
+    With replace=False an existing entry is only widened with new columns.
+    Scan/merge timings are kept (until measured again) to report what later hits save.
+    Returns the stored entry.
+    """
+    path = catalog_path(data_path)
+    catalog = _load_catalog(path)
+    entries = catalog.setdefault(content_type, {})
+    month = dump_month(data_path)
+
+    entry = dict(entries.get(month, {}))
+    entry["columns"] = sorted(set(columns) if replace else set(entry.get("columns", ())) | set(columns))
+    entry["fingerprint"] = fingerprint(data_path)
+    entry["updated"] = datetime.now().isoformat(timespec="seconds")
+    for key in ("scan_seconds", "merge_seconds"):
+        if timings and timings.get(key) is not None:
+            entry[key] = round(timings[key], 3)
+    entries[month] = entry
+
+    catalog.setdefault("version", 1)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2)
+    tmp_path.replace(path)
+    return entry
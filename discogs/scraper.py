@@ -1,54 +1,142 @@
 # discogs/scraper.py
 
 import re
-import requests
-import pandas as pd
-import xml.etree.ElementTree as ET
+import json
+import time
 from datetime import datetime
 from pathlib import Path
 from discogs.config import get_download_dir
+from discogs.artifacts import status as artifact_status
+from rich.console import Console
+
+console = Console()
 
 # Base URL of the Discogs S3 bucket
 S3_BASE_URL = "https://discogs-data-dumps.s3.us-west-2.amazonaws.com/"
 S3_PREFIX = "data/"  # Prefix for data folders inside the bucket
-
-def list_directories() -> list[str]:
+S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+CATALOG_NAME = ".s3_catalog.json"  # Cached listings, kept in the download folder
+CATALOG_TTL = 6 * 60 * 60  # Seconds a cached listing is used without asking S3 (dumps appear monthly)
+
+def _catalog_path() -> Path:
+    return get_download_dir() / CATALOG_NAME
+
+def _load_catalog() -> dict:
+    try:
+        with open(_catalog_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_catalog(catalog: dict):
+    path = _catalog_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f)
+    tmp_path.replace(path)
+
+def _fetch_listing(prefix: str, delimiter: str, cached: dict = None):
+    """
+    Runs a complete ListObjectsV2 listing, following IsTruncated / NextContinuationToken
+    across pages. The first request carries the cached ETag / Last-Modified as
+    If-None-Match / If-Modified-Since; returns None when the server answers 304 Not Modified.
+    Returns {"etag", "last_modified", "contents": [[key, size, last modified]], "prefixes": [...]}.
+    """
+    import xml.etree.ElementTree as ET
+    from discogs.http_client import get_session
+
+    listing = {"etag": None, "last_modified": None, "contents": [], "prefixes": []}
+    params = {"list-type": "2", "prefix": prefix}
+    if delimiter:
+        params["delimiter"] = delimiter
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    while True:
+        first = "continuation-token" not in params
+        r = get_session().get(S3_BASE_URL, params=params, headers=headers if first else {}, timeout=30)
+        if r.status_code == 304:
+            return None
+        r.raise_for_status()
+        if first:
+            listing["etag"], listing["last_modified"] = r.headers.get("ETag"), r.headers.get("Last-Modified")
+
+        root = ET.fromstring(r.content)
+        for content in root.findall(S3_NS + 'Contents'):
+            listing["contents"].append([
+                content.find(S3_NS + 'Key').text,
+                int(content.find(S3_NS + 'Size').text),
+                content.find(S3_NS + 'LastModified').text,
+            ])
+        for cp in root.findall(S3_NS + 'CommonPrefixes'):
+            listing["prefixes"].append(cp.find(S3_NS + 'Prefix').text)
+
+        token = root.find(S3_NS + 'NextContinuationToken')
+        if root.findtext(S3_NS + 'IsTruncated') != "true" or token is None:
+            return listing
+        params["continuation-token"] = token.text
+
+def _listing(prefix: str, delimiter: str = "", offline: bool = False, refresh: bool = False) -> dict:
+    """
+    Returns a bucket listing from the local catalog when it is younger than CATALOG_TTL,
+    otherwise revalidates it with S3 (a 304 just renews it). offline=True never touches the
+    network and fails if the listing was never cached; refresh=True always lists afresh.
+    A stale listing is still used when S3 cannot be reached.
+    """
+    catalog = _load_catalog()
+    name = f"{prefix}|{delimiter}"
+    cached = catalog.get(name)
+
+    if offline:
+        if cached is None:
+            raise RuntimeError(f"No cached listing for {prefix}; run once without --offline.")
+        return cached
+    if cached and not refresh and time.time() - cached["fetched"] < CATALOG_TTL:
+        return cached
+
+    import requests  # Only needed once the cache cannot answer
+    try:
+        listing = _fetch_listing(prefix, delimiter, None if refresh else cached)
+    except requests.RequestException:
+        if cached is None:
+            raise
+        console.print("[yellow]⚠ S3 is unreachable, using the cached file list.[/yellow]")
+        return cached
+
+    catalog[name] = listing = listing or cached
+    listing["fetched"] = time.time()
+    _save_catalog(catalog)
+    return listing
+
+def list_directories(offline: bool = False, refresh: bool = False) -> list[str]:
     """
     Lists available yearly folders on the Discogs S3 bucket.
     Example: data/2024/
     """
-    url = f"{S3_BASE_URL}?prefix={S3_PREFIX}&delimiter=/"
-    r = requests.get(url)
-    r.raise_for_status()
-
-    ns = "{http://s3.amazonaws.com/doc/2006-03-01/}"
-    root = ET.fromstring(r.text)
-
     dirs = []
-    for cp in root.findall(ns + 'CommonPrefixes'):
-        p = cp.find(ns + 'Prefix').text
+    for p in _listing(S3_PREFIX, "/", offline, refresh)["prefixes"]:
         if re.match(r"data/\d{4}/", p):  # Match folders like "data/2023/"
             dirs.append(p)
 
     return sorted(dirs)
 
-def list_files(directory_prefix: str) -> pd.DataFrame:
+def list_files(directory_prefix: str, offline: bool = False, refresh: bool = False) -> list[dict]:
     """
     Lists files in the specified S3 folder and extracts metadata like size,
     last modified date, type (artists, labels, etc.), and generates their URLs.
+    Returns one dict per dump, with its local download/extract/convert status.
     """
-    url = f"{S3_BASE_URL}?prefix={directory_prefix}"
-    r = requests.get(url)
-    r.raise_for_status()
-
-    ns = "{http://s3.amazonaws.com/doc/2006-03-01/}"
-    root = ET.fromstring(r.text)
-
     data = []
-    for content in root.findall(ns + 'Contents'):
-        key = content.find(ns + 'Key').text
-        size = int(content.find(ns + 'Size').text)
-        last_modified = content.find(ns + 'LastModified').text
+    checksum_urls = {}  # Month -> URL of the CHECKSUM file published with its dumps
+    for key, size, last_modified in _listing(directory_prefix, "", offline, refresh)["contents"]:
+        if key.upper().endswith("CHECKSUM.TXT"):
+            checksum_urls[get_month_from_key(key)] = S3_BASE_URL + key
+            continue
 
         # Determine content type from filename
         ctype = "unknown"
@@ -76,21 +164,15 @@ def list_files(directory_prefix: str) -> pd.DataFrame:
                 "url": S3_BASE_URL + key,
             })
 
-    df = pd.DataFrame(data)
-
-    # Add download/extracted/converted status columns
+    # Add checksum URL and download/extracted/converted status (from the local artifact index)
     download_dir = get_download_dir()
-    df["downloaded"] = df["filename"].apply(
-        lambda fn: (download_dir / "Datasets" / get_month_from_key(fn) / fn).exists()
-    )
-    df["extracted"] = df["filename"].apply(
-        lambda fn: (download_dir / "Datasets" / get_month_from_key(fn) / fn.replace(".gz", "")).exists()
-    )
-    df["converted"] = df["filename"].apply(
-        lambda fn: (download_dir / "Datasets" / get_month_from_key(fn) / fn.replace(".gz", ".csv")).exists()
-    )
-
-    return df
+    for row in data:
+        row["checksum_url"] = checksum_urls.get(row["month"])
+        state = artifact_status(download_dir, row["month"], row["filename"])
+        for stage in ("downloaded", "extracted", "converted"):
+            row[stage] = state[stage]
+
+    return data
 
 def get_month_from_key(key: str) -> str:
     """
@@ -105,21 +187,21 @@ def get_month_from_key(key: str) -> str:
             return ""
     return ""
 
-def get_latest_files() -> pd.DataFrame:
+def get_latest_files(offline: bool = False, refresh: bool = False) -> list[dict]:
     """
-    Fetches and returns a DataFrame with files from the most recent available S3 folder.
+    Fetches and returns the files (one dict each) from the most recent available S3 folder.
+    Listings come from the local catalog when fresh (see _listing).
     """
-    dirs = list_directories()
+    dirs = list_directories(offline, refresh)
     if not dirs:
-        return pd.DataFrame()
+        return []
 
     latest_dir = dirs[-1]
-    df = list_files(latest_dir)
-
-    if df.empty:
-        return df
-
-    # Parse dates and sort by month and type
-    df["last_modified"] = pd.to_datetime(df["last_modified"])
-    df = df.sort_values(by=["month", "content"], ascending=[False, True]).reset_index(drop=True)
-    return df
\ No newline at end of file
+    files = list_files(latest_dir, offline, refresh)
+
+    # Parse dates and sort by month (newest first) and type
+    for row in files:
+        row["last_modified"] = datetime.fromisoformat(row["last_modified"].replace("Z", "+00:00"))
+    files.sort(key=lambda row: row["content"])
+    files.sort(key=lambda row: row["month"], reverse=True)
+    return files
\ No newline at end of file
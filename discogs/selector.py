@@ -2,17 +2,15 @@
 
 from rich.prompt import Prompt
 from typing import List
-import pandas as pd
-from rich.panel import Panel
-from rich.markdown import Markdown
 from rich.table import Table
 from rich.console import Console
 from discogs.utils import human_readable_size
+from discogs.artifacts import status as artifact_status
 from pathlib import Path
 
 console = Console()
 
-def display_table(df: pd.DataFrame) -> None:
+def display_table(files: list) -> None:
     """
     Displays a Rich-formatted table of available Discogs files.
     Shows basic info: index, month, content type, file size, and URL.
@@ -25,7 +23,7 @@ def display_table(df: pd.DataFrame) -> None:
     table.add_column("Size (MB)", justify="right")
     table.add_column("URL", style="dim", overflow="fold")
 
-    for i, row in df.iterrows():
+    for i, row in enumerate(files):
         size_mb = f"{row['size_bytes'] / (1024 ** 2):.2f}"
         table.add_row(
             str(i + 1),
@@ -37,7 +35,7 @@ def display_table(df: pd.DataFrame) -> None:
 
     console.print(table)
 
-def select_indices(df: pd.DataFrame, allow_all: bool = False) -> List[int]:
+def select_indices(files: list, allow_all: bool = False) -> List[int]:
     """
     Prompts user to select files by number (comma-separated list or 'all' if allowed).
     Returns a list of selected row indices.
@@ -49,27 +47,27 @@ def select_indices(df: pd.DataFrame, allow_all: bool = False) -> List[int]:
         )
 
         if allow_all and selection.strip().lower() == "all":
-            return list(range(len(df)))
+            return list(range(len(files)))
 
         try:
             selected = [int(x.strip()) - 1 for x in selection.split(",")]
-            if all(0 <= i < len(df) for i in selected):
+            if all(0 <= i < len(files) for i in selected):
                 return selected
             else:
                 raise ValueError
         except ValueError:
             console.print("[red]Invalid selection. Try again.[/red]")
 
-def select_files(df: pd.DataFrame) -> List[int]:
+def select_files(files: list) -> List[int]:
     """
     Allows user to select files using basic printed list.
     Returns selected row indices.
     """
-    if df.empty:
+    if not files:
         console.print("[red]No files to select.[/red]")
         return []
 
-    for i, row in df.iterrows():
+    for i, row in enumerate(files):
         size_mb = f"{row['size_bytes'] / (1024 ** 2):.2f} MB"
         console.print(f"[{i + 1}] {row['month']} | {row['content']} | {size_mb}")
 
@@ -77,17 +75,18 @@ def select_files(df: pd.DataFrame) -> List[int]:
         selection = Prompt.ask("Select file(s) by number (comma-separated)", default="1")
         try:
             indices = [int(x.strip()) - 1 for x in selection.split(",")]
-            if all(0 <= i < len(df) for i in indices):
+            if all(0 <= i < len(files) for i in indices):
                 return indices
         except Exception:
             pass
 
         console.print("[red]Invalid selection. Try again.[/red]")
 
-def display_status_table(df, download_dir: Path):
+def display_status_table(files: list, download_dir: Path):
     """
     Displays the full download/extract/convert status of all files in a table.
-    Includes ✔/✗ markers for each status column.
+    Includes ✔/✗ markers for each status column; "Verified" shows whether a download
+    matched the month's published checksum (? = downloaded but not verified yet).
     """
     table = Table(title="Available Discogs Files", show_lines=True)
     table.add_column("No", justify="right", style="cyan", no_wrap=True)
@@ -95,31 +94,26 @@ def display_status_table(df, download_dir: Path):
     table.add_column("Type", style="yellow")
     table.add_column("Size", justify="right")
     table.add_column("Downloaded", justify="center")
+    table.add_column("Verified", justify="center")
     table.add_column("Extracted", justify="center")
     table.add_column("Converted", justify="center")
 
-    for idx, row in df.iterrows():
-        filename = Path(row["url"]).name
-        year_month = row["month"]
-        data_dir = download_dir / "Datasets" / year_month
-        gz_path = data_dir / filename
-        xml_path = gz_path.with_suffix("")
-        csv_path = xml_path.with_suffix(".csv")
+    check = lambda b: "[green]✔[/green]" if b else "[red]✗[/red]"
 
-        is_downloaded = gz_path.exists()
-        is_extracted = xml_path.exists()
-        is_converted = csv_path.exists()
-
-        check = lambda b: "[green]✔[/green]" if b else "[red]✗[/red]"
+    for idx, row in enumerate(files):
+        # Read from the artifact index: one folder scan at most, no stat per file
+        state = artifact_status(download_dir, row["month"], Path(row["url"]).name)
+        verified = "[green]✔[/green]" if state["verified"] else "[yellow]?[/yellow]"
 
         table.add_row(
             str(idx + 1),
             row["month"],
             row["content"],
             human_readable_size(row["size_bytes"]),
-            check(is_downloaded),
-            check(is_extracted),
-            check(is_converted),
+            check(state["downloaded"]),
+            verified if state["downloaded"] else "[dim]–[/dim]",
+            check(state["extracted"]),
+            check(state["converted"]),
         )
 
     console.print(table)
@@ -128,6 +122,9 @@ def show_welcome():
     """
     Displays the ASCII welcome screen with a summary of available commands and features.
     """
+    from rich.panel import Panel
+    from rich.markdown import Markdown  # Pulls in the Markdown parser; only the welcome screen needs it
+
     ascii_logo = r"""
             ██████╗ ██╗███████╗ ██████╗ ██████╗  ██████╗ ███████╗             
             ██╔══██╗██║██╔════╝██╔════╝██╔═══██╗██╔════╝ ██╔════╝             
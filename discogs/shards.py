@@ -0,0 +1,148 @@
+# discogs/shards.py
+
+import csv
+import json
+from pathlib import Path
+
+from discogs.checksum import new_hash, hash_file
+from discogs.memory import parse_size
+from discogs.parquet_writer import write_parquet
+
+MANIFEST_NAME = "manifest.json"  # Kept inside the .parts folder it describes
+MANIFEST_VERSION = 1
+_FLUSH_BYTES = 1024 * 1024  # Encoded CSV text gathered before it is hashed and written
+
+
+def shard_spec(size=None, rows=None):
+    """
+    Turns --shard-size (MB, or a size like "256M", "1G") and --shard-rows into a shard
+    spec {"bytes", "rows"}, or None when neither is given. Raises ValueError on bad values.
+    """
+    if size is None and not rows:
+        return None
+    if rows is not None and rows < 0:
+        raise ValueError(f"Invalid row count: {rows}")
+    return {"bytes": parse_size(size) if size is not None else None, "rows": rows or None}
+
+
+def part_name(number: int, output_format: str) -> str:
+    return f"part-{number:05}.{output_format}"
+
+
+class _HashingFile:
+    """
+    Binary file that csv.writer can write text to; keeps a running SHA-256 and byte
+    count of everything written, so a part never has to be read back.
+    """
+
+    def __init__(self, path: Path):
+        self.file = open(path, "wb")
+        self.hasher = new_hash()
+        self.flushed = 0
+        self.buffer = []
+        self.buffered = 0
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self.buffer.append(data)
+        self.buffered += len(data)
+        if self.buffered >= _FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        data = b"".join(self.buffer)
+        self.hasher.update(data)
+        self.file.write(data)
+        self.flushed += len(data)
+        self.buffer, self.buffered = [], 0
+
+    @property
+    def size(self) -> int:
+        return self.flushed + self.buffered
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def _part_rows(first, rows, part: dict, id_index, size, max_bytes, max_rows):
+    """
+    Yields `first` and then rows from `rows` until the part is full: max_rows rows, or
+    size() (what has been written so far) at least max_bytes. Counts the rows and the
+    record id range into part as they go by.
+    """
+    row = first
+    while row is not None:
+        part["text"] += sum(map(len, row)) + len(row)
+        if id_index is not None:
+            try:
+                record_id = int(row[id_index])
+            except ValueError:
+                pass  # Rows without a numeric id (e.g. nested sublabels) don't widen the range
+            else:
+                part["id_min"] = record_id if part["id_min"] is None else min(part["id_min"], record_id)
+                part["id_max"] = record_id if part["id_max"] is None else max(part["id_max"], record_id)
+        yield row
+        part["rows"] += 1
+        if (max_rows and part["rows"] >= max_rows) or (max_bytes and size() >= max_bytes):
+            return
+        row = next(rows, None)
+
+
+def write_parts(rows, columns: list, output_dir: Path, output_format: str = "csv", max_bytes: int = None,
+                max_rows: int = None, id_column: str = None, batch_bytes: int = None, content_type: str = None) -> dict:
+    """
+    Writes an iterable of row lists (aligned with `columns`) as a folder of part files
+    (part-00001.csv, ...), rolling to a new part once the current one holds max_rows rows
+    or max_bytes bytes, so each can be loaded on its own. Every part has the header.
+    CSV parts are cut at exactly the first row that reaches max_bytes; Parquet parts are
+    sized by the text they hold before compression, so they come out smaller.
+    A manifest.json lists the parts in order with their rows, bytes, SHA-256 and the
+    range of record ids (id_column) they hold; at least one part is always written.
+    Returns the manifest.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    id_index = columns.index(id_column) if id_column in columns else None
+    rows = iter(rows)
+    parts = []
+
+    row = next(rows, None)
+    while row is not None or not parts:
+        path = output_dir / part_name(len(parts) + 1, output_format)
+        part = {"file": path.name, "rows": 0, "bytes": 0, "sha256": None, "id_min": None, "id_max": None, "text": 0}
+
+        if output_format == "parquet":
+            write_parquet(_part_rows(row, rows, part, id_index, lambda: part["text"], max_bytes, max_rows),
+                          columns, path, batch_bytes=batch_bytes)
+            part["bytes"] = path.stat().st_size
+            part["sha256"] = hash_file(path).hexdigest()
+        else:
+            out = _HashingFile(path)
+            try:
+                writer = csv.writer(out)
+                writer.writerow(columns)
+                writer.writerows(_part_rows(row, rows, part, id_index, lambda: out.size, max_bytes, max_rows))
+            finally:
+                out.close()
+            part["bytes"] = out.size
+            part["sha256"] = out.hasher.hexdigest()
+
+        del part["text"]
+        parts.append(part)
+        row = next(rows, None)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "content_type": content_type,
+        "format": output_format,
+        "columns": columns,
+        "rows": sum(part["rows"] for part in parts),
+        "id_column": id_column if id_index is not None else None,
+        "max_bytes": max_bytes,
+        "max_rows": max_rows,
+        "parts": parts,
+    }
+    with open(output_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
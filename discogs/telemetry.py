@@ -0,0 +1,304 @@
+# discogs/telemetry.py
+
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import platform
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from rich.console import Console
+
+console = Console()
+
+PROFILERS = ("cprofile", "sample")
+# Stages the pipeline reports; the CLI wraps each command in a "total" stage around them
+STAGES = ("download", "extract", "chunk", "convert", "scan", "write", "flatten", "merge", "load", "index", "stream",
+          "diff")
+
+# Run-wide state: finished stage records, the stack of open stages and the profiling setup
+_run = {"id": uuid.uuid4().hex[:12], "started": datetime.now().isoformat(timespec="seconds"), "command": None}
+_stages = []
+_open = []
+_profile = {"stage": None, "profiler": "cprofile", "out_dir": Path.cwd()}
+
+
+def _read_status_mb(field: str):
+    """
+    A memory figure of this process from /proc/self/status in MB (Linux), or None.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _read_peak_mb():
+    """
+    Peak resident memory of this process in MB: VmHWM on Linux (resettable, see _reset_peak),
+    ru_maxrss elsewhere, None when neither is available.
+    """
+    peak = _read_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _children_peak_mb():
+    """
+    Largest peak RSS of any finished worker process so far (not resettable), or None.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _reset_peak():
+    """
+    Resets the kernel's peak-RSS mark so the next stage measures its own peak (Linux only).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _fold_peak():
+    """
+    Folds the current peak into every open stage before the mark is reset.
+    """
+    peak = _read_peak_mb()
+    if peak is not None:
+        for metrics in _open:
+            metrics["peak_rss_mb"] = max(metrics["peak_rss_mb"] or 0.0, peak)
+
+
+def configure(command: str = None, profile_stage: str = None, profiler: str = "cprofile", profile_dir: Path = None):
+    """
+    Sets the command name recorded in reports and, optionally, the one stage to profile
+    with cProfile or the sampling profiler (profiles are written to profile_dir).
+    """
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {profiler} (expected one of {', '.join(PROFILERS)})")
+    _run["command"] = command
+    _profile.update(stage=profile_stage, profiler=profiler, out_dir=profile_dir or Path.cwd())
+
+
+@contextmanager
+def stage(name: str, **fields):
+    """
+    Measures one pipeline stage: wall and CPU time (including worker processes that
+    finished inside it), peak RSS and whatever the caller adds to the yielded dict
+    (bytes_in, bytes_out, records, chunks, ...). Stages nest; each finished stage is
+    kept for the run report.
+    """
+    metrics = {"stage": name, "parent": _open[-1]["stage"] if _open else None, **fields}
+    metrics["started"] = datetime.now().isoformat(timespec="seconds")
+    metrics["peak_rss_mb"] = None
+    _fold_peak()
+    _reset_peak()
+    _open.append(metrics)
+
+    stop_profile = _start_profile(name) if _profile["stage"] == name else None
+    times = os.times()
+    wall = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        wall = time.perf_counter() - wall
+        end = os.times()
+        if stop_profile:
+            stop_profile()
+        _fold_peak()
+        _open.pop()
+
+        metrics["wall_seconds"] = round(wall, 4)
+        metrics["cpu_seconds"] = round((end.user - times.user) + (end.system - times.system), 4)
+        metrics["worker_cpu_seconds"] = round(
+            (end.children_user - times.children_user) + (end.children_system - times.children_system), 4
+        )
+        if metrics["peak_rss_mb"] is not None:
+            metrics["peak_rss_mb"] = round(metrics["peak_rss_mb"], 1)
+        if metrics["worker_cpu_seconds"] and _children_peak_mb():
+            metrics["worker_peak_rss_mb"] = round(_children_peak_mb(), 1)
+        if wall:
+            if metrics.get("records"):
+                metrics["records_per_s"] = round(metrics["records"] / wall, 1)
+            if metrics.get("bytes_in"):
+                metrics["mb_in_per_s"] = round(metrics["bytes_in"] / 1024 ** 2 / wall, 2)
+        _stages.append(metrics)
+
+
+def count(**values):
+    """
+    Adds counters (records=..., bytes_out=...) to every open stage, so numbers produced
+    deep inside a helper also add up in the stages that enclose it. No-op outside a stage.
+    """
+    for metrics in _open:
+        for key, value in values.items():
+            metrics[key] = (metrics.get(key) or 0) + value
+
+
+def start_job_peak():
+    """
+    Starts measuring the peak RSS of one job (a chunk flattened in a worker, or inline):
+    the peak so far is folded into the open stages first, so none of it is lost.
+    Read the job's peak with job_peak_mb() when it is done.
+    """
+    _fold_peak()
+    _reset_peak()
+
+
+def job_peak_mb():
+    peak = _read_peak_mb()
+    return round(peak, 1) if peak is not None else None
+
+
+def worker_peak(peak_mb, workers: int):
+    """
+    Records the peak RSS a job reported from a pool worker in every open stage: the
+    largest single job, and the pool's worst case while it runs (this process as it is
+    now, plus every worker at that peak), which RUSAGE_CHILDREN cannot tell apart.
+    """
+    if peak_mb is None:
+        return
+    pool = peak_mb * workers + (_read_status_mb("VmRSS") or 0.0)
+    for metrics in _open:
+        metrics["job_peak_rss_mb"] = max(metrics.get("job_peak_rss_mb") or 0.0, peak_mb)
+        metrics["pool_peak_rss_mb"] = round(max(metrics.get("pool_peak_rss_mb") or 0.0, pool), 1)
+
+
+def print_resources(max_memory_mb: float = None):
+    """
+    Prints the per-stage resource report: wall time, the peak RSS of this process and
+    of the largest worker job, and the worst case: this process at its peak, or the
+    pool with every worker at its peak, whichever is larger. With a budget, stages
+    whose worst case exceeds it are flagged.
+    """
+    from rich.table import Table
+
+    table = Table(title="Resources per stage", title_justify="left")
+    for column in ("stage", "wall s", "peak MB", "worker peak MB", "worst case MB"):
+        table.add_column(column, justify="left" if column == "stage" else "right")
+    over = []
+    for metrics in _stages:
+        main, job = metrics.get("peak_rss_mb") or 0.0, metrics.get("job_peak_rss_mb")
+        worst = max(main, metrics.get("pool_peak_rss_mb") or 0.0)
+        flag = max_memory_mb is not None and worst > max_memory_mb
+        if flag:
+            over.append(metrics["stage"])
+        name = ("  " if metrics.get("parent") else "") + metrics["stage"]
+        table.add_row(name, f"{metrics['wall_seconds']:.1f}", f"{main:.0f}", f"{job:.0f}" if job else "–",
+                      f"[red]{worst:.0f} ⚠[/]" if flag else f"{worst:.0f}")
+    console.print(table)
+    if max_memory_mb is not None:
+        if over:
+            console.print(f"[yellow]⚠ Over the {max_memory_mb:,.0f} MB budget in: {', '.join(over)}[/yellow]")
+        else:
+            console.print(f"[green]✔ Every stage stayed within the {max_memory_mb:,.0f} MB budget[/green]")
+
+
+def _start_profile(name: str):
+    """
+    Starts the configured profiler for a stage and returns the function that stops it
+    and writes the result.
+    """
+    out_dir = Path(_profile["out_dir"])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = f"{datetime.now():%Y%m%d_%H%M%S}_{len(_stages) + 1}"  # A stage can run once per file
+
+    if _profile["profiler"] == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def stop():
+            profiler.disable()
+            path = out_dir / f"profile_{name}_{stamp}.prof"
+            profiler.dump_stats(path)
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(15)
+            console.print(report.getvalue())
+            console.print(f"[bold white]🔬 cProfile stats for '{name}':[/] {path} (open with snakeviz or pstats)")
+
+        return stop
+
+    samples = Counter()
+    done = threading.Event()
+    target = threading.get_ident()  # The thread that runs the stage
+
+    def sample(interval: float = 0.005):
+        while not done.wait(interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                samples[";".join(reversed(stack))] += 1
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+
+    def stop():
+        done.set()
+        sampler.join()
+        path = out_dir / f"profile_{name}_{stamp}.folded"
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, hits in samples.most_common():
+                f.write(f"{stack} {hits}\n")
+        console.print(f"[bold white]🔬 {sum(samples.values())} samples for '{name}':[/] {path} "
+                      "(collapsed stacks, e.g. for flamegraph.pl or speedscope)")
+
+    return stop
+
+
+def stages() -> list:
+    """
+    Returns the finished stage records of this run, in completion order.
+    """
+    return list(_stages)
+
+
+def write_report(path: Path) -> Path:
+    """
+    Writes the run report: a single JSON document for *.json, or one JSON line per
+    stage (appended, tagged with the run id) for *.jsonl, ready for dashboards.
+    """
+    run = {
+        **_run,
+        "finished": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".jsonl":
+        with open(path, "a", encoding="utf-8") as f:
+            for metrics in _stages:
+                f.write(json.dumps({"run_id": run["id"], "command": run["command"], **metrics}) + "\n")
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"run": run, "stages": _stages}, f, indent=2)
+    console.print(f"[bold white]📊 Metrics written:[/] {path} ({len(_stages)} stages)")
+    return path